@@ -31,20 +31,28 @@ from .decorators import *
 from . import errors
 
 from .core import events
+from .core import futures
+from .core.batch import Batch
 from .core.column import Column
 from .core.collection import Collection
 from .core.connection import Connection
 from .core.context import Context
+from .core.dataloader import DataLoader
+from .core.datacache import DataCache
 from .core.database import Database
+from .core.futures import Future
+from .core.identitymap import IdentityMap
 from .core.index import Index
 from .core.model import Model
 from .core.query import (Query, QueryCompound)
 from .core.collector import Collector
 from .core.pipe import Pipe
 from .core.reverselookup import ReverseLookup
+from .core.row import Row
 from .core.schema import Schema
 from .core.security import Security
 from .core.system import System
+from .core.transactions import (SingleTransaction, Transaction)
 
 from .core.events import *
 from .core.model_types import *
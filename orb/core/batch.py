@@ -0,0 +1,115 @@
+"""
+Defines the Batch class that collects several independent queries so that
+they can be run against the database together.
+"""
+
+import sys
+
+from collections import OrderedDict
+
+from projex.lazymodule import lazy_import
+
+orb = lazy_import('orb')
+
+
+class Batch(object):
+    """
+    Collects the queries for several collections and runs them together when
+    the batch exits, saving a round trip to the database for each of them.
+    The Postgres backend folds every query into a single statement, while
+    the other backends fold the counts and run each select after them on
+    the same connection.
+    The results are preloaded into the collections, and each deferred query
+    returns a future that is resolved with its result.
+
+    :usage
+
+        |with orb.Batch() as batch:
+        |    count = batch.defer(User.select(where=q), 'count')
+        |    groups = batch.defer(Group.all())
+        |
+        |print count.result(), groups.result()
+
+    """
+    Methods = ('records', 'count', 'first')
+
+    def __init__(self, db=None):
+        self.__db = db
+        self.__deferred = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def defer(self, collection, method='records'):
+        """
+        Defers loading the given collection until the batch is executed.
+
+        :param collection: <orb.Collection>
+        :param method: <str> | 'records', 'count' or 'first'
+
+        :return: <orb.Future>
+        """
+        if method not in self.Methods:
+            raise orb.errors.InvalidBatchMethod(method)
+
+        future = orb.Future()
+        self.__deferred.append((collection, method, future))
+        return future
+
+    def execute(self):
+        """
+        Runs the deferred queries, one batch for each database, and resolves
+        their futures.
+        """
+        deferred, self.__deferred = self.__deferred, []
+
+        groups = OrderedDict()
+        for collection, method, future in deferred:
+            model = collection.model()
+
+            # collections that do not need to be queried resolve right away
+            if model is None or collection.isLoaded():
+                future._resolve(getattr(collection, method)())
+                continue
+
+            context = collection.context()
+            if method == 'count':
+                query_context = context.copy()
+                query_context.columns = [model.schema().idColumn()]
+                query_context.expand = None
+                query_context.order = None
+            elif method == 'first':
+                query_context = context.copy()
+                query_context.limit = 1
+                query_context.order = [(model.schema().idColumn().name(), 'desc')]
+            else:
+                query_context = context
+
+            db = self.__db or context.db
+            groups.setdefault(db, []).append((collection, method, future, model, query_context))
+
+        for db, items in groups.items():
+            queries = [('count' if item_method == 'count' else 'records', item_model, item_context)
+                       for _, item_method, _, item_model, item_context in items]
+            try:
+                results = db.connection().selectMany(queries)
+            except Exception:
+                exc_info = sys.exc_info()
+                for _, _, future, _, _ in items:
+                    future._resolve(excInfo=exc_info)
+                raise
+
+            for (collection, method, future, _, _), result in zip(items, results):
+                if method == 'first':
+                    if result:
+                        collection.preload({'first': result[0]})
+                        future._resolve(collection.first())
+                    else:
+                        future._resolve(None)
+                else:
+                    collection.preload({method: result})
+                    future._resolve(getattr(collection, method)())
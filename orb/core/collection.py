@@ -1,35 +1,127 @@
+import base64
+import datetime
+import decimal
+import json
 import math
+import projex.text
+import pytz
 
 from collections import defaultdict
 from projex.lazymodule import lazy_import
-from projex.locks import ReadWriteLock, ReadLocker, WriteLocker
+
+from .decoder import RowDecoder
+from .locks import ReadLocker, ReadWriteLock, WriteLocker
 
 
 orb = lazy_import('orb')
 
 
+def _encode_key(value):
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(pytz.utc).replace(tzinfo=None)
+            return {'utc': value.strftime('%Y-%m-%dT%H:%M:%S.%f')}
+        return {'datetime': value.strftime('%Y-%m-%dT%H:%M:%S.%f')}
+    elif isinstance(value, datetime.date):
+        return {'date': value.strftime('%Y-%m-%d')}
+    elif isinstance(value, datetime.time):
+        return {'time': value.strftime('%H:%M:%S.%f')}
+    elif isinstance(value, decimal.Decimal):
+        return {'decimal': str(value)}
+    else:
+        return value
+
+
+def _decode_key(value):
+    if not isinstance(value, dict):
+        return value
+    elif 'utc' in value:
+        return pytz.utc.localize(datetime.datetime.strptime(value['utc'], '%Y-%m-%dT%H:%M:%S.%f'))
+    elif 'datetime' in value:
+        return datetime.datetime.strptime(value['datetime'], '%Y-%m-%dT%H:%M:%S.%f')
+    elif 'date' in value:
+        return datetime.datetime.strptime(value['date'], '%Y-%m-%d').date()
+    elif 'time' in value:
+        return datetime.datetime.strptime(value['time'], '%H:%M:%S.%f').time()
+    elif 'decimal' in value:
+        return decimal.Decimal(value['decimal'])
+    else:
+        raise ValueError(value)
+
+
 class CollectionIterator(object):
-    def __init__(self, collection, batch=1):
+    def __init__(self, collection, batch=1, prefetch=False):
         self.__collection = collection
         self.__model = collection.model()
+        self.__keyset = collection.keyset()
         self.__page = 1
+        self.__offset = 0
         self.__index = -1
         self.__pageSize = batch
+        self.__prefetch = prefetch
+        self.__next = None
         self.__records = []
 
     def __iter__(self):
         return self
 
+    def _fetch(self, page, offset=0, after=None):
+        # seek past the last record of the previous batch
+        if after is not None:
+            sub_collection = self.__collection.copy(where=self.__collection.seek(after, self.__keyset),
+                                                    order=[(col.name(), direction) for col, direction in self.__keyset],
+                                                    start=None,
+                                                    page=None,
+                                                    pageSize=None,
+                                                    limit=self.__pageSize,
+                                                    returning='values')
+
+        # walk using a stable order when the collection supports keyset paging
+        elif self.__keyset:
+            sub_collection = self.__collection.copy(order=[(col.name(), direction) for col, direction in self.__keyset],
+                                                    start=offset or None,
+                                                    page=None,
+                                                    pageSize=None,
+                                                    limit=self.__pageSize,
+                                                    returning='values')
+
+        else:
+            sub_collection = self.__collection.page(page, pageSize=self.__pageSize, returning='values')
+
+        return sub_collection.records()
+
+    def _following(self):
+        # determine where the next batch will start from
+        self.__page += 1
+        self.__offset += len(self.__records)
+
+        if self.__keyset:
+            last = self.__records[-1]
+            after = [last.get(col.field()) for col, _ in self.__keyset]
+            if None not in after:
+                return self.__page, 0, after
+
+        return self.__page, self.__offset, None
+
     def next(self):
         self.__index += 1
 
         # get the next batch of records
         if len(self.__records) in (0, self.__pageSize) and self.__index == len(self.__records):
-            sub_collection = self.__collection.page(self.__page, pageSize=self.__pageSize, returning='values')
-            self.__records = sub_collection.records()
-            self.__page += 1
+            if self.__next is not None:
+                self.__records = self.__next.result()
+                self.__next = None
+            elif not self.__records:
+                self.__records = self._fetch(self.__page)
+            else:
+                self.__records = self._fetch(*self._following())
+
             self.__index = 0
 
+            # load the following batch in the background while this one is processed
+            if self.__prefetch and len(self.__records) == self.__pageSize:
+                self.__next = orb.futures.submit(self._fetch, *self._following())
+
         # stop the iteration when complete
         if not self.__records or self.__index == len(self.__records):
             raise StopIteration()
@@ -146,7 +238,14 @@ class Collection(object):
                 return record
 
     def _process(self, raw, context):
-        if context.inflated in (True, None) and context.returning not in ('values', 'data'):
+        if context.returning == 'rows':
+            row_type = self.__model.rowType()
+            for x in raw or []:
+                if isinstance(x, orb.Model):
+                    x = dict(x)
+                yield row_type.fromData(x, context=context)
+
+        elif context.inflated in (True, None) and context.returning not in ('values', 'data'):
             for x in raw or []:
                 yield self.__model.inflate(x, context=context)
 
@@ -170,6 +269,54 @@ class Collection(object):
             for x in raw:
                 yield x
 
+    def _prefetch(self, model, records, tree, context):
+        records = [record for record in records if isinstance(record, orb.Model) and record.isRecord()]
+        if not records:
+            return
+
+        schema = model.schema()
+        for name, sub_tree in tree.items():
+            collector = schema.collector(name)
+
+            # load the references for every record with a single lookup
+            if collector is None:
+                column = schema.column(name)
+                if not isinstance(column, orb.ReferenceColumn):
+                    raise orb.errors.ColumnNotFound(schema=schema, column=name)
+
+                ref_model = column.referenceModel()
+                ids = list({record.get(column.field()) for record in records} - {None})
+                lookup = {ref.id(): ref for ref in ref_model.fetchMany(ids, context=context) if ref is not None}
+
+                children = []
+                for record in records:
+                    ref = lookup.get(record.get(column.field()))
+                    if ref is not None:
+                        event = orb.events.LoadEvent(record=record, data={column.field(): ref})
+                        record._load(event)
+                        children.append(ref)
+
+            # otherwise, seed the preloaded results of the collector
+            else:
+                groups = collector.collectMany(records, context=context)
+                key = projex.text.underscore(collector.name())
+
+                children = []
+                for record in records:
+                    group = groups.get(record.id(), [])
+                    cache = {'records': group, 'count': len(group)}
+                    if collector.testFlag(collector.Flags.Unique):
+                        cache['first'] = group[0] if group else None
+
+                    event = orb.events.LoadEvent(record=record, data={key: cache})
+                    record._load(event)
+                    children.extend(group)
+
+                ref_model = collector.model()
+
+            if sub_tree:
+                self._prefetch(ref_model, children, sub_tree, context)
+
     def add(self, record):
         if isinstance(self.__collector, orb.Pipe):
             cls = self.__collector.throughModel()
@@ -181,6 +328,12 @@ class Collection(object):
             with WriteLocker(self.__cacheLock):
                 self.__cache = defaultdict(dict)
 
+            # link the records in a single statement when the pipe is unique
+            for index in cls.schema().indexes().values():
+                if (index.testFlag(index.Flags.Unique) and
+                        {col.name() for col in index.columns()} == set(data.keys())):
+                    return cls.upsert(data, index=index, update=False, context=self.context())
+
             return cls.ensureExists(data, context=self.context())
 
         elif isinstance(self.__collector, orb.ReverseLookup):
@@ -205,6 +358,49 @@ class Collection(object):
             records.append(record)
             return True
 
+    def after(self, token, **context):
+        """
+        Returns the page of this collection that follows the given continuation
+        token, as returned from `nextToken`.  When the collection's order
+        supports it, the page is sought by its keyset rather than skipped to by
+        an offset, so deep pages cost the same as the first and records that
+        are added or removed between requests do not shift the results.
+
+        :usage
+
+            |users = User.select(order='-createdAt').after(token, pageSize=50)
+            |output = {'records': users.records(), 'next': users.nextToken()}
+
+        :param token: <str> || None
+
+        :return: <orb.Collection>
+        """
+        keyset = self.keyset(**context)
+        if keyset:
+            context['order'] = [(col.name(), direction) for col, direction in keyset]
+
+        context['page'] = None
+        context['start'] = None
+
+        if not token:
+            return self.copy(**context)
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(str(token)))
+            if 'after' in data:
+                values = [_decode_key(value) for value in data['after']]
+            else:
+                context['start'] = int(data['start'])
+        except (KeyError, TypeError, ValueError):
+            raise orb.errors.InvalidToken(token)
+
+        if context['start'] is None:
+            if not keyset or len(values) != len(keyset):
+                raise orb.errors.InvalidToken(token)
+            context['where'] = self.seek(values, keyset)
+
+        return self.copy(**context)
+
     def at(self, index, **context):
         records = self.records(**context)
         try:
@@ -251,7 +447,7 @@ class Collection(object):
         return self.__collector
 
     def context(self, **context):
-        new_context = self.__context.copy()
+        new_context = self.__context.derive()
         new_context.update(context)
         return new_context
 
@@ -271,6 +467,29 @@ class Collection(object):
         )
         return other
 
+    def copyOut(self, fileobj, format='csv', **context):
+        """
+        Writes the raw rows for this collection to the given file object
+        without inflating them into records, using the backend's bulk export
+        when it has one.
+
+        :usage
+
+            |with open('users.csv', 'wb') as f:
+            |    User.all().copyOut(f)
+
+        :param fileobj: <file>
+        :param format: <str> | 'csv' or 'binary'
+
+        :return: <int> | number of rows written
+        """
+        if self.isNull():
+            return 0
+
+        context = self.context(**context)
+        conn = context.db.connection()
+        return conn.copyOut(self.__model, context, fileobj, format=format)
+
     def count(self, **context):
         if self.isNull():
             return 0
@@ -305,51 +524,74 @@ class Collection(object):
                     self.__cache['count'][context] = count
                 return count
 
+    def countAsync(self, **context):
+        return orb.futures.submit(self.count, **context)
+
     def delete(self, **context):
-        context = orb.Context(**context)
+        """
+        Removes the records in this collection from the database.  When the
+        model does not process delete events, through an `onDelete` override
+        or a registered `DeleteEvent` callback, the collection's query is
+        deleted directly without loading any records.
 
+        :return: <int> number of records removed
+        """
         # delete piped records
         if isinstance(self.__collector, orb.Pipe):
             pipe = self.__collector
             through = pipe.throughModel()
 
             # collect the ids that are within this pipe
-            base_context = self.context()
+            base_context = self.context(**context)
             ids = self.ids()
 
             # remove them from the system
             q = orb.Query(pipe.targetColumn()).in_(ids)
             base_context.where = q
 
-            records = through.select(where=q, context=base_context)
-            delete = []
-            for record in records:
-                event = orb.events.DeleteEvent()
-                record.onDelete(event)
-                if not event.preventDefault:
-                    delete.append(record)
-
-            conn = base_context.db.connection()
-            return conn.delete(delete, base_context)[1]
+            return through.select(where=q, context=base_context).delete()
 
         # delete normal records
         else:
-            records = self.records(context=context)
+            collection = self.refine(**context)
+            context = collection.context()
+            if collection.isNull():
+                return 0
+
+            conn = context.db.connection()
+            model = self.__model
+
+            # delete the query in place when no record needs to process the event
+            if (model is not None and
+                    not collection.isLoaded() and
+                    context.limit is None and
+                    context.start is None and
+                    model.onDelete.__func__ is orb.Model.onDelete.__func__ and
+                    not model.callbacks(orb.events.DeleteEvent)):
+                return conn.delete(collection, context)[1]
+
+            records = collection.records()
             if not records:
                 return 0
 
             # process the deletion event
             remove = []
             for record in records:
-                event = orb.events.DeleteEvent()
-                record.onDelete(event)
+                event = orb.events.DeleteEvent(record=record, context=context)
+                if record.processEvent(event):
+                    record.onDelete(event)
                 if not event.preventDefault:
                     remove.append(record)
 
+            if not remove:
+                return 0
+
             # remove the records
-            conn = context.db.connection()
             return conn.delete(remove, context)[1]
 
+    def deleteAsync(self, **context):
+        return orb.futures.submit(self.delete, **context)
+
     def distinct(self, *columns, **context):
         context['distinct'] = columns
         return self.values(*columns, **context)
@@ -391,6 +633,9 @@ class Collection(object):
                     self.__cache['first'][context] = record
                 return record
 
+    def firstAsync(self, **context):
+        return orb.futures.submit(self.first, **context)
+
     def grouped(self, *columns, **context):
         preload = context.pop('preload', False)
 
@@ -458,6 +703,9 @@ class Collection(object):
 
             return ids
 
+    def idsAsync(self, **context):
+        return orb.futures.submit(self.ids, **context)
+
     def index(self, record, **context):
         context = self.context(**context)
         if not record:
@@ -481,8 +729,52 @@ class Collection(object):
         with ReadLocker(self.__cacheLock):
             return self.__cache['records'].get(self.__context) is None and self.__model is None
 
-    def iterate(self, batch=100):
-        return CollectionIterator(self, batch)
+    def iterate(self, batch=100, prefetch=False):
+        """
+        Iterates over the records in this collection, loading them from the
+        database in batches.  When prefetch is enabled, the next batch is
+        loaded in the background while the current one is being processed.
+
+        :param batch: <int>
+        :param prefetch: <bool>
+
+        :return: <CollectionIterator>
+        """
+        return CollectionIterator(self, batch, prefetch=prefetch)
+
+    def keyset(self, **context):
+        """
+        Returns the columns that records in this collection can be sought by
+        -- its order, with the id column added as a tiebreaker.  Seeking needs
+        every ordered column to be a non-null column that is stored on this
+        collection's model, so if the order contains any optional, virtual,
+        translatable or joined columns then None is returned.
+
+        :return: [(<orb.Column>, <str> 'asc' || 'desc'), ..] || None
+        """
+        if self.isNull():
+            return None
+
+        schema = self.__model.schema()
+        id_col = schema.idColumn()
+
+        keyset = []
+        for name, direction in self.context(**context).order or []:
+            col = schema.column(name, raise_=False) if '.' not in name else None
+            if (col is None or
+                    col.shortcut() or
+                    col.testFlag(orb.Column.Flags.I18n) or
+                    col.testFlag(orb.Column.Flags.Virtual) or
+                    (col != id_col and not col.testFlag(orb.Column.Flags.Required))):
+                return None
+
+            keyset.append((col, direction.lower()))
+            if col == id_col:
+                break
+        else:
+            keyset.append((id_col, 'asc'))
+
+        return keyset
 
     def last(self, **context):
         if self.isNull():
@@ -508,6 +800,33 @@ class Collection(object):
     def model(self):
         return self.__model
 
+    def nextToken(self, **context):
+        """
+        Returns the continuation token for the page that follows the records
+        in this collection, or None if this is the last page.  The token is
+        opaque to callers and can be passed back to `after`.
+
+        :return: <str> || None
+        """
+        context = self.context(**context)
+        size = context.limit
+        records = self.records(context=context)
+        if not size or len(records) < size:
+            return None
+
+        keyset = self.keyset(context=context)
+        if keyset:
+            last = records[-1]
+            if isinstance(last, orb.Model):
+                values = [last.get(col.field(), useMethod=False) for col, _ in keyset]
+            else:
+                values = [last.get(col.field()) for col, _ in keyset]
+            data = {'after': [_encode_key(value) for value in values]}
+        else:
+            data = {'start': (context.start or 0) + len(records)}
+
+        return base64.urlsafe_b64encode(json.dumps(data))
+
     def ordered(self, order):
         """
         Return a copy of this collection with the new order sequence.
@@ -548,6 +867,36 @@ class Collection(object):
             count = int(math.ceil(fraction))
             return max(1, count)
 
+    def prefetch(self, *paths, **context):
+        """
+        Loads the given collectors and references for all of the records in
+        this collection, making a single query for each level of the paths
+        rather than one for each record.  The results are preloaded into the
+        records, so accessing them afterwards will not query the database.
+
+        :usage
+
+            |users = User.all().prefetch('groups', 'userGroups.group')
+            |for user in users:
+            |    print user.get('groups')  # no query
+
+        :param paths: <str> dot-noted path, ..
+        :param context: <orb.Context> descriptor
+
+        :return: <orb.Collection>
+        """
+        tree = {}
+        for path in paths:
+            curr = tree
+            for part in path.split('.'):
+                curr = curr.setdefault(part, {})
+
+        records = self.records(**context)
+        context = self.context(**context)
+        sub_context = orb.Context(db=context.db, locale=context.locale, namespace=context.namespace)
+        self._prefetch(self.__model, records, tree, sub_context)
+        return self
+
     def preload(self, cache, **context):
         context = self.context(**context)
         with WriteLocker(self.__cacheLock):
@@ -578,6 +927,19 @@ class Collection(object):
                 self.__cache['records'][context] = records
             return records
 
+    def recordsAsync(self, **context):
+        """
+        Loads the records for this collection in the background.
+
+        :usage
+
+            |future = User.select(where=q).recordsAsync()
+            |users = future.result()
+
+        :return: <orb.Future>
+        """
+        return orb.futures.submit(self.records, **context)
+
     def refine(self, createNew=True, **context):
         if not createNew:
             self.__context.update(context)
@@ -773,11 +1135,14 @@ class Collection(object):
 
         # save and update the records
         if create_records:
+            changes = [record.changes().keys() for record in create_records]
             results, _ = conn.insert(create_records, context)
 
             # store the newly generated ids
-            for i, record in enumerate(create_records):
-                record.update(results[i])
+            for record, columns, data in zip(create_records, changes, results):
+                event = orb.events.LoadEvent(record=record, data=data)
+                record._load(event)
+                record.markLoaded(*columns)
 
         if update_records:
             conn.update(update_records, context)
@@ -789,9 +1154,139 @@ class Collection(object):
 
         return True
 
+    def saveAsync(self, **context):
+        return orb.futures.submit(self.save, **context)
+
+    def seek(self, values, keyset=None):
+        """
+        Returns the query that matches the records that come after the given
+        key values when following this collection's keyset order.
+
+        :param values: [<variant>, ..]
+        :param keyset: [(<orb.Column>, <str> 'asc' || 'desc'), ..] || None
+
+        :return: <orb.Query> || <orb.QueryCompound>
+        """
+        keyset = keyset or self.keyset()
+        if not keyset:
+            raise orb.errors.QueryInvalid('{0} records cannot be sought by their order'.format(self.__model.schema().name()))
+
+        out = orb.Query()
+        for i, (col, direction) in enumerate(keyset):
+            q = orb.Query()
+            for (prev_col, _), value in zip(keyset[:i], values):
+                q &= orb.Query(prev_col.name()) == value
+
+            if direction == 'desc':
+                q &= orb.Query(col.name()) < values[i]
+            else:
+                q &= orb.Query(col.name()) > values[i]
+
+            out |= q
+        return out
+
     def setModel(self, model):
         self.__model = model
 
+    def stream(self, size=1000, **context):
+        """
+        Yields the records for this collection as they are read from the
+        database, holding only `size` rows in memory at a time.  Streamed
+        records are not cached on the collection.
+
+        :usage
+
+            |for user in User.all().stream(size=500):
+            |    export(user)
+
+        :param size: <int>
+
+        :return: <generator>
+        """
+        if self.isNull():
+            return
+
+        context = self.context(**context)
+
+        with ReadLocker(self.__cacheLock):
+            records = self.__cache['records'].get(context)
+            raw = self.__preload.get('records', {}).get(context)
+
+        if records is not None:
+            for record in records:
+                yield record
+        else:
+            if raw is None:
+                conn = context.db.connection()
+                raw = conn.stream(self.__model, context, size)
+
+            for record in self._process(raw, context):
+                yield record
+
+    def upsert(self, index=None, update=True, **context):
+        """
+        Saves the records in this collection in bulk, matching any existing
+        records by a unique index instead of looking each one up first.  The
+        records are loaded with their stored values afterwards.  Unlike
+        saving, no save events are processed and translatable columns are not
+        written.
+
+        :usage
+
+            |users = orb.Collection([User({'username': 'bob'}), User({'username': 'sam'})])
+            |users.upsert(index='byUsername', update=False)
+
+        :param index: <str> || <orb.Index> || None | defaults to the first unique index
+        :param update: <bool> || [<str>, ..] | columns to update on existing records,
+                       True will update the columns that were set on the records
+
+        :return: <orb.Collection>
+        """
+        records = self.records(**context)
+        context = self.context(**context)
+        if not records:
+            return self
+
+        model = self.__model or type(records[0])
+        schema = model.schema()
+
+        if index is None:
+            indexes = sorted(schema.indexes().values(), key=lambda x: x.name())
+            index = next((idx for idx in indexes if idx.testFlag(idx.Flags.Unique)), None)
+        elif not isinstance(index, orb.Index):
+            index = schema.index(index)
+
+        if index is None or not index.testFlag(index.Flags.Unique):
+            raise orb.errors.IndexNotFound(schema=schema)
+
+        changes = [record.changes().keys() for record in records]
+        if update is True:
+            columns = {col for record_changes in changes for col in record_changes}
+        elif update:
+            columns = {schema.column(col) for col in update}
+        else:
+            columns = set()
+
+        index_columns = index.columns()
+        columns = sorted((col for col in columns
+                          if col not in index_columns and
+                          not col.testFlag(col.Flags.Virtual) and
+                          not col.testFlag(col.Flags.I18n) and
+                          not col.testFlag(col.Flags.AutoAssign)),
+                         key=lambda x: x.field())
+
+        conn = context.db.connection()
+        rows = conn.upsert(records, index, columns, context)
+
+        # load the stored values for each record
+        for record, record_changes, row in zip(records, changes, rows):
+            if row:
+                event = orb.events.LoadEvent(record=record, data=row)
+                record._load(event)
+                record.markLoaded(*record_changes)
+
+        return self
+
     def values(self, *columns, **context):
         if self.isNull():
             return []
@@ -818,21 +1313,32 @@ class Collection(object):
                 schema = self.__model.schema()
                 values = []
                 fields = [schema.column(col) for col in columns]
+
+                # create the contexts to restore each field with once for all of the records
+                if context.inflated is not False:
+                    field_contexts = []
+                    for col, field in zip(columns, fields):
+                        raw_values = orig_context.copy()
+                        raw_values['distinct'] = None
+
+                        if isinstance(field, orb.ReferenceColumn) and raw_values.get('inflated') is None:
+                            raw_values['inflated'] = col != field.field()
+
+                        field_contexts.append(orb.Context(**raw_values))
+
+                decoder = None
                 for record in raw:
                     if context.inflated is False:
                         record_values = [record[field.field()] for field in fields]
-                    else:
-                        record_values = []
-                        for i, field in enumerate(fields):
-                            col = columns[i]
-                            raw_values = orig_context.copy()
-                            raw_values['distinct'] = None
-
-                            if isinstance(field, orb.ReferenceColumn) and raw_values.get('inflated') is None:
-                                raw_values['inflated'] = col != field.field()
 
-                            val = field.restore(record[field.field()], context=orb.Context(**raw_values))
-                            record_values.append(val)
+                    # preloaded records are restored through the model
+                    elif isinstance(record, orb.Model):
+                        record_values = [field.restore(record[field.field()], context=field_context)
+                                         for field, field_context in zip(fields, field_contexts)]
+                    else:
+                        if decoder is None:
+                            decoder = RowDecoder.byFields(self.__model, record.keys())
+                        record_values = decoder.values(record, fields, field_contexts)
 
                     if len(fields) == 1:
                         values.append(record_values[0])
@@ -849,3 +1355,6 @@ class Collection(object):
                     return [record.get(columns[0]) if record else None for record in records]
                 else:
                     return [(record.get(c) for c in columns) for record in records]
+
+    def valuesAsync(self, *columns, **context):
+        return orb.futures.submit(self.values, *columns, **context)
@@ -81,6 +81,18 @@ class Collector(object):
     def collectExpand(self, query, parts, **context):
         raise NotImplementedError
 
+    def collectMany(self, records, **context):
+        """
+        Collects the records for each of the given records with a single
+        query, grouping the results by the id of the record they belong to.
+
+        :param records: [<orb.Model>, ..]
+        :param context: <orb.Context> descriptor
+
+        :return: {<variant> id: [<orb.Model>, ..], ..}
+        """
+        raise NotImplementedError
+
     def queryFilter(self, function=None):
         """
         Defines a decorator that can be used to filter
@@ -102,6 +102,8 @@ class DateColumn(AbstractDatetimeColumn):
 
         :return: <variant>
         """
+        if isinstance(db_value, (str, unicode)):
+            return self.valueFromString(db_value, context=context)
         return db_value
 
     def valueFromString(self, value, context=None):
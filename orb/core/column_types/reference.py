@@ -54,7 +54,17 @@ class ReferenceColumn(Column):
             model = self.referenceModel()
 
             if not isinstance(value, orb.Model):
-                return model.fetch(value, context=context)
+                identity_map = orb.IdentityMap.current()
+                record = identity_map.get(model, value) if identity_map is not None else None
+                if record is not None:
+                    return record
+
+                loader = orb.DataLoader.current()
+                data = loader.load(model, value, context=context) if loader is not None else None
+                if data is not None:
+                    return model.inflate(data, context=context)
+                else:
+                    return model.fetch(value, context=context)
             else:
                 return value
 
@@ -107,16 +117,18 @@ class ReferenceColumn(Column):
             if not cls:
                 raise orb.errors.ModelNotFound(schema=self.reference())
             else:
-                load_event = orb.events.LoadEvent(data=db_value)
-
                 # update the expansion information to not propagate to references
                 if context:
-                    context = context.copy()
                     expand = context.expandtree(cls)
                     sub_expand = expand.pop(self.name(), {})
-                    context.expand = context.raw_values['expand'] = sub_expand
-
-                db_value = cls(loadEvent=load_event, context=context)
+                    context = context.derive(expand=sub_expand)
+
+                identity_map = orb.IdentityMap.current()
+                if identity_map is not None:
+                    db_value = identity_map.inflate(cls, db_value, context=context)
+                else:
+                    load_event = orb.events.LoadEvent(data=db_value)
+                    db_value = cls(loadEvent=load_event, context=context)
 
         return super(ReferenceColumn, self).dbRestore(db_value, context=context)
 
@@ -4,6 +4,7 @@ to the backend databases.
 """
 
 import cPickle
+import csv
 import logging
 import projex.iters
 
@@ -76,6 +77,19 @@ class Connection(AddonManager):
         :return     <bool> success
         """
 
+    def begin(self, isolation=None, readOnly=False):
+        """
+        Starts a transaction for the current thread, pinning a single
+        connection that all statements will run through until the
+        transaction is ended.  Beginning a transaction while one is already
+        active will create a savepoint within it.  Backends that do not
+        support transactions raise an error.
+
+        :param isolation: <str> || None
+        :param readOnly: <bool>
+        """
+        raise errors.ActionNotAllowed('begin')
+
     @abstractmethod
     def close(self):
         """
@@ -92,6 +106,61 @@ class Connection(AddonManager):
         :return     <bool> success
         """
 
+    def copyIn(self, model, rows, context, size=1000):
+        """
+        Bulk loads the given rows into the table for the inputted model.  The
+        rows can be dictionaries of column values or unsaved records.  Backends
+        that do not support a bulk load will insert the records in chunks of
+        the given size.
+
+        :param      model   | <subclass of orb.Model>
+                    rows    | <iterable> of {<str> column: <variant>, ..} || <orb.Model>
+                    context | <orb.Context>
+                    size    | <int>
+
+        :return     <int> | number of rows loaded
+        """
+        count = 0
+        for chunk in projex.iters.batch(rows, size):
+            records = []
+            for row in chunk:
+                if not isinstance(row, orb.Model):
+                    record = model(context=context)
+                    record.update(row)
+                    row = record
+                records.append(row)
+
+            self.insert(records, context)
+            count += len(records)
+        return count
+
+    def copyOut(self, model, context, fileobj, format='csv'):
+        """
+        Writes the raw rows for the inputted model and context to the given
+        file object without inflating them into records.  Backends that do not
+        support a bulk export will write the streamed rows as csv.
+
+        :param      model   | <subclass of orb.Model>
+                    context | <orb.Context>
+                    fileobj | <file>
+                    format  | <str> | 'csv'
+
+        :return     <int> | number of rows written
+        """
+        if format != 'csv':
+            raise errors.InvalidCopyFormat(format)
+
+        writer = None
+        count = 0
+        for row in self.stream(model, context):
+            if writer is None:
+                writer = csv.DictWriter(fileobj, fieldnames=sorted(row.keys()))
+                writer.writeheader()
+
+            writer.writerow({k: v.encode('utf-8') if isinstance(v, unicode) else v for k, v in row.items()})
+            count += 1
+        return count
+
     @abstractmethod
     def count(self, model, context):
         """
@@ -142,6 +211,16 @@ class Connection(AddonManager):
         :return     <int> | number of rows removed
         """
 
+    def end(self, commit=True):
+        """
+        Ends the innermost transaction for the current thread, committing
+        or rolling back its changes.  Backends that do not support
+        transactions have nothing to end.
+
+        :param commit: <bool>
+        """
+        pass
+
     @abstractmethod
     def execute(self, command, data=None, flags=0):
         """
@@ -183,6 +262,15 @@ class Connection(AddonManager):
         :return     <bool> connected
         """
 
+    def metrics(self):
+        """
+        Returns the runtime metrics for this connection, such as connection
+        pool usage.  Backends that do not track metrics return an empty dict.
+
+        :return     <dict>
+        """
+        return {}
+
     @abstractmethod
     def open(self, force=False):
         """
@@ -214,6 +302,20 @@ class Connection(AddonManager):
         :return     [<variant> result, ..]
         """
 
+    def selectMany(self, queries):
+        """
+        Runs several independent queries, returning the results for each of
+        them in order.  Backends that are able to should combine the queries
+        to save round trips to the database, by default they are run one
+        after the other.
+
+        :param      queries | [(<str> 'records' || 'count', <subclass of orb.Model>, <orb.Context>), ..]
+
+        :return     [[{<str> column: <variant> value, ..}, ..] || <int>, ..]
+        """
+        return [self.count(model, context) if method == 'count' else self.select(model, context)
+                for method, model, context in queries]
+
     def setup(self, context):
         """
         Initializes the database with any additional information that is required.
@@ -235,6 +337,52 @@ class Connection(AddonManager):
         :return     <dict>
         """
 
+    def stream(self, model, context, size=1000):
+        """
+        Yields the records for the inputted model and context as they are
+        loaded from the backend.  Backends that do not support streaming will
+        load all of the records first.
+
+        :param      model   | <subclass of orb.Model>
+                    context | <orb.Context>
+                    size    | <int> | number of records to fetch at a time
+
+        :return     <generator>
+        """
+        for record in self.select(model, context) or []:
+            yield record
+
+    def upsert(self, records, index, columns, context):
+        """
+        Inserts the given records, matching any existing records by the unique
+        index.  Existing records have the given columns updated.  Backends that
+        do not support a native upsert will look up each record through the
+        index before saving it.
+
+        :param      records | [<orb.Model>, ..]
+                    index   | <orb.Index>
+                    columns | [<orb.Column>, ..]
+                    context | <orb.Context>
+
+        :return     [{<str> key: <variant>, ..} || None, ..] | stored row per record
+        """
+        rows = []
+        for record in records:
+            values = [record.get(col, inflated=False) for col in index.columns()]
+            existing = index(type(record), *values, db=context.db)
+            if existing is None:
+                existing = record
+            else:
+                for column in columns:
+                    existing.set(column, record.get(column))
+
+            if existing.isModified():
+                existing.save()
+
+            output_columns = [existing.schema().idColumn()] + index.columns()
+            rows.append({col.field(): existing.get(col, inflated=False) for col in output_columns})
+        return rows
+
     @abstractmethod
     def update(self, records, context):
         """
@@ -0,0 +1,304 @@
+"""
+Defines the caches that the SQL based backends use to avoid re-compiling the
+same statements over and over.
+"""
+
+import logging
+import threading
+
+from collections import OrderedDict
+from projex.lazymodule import lazy_import
+
+from .sqlstatement import SQLStatement
+
+log = logging.getLogger(__name__)
+orb = lazy_import('orb')
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping that holds onto a limited number of entries, removing
+    the least recently used entry when it is full.
+    """
+    def __init__(self, size=500):
+        self.__size = size
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        """
+        Removes all of the entries from this cache.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def get(self, key, default=None):
+        """
+        Returns the entry for the given key, marking it as the most recently
+        used one.
+
+        :param key: <hashable>
+        :param default: <variant>
+
+        :return: <variant>
+        """
+        with self.__lock:
+            try:
+                value = self.__entries.pop(key)
+            except KeyError:
+                self.__misses += 1
+                return default
+            else:
+                self.__hits += 1
+                self.__entries[key] = value
+                return value
+
+    def pop(self, key, default=None):
+        """
+        Removes the entry for the given key from this cache.
+
+        :param key: <hashable>
+        :param default: <variant>
+
+        :return: <variant>
+        """
+        with self.__lock:
+            return self.__entries.pop(key, default)
+
+    def set(self, key, value):
+        """
+        Stores the value for the given key, removing the least recently used
+        entry if this cache is full.
+
+        :param key: <hashable>
+        :param value: <variant>
+
+        :return: [(<hashable> key, <variant> value), ..] | removed entries
+        """
+        removed = []
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = value
+            while len(self.__entries) > max(self.__size, 0):
+                removed.append(self.__entries.popitem(last=False))
+        return removed
+
+    def size(self):
+        """
+        Returns the maximum number of entries for this cache.
+
+        :return: <int>
+        """
+        return self.__size
+
+    def stats(self):
+        """
+        Returns the usage statistics for this cache.
+
+        :return: {<str> key: <int> value, ..}
+        """
+        return {
+            'size': len(self.__entries),
+            'maxSize': self.__size,
+            'hits': self.__hits,
+            'misses': self.__misses
+        }
+
+
+class StatementCache(object):
+    """
+    Caches the SQL compiled for select statements by the shape of their
+    context and query, so that repeated queries which only differ by the
+    values they filter on are rendered once.  On a hit, only the values are
+    collected from the new query and bound to the cached SQL.
+    """
+    IgnoreOptions = {
+        'db',
+        'dryRun',
+        'force',
+        'format',
+        'inflated',
+        'page',
+        'pageSize',
+        'priority',
+        'returning',
+        'scope',
+        'where'
+    }
+
+    def __init__(self, size=500):
+        self.__entries = LRUCache(size)
+
+    def _freeze(self, value):
+        if isinstance(value, (list, tuple)):
+            return tuple(self._freeze(v) for v in value)
+        elif isinstance(value, set):
+            return frozenset(self._freeze(v) for v in value)
+        elif isinstance(value, dict):
+            return tuple(sorted((k, self._freeze(v)) for k, v in value.items()))
+        else:
+            hash(value)
+            return value
+
+    def _leaves(self, model, query):
+        # walks the query in the same order the WHERE statement renders it
+        if query is None:
+            return
+
+        query = query.expand(model)
+        if isinstance(query, orb.QueryCompound):
+            for sub_query in query:
+                for leaf in self._leaves(model, sub_query):
+                    yield leaf
+        elif query is not None:
+            yield query
+
+    def _shape(self, model, query):
+        if query is None:
+            return None
+
+        query = query.expand(model)
+        if isinstance(query, orb.QueryCompound):
+            return query.op(), tuple(self._shape(model, sub_query) for sub_query in query)
+        elif query is None:
+            return None
+
+        # collectors are rendered through their query filters
+        if not query.column(model):
+            raise TypeError('{0} is not a column'.format(query.columnName()))
+
+        value = query.value()
+        if isinstance(value, orb.Query):
+            kind = ('query', value.model(), value.columnName(), tuple(value.functions()))
+        elif isinstance(value, (orb.QueryCompound, orb.Collection)):
+            raise TypeError('sub-queries cannot be cached')
+        elif value is None:
+            kind = 'null'
+        elif isinstance(value, (list, tuple, set)) and not value:
+            kind = 'empty'
+        else:
+            kind = 'value'
+
+        return (query.model(),
+                query.columnName(),
+                query.op(),
+                query.caseSensitive(),
+                query.isInverted(),
+                tuple(query.functions()),
+                self._freeze(query.math()),
+                kind)
+
+    def _where(self, model, context):
+        where = context.where
+        if context.useBaseQuery:
+            base_where = model.baseQuery(context=context)
+            if base_where:
+                where = base_where & where
+        return where
+
+    def clear(self):
+        """
+        Removes all of the compiled statements from this cache.
+        """
+        self.__entries.clear()
+
+    def compile(self, statement, model, context):
+        """
+        Renders the given statement for the model and context, re-using the
+        SQL that was previously compiled for the same shape of query.
+
+        :param statement: <orb.core.connection_types.sql.SQLStatement>
+        :param model: <subclass of orb.Model>
+        :param context: <orb.Context>
+
+        :return: (<str> sql, <dict> data)
+        """
+        where = self._where(model, context)
+        key = self.key(statement, model, context, where)
+        if key is None:
+            with SQLStatement.scope():
+                return statement(model, context)
+
+        entry = self.__entries.get(key)
+
+        # compile the statement the first time this shape is seen
+        if entry is None:
+            with SQLStatement.scope() as keys:
+                sql, data = statement(model, context)
+
+            # only cache statements whose values can be re-bound from the query
+            leaves = list(self._leaves(model, where))
+            if len(leaves) == len(keys):
+                bound = [(value_key if value_key in data else None) for value_key in keys]
+                static = {k: v for k, v in data.items() if k not in keys}
+                self.__entries.set(key, (sql, static, bound))
+            else:
+                self.__entries.set(key, False)
+
+            return sql, data
+
+        # the shape cannot be re-bound
+        elif entry is False:
+            with SQLStatement.scope():
+                return statement(model, context)
+
+        # otherwise bind the new values to the compiled sql
+        else:
+            sql, static, keys = entry
+            WHERE = statement.byName('WHERE')
+
+            data = static.copy()
+            for leaf, value_key in zip(self._leaves(model, where), keys):
+                if value_key is not None:
+                    data[value_key] = WHERE.bindValue(leaf.op(), WHERE.convertValue(leaf.value()))
+
+            return sql, data
+
+    def key(self, statement, model, context, where=None):
+        """
+        Returns the cache key for the given statement, model and context.  If
+        the statement cannot be cached, then None is returned.
+
+        :param statement: <orb.core.connection_types.sql.SQLStatement>
+        :param model: <subclass of orb.Model>
+        :param context: <orb.Context>
+        :param where: <orb.Query> || <orb.QueryCompound> || None
+
+        :return: <tuple> || None
+        """
+        # expanded records render sub-queries that cannot be re-bound
+        schema = model.schema()
+        if context.expandtree(model) or any(col.shortcut() for col in context.schemaColumns(schema)):
+            return None
+
+        try:
+            options = tuple(sorted((k, self._freeze(v)) for k, v in context.raw_values.items()
+                                   if k not in self.IgnoreOptions))
+            return (statement,
+                    model,
+                    options,
+                    context.locale,
+                    context.start,
+                    context.limit,
+                    orb.system.settings().default_locale,
+                    self._shape(model, where))
+
+        except (TypeError, orb.errors.OrbError):
+            return None
+
+    def stats(self):
+        """
+        Returns the usage statistics for this cache.
+
+        :return: {<str> key: <int> value, ..}
+        """
+        return self.__entries.stats()
@@ -61,12 +61,15 @@ class MySQLConnection(SQLConnection):
             log.debug('***********************')
 
             try:
+                # like the other drivers, report the rowcount of the last
+                # statement, so that the translations removed or added
+                # alongside a record are not counted with it
                 rowcount = 0
                 for cmd in command.split(';'):
                     cmd = cmd.strip()
                     if cmd:
                         cursor.execute(cmd.strip(';') + ';', data)
-                        rowcount += cursor.rowcount
+                        rowcount = cursor.rowcount
 
             # look for a disconnection error
             except pymysql.InterfaceError:
@@ -74,7 +77,9 @@ class MySQLConnection(SQLConnection):
 
             # look for integrity errors
             except (pymysql.IntegrityError, pymysql.OperationalError) as err:
-                native.rollback()
+                # a pinned transaction is rolled back when it ends
+                if self._pinned() is not native:
+                    native.rollback()
 
                 # look for a duplicate error
                 if err[0] == 1062:
@@ -92,7 +97,8 @@ class MySQLConnection(SQLConnection):
 
             # connection has closed underneath the hood
             except pymysql.Error as err:
-                native.rollback()
+                if self._pinned() is not native:
+                    native.rollback()
                 log.error(traceback.print_exc())
                 raise orb.errors.QueryFailed(command, data, nstr(err))
 
@@ -104,7 +110,7 @@ class MySQLConnection(SQLConnection):
 
             return results, rowcount
 
-    def _open(self, db, writeAccess=False):
+    def _open(self, db, writeAccess=False, host=None):
         """
         Handles simple, SQL specific connection creation.  This will not
         have to manage thread information as it is already managed within
@@ -117,14 +123,19 @@ class MySQLConnection(SQLConnection):
         if not pymysql:
             raise orb.errors.BackendNotFound('psycopg2 is not installed.')
 
+        kwds = {}
+        if db.applicationName():
+            kwds['program_name'] = db.applicationName()
+
         # create the python connection
         try:
             return pymysql.connect(db=db.name(),
                                    user=db.username(),
                                    passwd=db.password(),
-                                   host=(db.writeHost() if writeAccess else db.host()) or 'localhost',
+                                   host=host or (db.writeHost() if writeAccess else db.host()) or 'localhost',
                                    port=db.port() or 3306,
-                                   cursorclass=pymysql.cursors.DictCursor)
+                                   cursorclass=pymysql.cursors.DictCursor,
+                                   **kwds)
         except pymysql.OperationalError as err:
             log.exception('Failed to connect to postgres')
             raise orb.errors.ConnectionFailed()
@@ -141,6 +152,75 @@ class MySQLConnection(SQLConnection):
         except pymysql.Error:
             pass
 
+    def _ping(self, native):
+        """
+        Checks whether or not the given native connection is still alive.
+
+        :param native: <pymysql.Connection>
+
+        :return: <bool>
+        """
+        try:
+            native.ping(reconnect=False)
+        except pymysql.Error:
+            return False
+        else:
+            return True
+
+    def _stream(self, native, command, data, size, mapper=dict):
+        """
+        Executes the given select command through an unbuffered cursor so that
+        rows are read from the server as they are fetched.
+
+        :param      native  | <pymysql.Connection>
+                    command | <str>
+                    data    | <dict>
+                    size    | <int>
+                    mapper  | <variant>
+
+        :return     <generator> of [{<str> key: <variant>, ..}, ..]
+        """
+        log.debug('***********************')
+        log.debug(command % data)
+        log.debug('***********************')
+
+        cursor = native.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            try:
+                cursor.execute(command.strip().strip(';') + ';', data)
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    yield [mapper(row) for row in rows]
+
+            except pymysql.InterfaceError:
+                raise orb.errors.ConnectionLost()
+            except pymysql.Error as err:
+                raise orb.errors.QueryFailed(command, data, nstr(err))
+        finally:
+            try:
+                cursor.close()
+            except pymysql.Error:
+                pass
+
+    def _replicationLag(self, native):
+        """
+        Returns the number of seconds the given replica is behind its master.
+
+        :param native: <pymysql.Connection>
+
+        :return: <float> || None
+        """
+        try:
+            with native.cursor() as cursor:
+                cursor.execute('SHOW SLAVE STATUS;')
+                status = cursor.fetchone()
+        except pymysql.Error:
+            return None
+        else:
+            return (status or {}).get('Seconds_Behind_Master')
+
     def schemaInfo(self, context):
         info = super(MySQLConnection, self).schemaInfo(context)
         for v in info.values():
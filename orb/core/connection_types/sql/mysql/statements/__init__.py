@@ -10,4 +10,5 @@ from . import schema_info
 from . import select
 from . import select_count
 from . import update
+from . import upsert
 from . import where
\ No newline at end of file
@@ -6,7 +6,7 @@ orb = lazy_import('orb')
 
 
 class DELETE(MySQLStatement):
-    def __call__(self, records, data=None):
+    def __call__(self, records, data=None, limit=None):
         # delete based on the collection's context
         if isinstance(records, orb.Collection) and not records.isLoaded():
             model = records.model()
@@ -22,19 +22,26 @@ class DELETE(MySQLStatement):
                 'namespace': model.schema().namespace() or context.db.name(),
                 'table': model.schema().dbname(),
                 'id_col': model.schema().idColumn().field(),
-                'where': 'WHERE {0}'.format(where) if where else ''
+                'where': 'WHERE {0}'.format(where) if where else '',
+                'limit': u'ORDER BY `{0}` LIMIT {1}'.format(model.schema().idColumn().field(), limit) if limit else ''
             }
             sql = (
                 u'DELETE FROM `{namespace}`.`{table}`\n'
-                u'{where};'
+                u'{where}\n'
+                u'{limit};'
             ).format(**sql_options)
 
+            # MySQL does not support limits within IN sub-queries, so the
+            # chunk of ids is selected through a derived table
             if model.schema().columns(flags=orb.Column.Flags.I18n):
                 i18n_sql = (
                     u'DELETE FROM `{namespace}`.`{table}_i18n`\n'
                     u'WHERE `{table}_id` IN (\n'
-                    u'    SELECT `{id_col}` FROM {table}'
-                    u'    {where}'
+                    u'    SELECT `{id_col}` FROM (\n'
+                    u'        SELECT `{id_col}` FROM `{namespace}`.`{table}`\n'
+                    u'        {where}\n'
+                    u'        {limit}\n'
+                    u'    ) AS `orb_chunk`\n'
                     u');\n'
                 ).format(**sql_options)
                 sql = i18n_sql + sql
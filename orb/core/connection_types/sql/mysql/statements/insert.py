@@ -68,13 +68,14 @@ class INSERT(MySQLStatement):
                     schema.dbname(),
                     cols
                 )
-                for value in values[:-1]:
-                    subcmd += '\n({0}),'.format(value)
-                subcmd += '\n({0});'.format(values[-1])
+                subcmd += '\n' + ',\n'.join('({0})'.format(value) for value in values) + ';'
             elif columns['i18n']:
-                subcmd += '\nINSERT INTO `{0}`.`{1}` DEFAULT VALUES;'.format(
+                # add every row in one statement, so LAST_INSERT_ID() is
+                # the id of the first one
+                subcmd += '\nINSERT INTO `{0}`.`{1}` () VALUES {2};'.format(
                     schema.namespace() or default_namespace,
-                    schema.dbname()
+                    schema.dbname(),
+                    ', '.join('()' for _ in schema_records[schema]['i18n'])
                 )
 
             if columns['i18n']:
@@ -85,28 +86,27 @@ class INSERT(MySQLStatement):
                     schema.dbname(),
                     cols
                 )
-                for i, value in enumerate(values[:-1]):
+                rows = []
+                for i, value in enumerate(values):
                     value_key = '{0}_{1}'.format(id_column.field(), i)
-                    id_value = data[value_key]
+                    id_value = data.get(value_key, 'DEFAULT')
                     if id_value == 'DEFAULT':
-                        id_value = 'LAST_INSERT_ID() - {0}'.format(len(values) - (i+1))
-
-                    subcmd += '\n({0}, %(locale)s, {1}),'.format(id_value, value)
+                        id_value = 'LAST_INSERT_ID() + {0}'.format(i)
+                    else:
+                        id_value = '%({0})s'.format(value_key)
 
-                value_key = '{0}_{1}'.format(id_column.field(), i)
-                id_value = data[value_key]
-                if id_value == 'DEFAULT':
-                    id_value = 'LAST_INSERT_ID()'
+                    rows.append('({0}, %(locale)s, {1})'.format(id_value, value))
 
-                subcmd += '\n({0}, %(locale)s, {1});'.format(id_value, values[-1])
+                subcmd += '\n' + ',\n'.join(rows) + ';'
 
             cmd.append(subcmd)
 
             if schema.idColumn().testFlag(orb.Column.Flags.AutoAssign):
-                cmd.append('SELECT * FROM `{1}`.`{2}` WHERE `{0}` >= LAST_INSERT_ID();'.format(
+                cmd.append('SELECT * FROM `{1}`.`{2}` WHERE `{0}` >= LAST_INSERT_ID() ORDER BY `{0}` LIMIT {3};'.format(
                     id_column.field(),
                     id_column.schema().namespace() or default_namespace,
-                    id_column.schema().dbname()
+                    id_column.schema().dbname(),
+                    len(schema_records[schema]['standard'] or schema_records[schema]['i18n'])
                 ))
 
         return '\n'.join(cmd), data
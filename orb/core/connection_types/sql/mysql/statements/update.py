@@ -1,5 +1,4 @@
-import os
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from projex.lazymodule import lazy_import
 from ..mysqlconnection import MySQLStatement
 
@@ -11,75 +10,144 @@ class UPDATE(MySQLStatement):
         sql = []
         data = {}
 
-        for record in records:
-            if record.isRecord():
-                changes = record.changes()
-                if changes:
-                    sub_sql, sub_data = self.generateCommand(record, changes)
-                    sql.append(sub_sql)
-                    data.update(sub_data)
+        # group the records that share the same set of changes so that each
+        # group can be updated with a single statement
+        standard = OrderedDict()
+        i18n = OrderedDict()
 
-        return u'\n'.join(sql), data
+        for record in records:
+            if not record.isRecord():
+                continue
 
-    def generateCommand(self, record, changes):
-        data = {}
-        standard_values = []
+            changes = record.changes()
+            if not changes:
+                continue
 
-        i18n_fields = defaultdict(list)
-        i18n_values = defaultdict(list)
-        i18n_keys = defaultdict(list)
+            schema = record.schema()
+            columns = sorted((col for col in changes if not col.testFlag(col.Flags.Virtual)),
+                             key=lambda x: x.field())
 
-        for column in changes:
-            if column.testFlag(column.Flags.Virtual):
-                continue
+            standard_columns = tuple(col for col in columns if not col.testFlag(col.Flags.I18n))
+            if standard_columns:
+                standard.setdefault((schema, standard_columns), []).append(record)
 
-            if column.testFlag(column.Flags.I18n):
-                for record_locale, value in record.get(column, locale='all').items():
-                    value_key = '{0}_{1}'.format(column.field(), os.urandom(4).encode('hex'))
-                    data[value_key] = column.dbStore('MySQL', value)
-                    i18n_values[record_locale].append(u'`{0}` = %({1})s'.format(column.field(), value_key))
-                    i18n_fields[record_locale].append(u'`{0}`'.format(column.field()))
-                    i18n_keys[record_locale].append(u'%({0})s'.format(value_key))
-            else:
-                value_key = '{0}_{1}'.format(column.field(), os.urandom(4).encode('hex'))
-                data[value_key] = column.dbStore('MySQL', record.get(column))
-                standard_values.append('`{0}` = %({1})s'.format(column.field(), value_key))
+            locale_values = defaultdict(dict)
+            for column in columns:
+                if column.testFlag(column.Flags.I18n):
+                    for record_locale, value in record.get(column, locale='all').items():
+                        locale_values[record_locale][column] = value
 
+            for record_locale, values in locale_values.items():
+                i18n_columns = tuple(col for col in columns if col in values)
+                row = (record, record_locale, [values[col] for col in i18n_columns])
+                i18n.setdefault((schema, i18n_columns), []).append(row)
 
-        id_key = 'id_' + os.urandom(4).encode('hex')
-        data[id_key] = record.get(record.schema().idColumn())
-        context = record.context()
+        for (schema, columns), group in standard.items():
+            sub_sql, sub_data = self.updateRecords(schema, columns, group)
+            sql.append(sub_sql)
+            data.update(sub_data)
 
-        sql = []
-        if standard_values:
-            standard_sql = (
-                u'UPDATE `{namespace}`.`{table}`\n'
-                u'SET {values}\n'
-                u'WHERE `{namespace}`.`{table}`.`{field}` = %({id})s;'
-            ).format(table=record.schema().dbname(),
-                     namespace=record.schema().namespace() or context.db.name(),
-                     id=id_key,
-                     values=', '.join(standard_values),
-                     field=record.schema().idColumn().field())
-            sql.append(standard_sql)
-
-        if i18n_fields:
-            for locale in i18n_values:
-                i18n_sql = (
-                    u'INSERT INTO `{namespace}`.`{table}_i18n` (`{table}_id`, `locale`, {fields})\n'
-                    u'VALUES (%({id})s, \'{locale}\', {keys})'
-                    u'ON DUPLICATE KEY UPDATE {values};\n'
-                ).format(table=record.schema().dbname(),
-                         namespace=record.schema().namespace() or context.db.name(),
-                         id=id_key,
-                         locale=locale,
-                         values=', '.join(i18n_values[locale]),
-                         keys=', '.join(i18n_keys[locale]),
-                         fields=', '.join(i18n_fields[locale]))
-                sql.append(i18n_sql)
+        for (schema, columns), rows in i18n.items():
+            sub_sql, sub_data = self.upsertTranslations(schema, columns, rows)
+            sql.append(sub_sql)
+            data.update(sub_data)
 
         return u'\n'.join(sql), data
 
+    def updateRecord(self, schema, columns, record):
+        data = {}
+        values = []
+
+        for column in columns:
+            value_key = self.valueKey(column.field())
+            data[value_key] = column.dbStore('MySQL', record.get(column))
+            values.append(u'`{0}` = %({1})s'.format(column.field(), value_key))
+
+        id_key = self.valueKey('id')
+        data[id_key] = record.get(schema.idColumn())
+
+        sql = (
+            u'UPDATE `{namespace}`.`{table}`\n'
+            u'SET {values}\n'
+            u'WHERE `{namespace}`.`{table}`.`{field}` = %({id})s;'
+        ).format(table=schema.dbname(),
+                 namespace=schema.namespace() or record.context().db.name(),
+                 id=id_key,
+                 values=', '.join(values),
+                 field=schema.idColumn().field())
+
+        return sql, data
+
+    def updateRecords(self, schema, columns, records):
+        id_column = schema.idColumn()
+
+        # changing the id of a record needs to match on its old id
+        if len(records) == 1 or id_column in columns:
+            sql = []
+            data = {}
+            for record in records:
+                sub_sql, sub_data = self.updateRecord(schema, columns, record)
+                sql.append(sub_sql)
+                data.update(sub_data)
+            return u'\n'.join(sql), data
+
+        data = {}
+        id_keys = []
+        cases = defaultdict(list)
+        for record in records:
+            id_key = self.valueKey('id')
+            data[id_key] = record.get(id_column)
+            id_keys.append(id_key)
+
+            for column in columns:
+                value_key = self.valueKey(column.field())
+                data[value_key] = column.dbStore('MySQL', record.get(column))
+                cases[column].append(u'WHEN %({0})s THEN %({1})s'.format(id_key, value_key))
+
+        values = [u'`{0}` = CASE `{1}` {2} ELSE `{0}` END'.format(column.field(),
+                                                                 id_column.field(),
+                                                                 ' '.join(cases[column]))
+                  for column in columns]
+
+        sql = (
+            u'UPDATE `{namespace}`.`{table}`\n'
+            u'SET {values}\n'
+            u'WHERE `{namespace}`.`{table}`.`{field}` IN ({ids});'
+        ).format(table=schema.dbname(),
+                 namespace=schema.namespace() or records[0].context().db.name(),
+                 values=',\n    '.join(values),
+                 field=id_column.field(),
+                 ids=', '.join(u'%({0})s'.format(key) for key in id_keys))
+
+        return sql, data
+
+    def upsertTranslations(self, schema, columns, rows):
+        data = {}
+        values = []
+
+        for record, record_locale, record_values in rows:
+            keys = [self.valueKey('id'), self.valueKey('locale')]
+            data[keys[0]] = record.get(schema.idColumn())
+            data[keys[1]] = record_locale
+
+            for column, value in zip(columns, record_values):
+                value_key = self.valueKey(column.field())
+                data[value_key] = column.dbStore('MySQL', value)
+                keys.append(value_key)
+
+            values.append(u'({0})'.format(', '.join(u'%({0})s'.format(key) for key in keys)))
+
+        sql = (
+            u'INSERT INTO `{namespace}`.`{table}_i18n` (`{table}_id`, `locale`, {fields})\n'
+            u'VALUES {values}\n'
+            u'ON DUPLICATE KEY UPDATE {updates};'
+        ).format(table=schema.dbname(),
+                 namespace=schema.namespace() or rows[0][0].context().db.name(),
+                 fields=', '.join(u'`{0}`'.format(column.field()) for column in columns),
+                 values=',\n       '.join(values),
+                 updates=', '.join(u'`{0}` = VALUES(`{0}`)'.format(column.field()) for column in columns))
+
+        return sql, data
 
 
 MySQLStatement.registerAddon('UPDATE', UPDATE())
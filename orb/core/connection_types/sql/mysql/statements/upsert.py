@@ -0,0 +1,72 @@
+from projex.lazymodule import lazy_import
+from ..mysqlconnection import MySQLStatement
+
+orb = lazy_import('orb')
+
+
+class UPSERT(MySQLStatement):
+    def __call__(self, records, index, columns=None):
+        """
+        Inserts the given records, matching existing records by the columns
+        of the unique index.  When a record already exists, the given columns
+        are updated, otherwise the existing record is left as it is.  Either
+        way, the stored row for every record is returned.
+
+        MySQL does not accept a conflict target, so a conflict on any unique
+        key of the table will be treated as an existing record.
+
+        :param records: [<orb.Model>, ..]
+        :param index: <orb.Index>
+        :param columns: [<orb.Column>, ..] || None
+
+        :return: <str> sql, <dict> data
+        """
+        if isinstance(records, orb.Collection):
+            records = records.records()
+
+        schema = index.schema()
+        index_columns = index.columns()
+        insert_columns = [col for col in schema.columns().values()
+                          if not col.testFlag(col.Flags.Virtual) and
+                          not col.testFlag(col.Flags.I18n) and
+                          not col.testFlag(col.Flags.AutoAssign)]
+
+        data = {}
+        values = []
+        lookups = []
+        for record in records:
+            keys = {}
+            for column in insert_columns:
+                value_key = self.valueKey(column.field())
+                data[value_key] = column.dbStore('MySQL', record.get(column))
+                keys[column] = value_key
+
+            values.append(u'({0})'.format(', '.join(u'%({0})s'.format(keys[col]) for col in insert_columns)))
+            lookups.append(u'({0})'.format(', '.join(u'%({0})s'.format(keys[col]) for col in index_columns)))
+
+        if columns:
+            updates = [u'`{0}` = VALUES(`{0}`)'.format(col.field()) for col in columns]
+        else:
+            updates = [u'`{0}` = `{0}`'.format(col.field()) for col in index_columns[:1]]
+
+        namespace = schema.namespace() or orb.Context().db.name()
+
+        # read back the stored rows, as MySQL cannot return them from the insert
+        sql = (
+            u'INSERT INTO `{namespace}`.`{table}` ({fields})\n'
+            u'VALUES {values}\n'
+            u'ON DUPLICATE KEY UPDATE {updates};\n'
+            u'SELECT * FROM `{namespace}`.`{table}`\n'
+            u'WHERE ({target}) IN ({lookups});'
+        ).format(namespace=namespace,
+                 table=schema.dbname(),
+                 fields=', '.join(u'`{0}`'.format(col.field()) for col in insert_columns),
+                 values=',\n       '.join(values),
+                 updates=', '.join(updates),
+                 target=', '.join(u'`{0}`'.format(col.field()) for col in index_columns),
+                 lookups=', '.join(lookups))
+
+        return sql, data
+
+
+MySQLStatement.registerAddon('UPSERT', UPSERT())
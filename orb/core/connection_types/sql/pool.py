@@ -0,0 +1,418 @@
+"""
+Defines the connection pool that the SQL based backends use to manage their
+native connections for a single host.
+"""
+
+import bisect
+import itertools
+import logging
+import threading
+import time
+
+from collections import deque
+from projex.lazymodule import lazy_import
+from Queue import Empty
+
+log = logging.getLogger(__name__)
+orb = lazy_import('orb')
+
+
+class ConnectionPool(object):
+    """
+    Manages the native connections for a single host of a SQL connection.  Idle
+    connections are validated when they are borrowed and recycled once they
+    have lived or idled past the limits defined on the database, and the pool
+    keeps running counters so its saturation can be monitored.
+
+    When the pool is full, requests wait in line ordered by their priority
+    (lower values are served first) and then by their arrival.  Returned
+    connections are handed directly to the first request in line.
+    """
+    WaitBuckets = (1, 5, 10, 50, 100, 500, 1000, 5000)  # msecs
+
+    def __init__(self,
+                 connection,
+                 host=None,
+                 writeAccess=False,
+                 queueType=None,
+                 maxSize=10,
+                 minSize=0,
+                 maxAge=0,
+                 maxIdle=0,
+                 prePing=False,
+                 timeout=None,
+                 maxWaiters=0):
+        if queueType is None:
+            from Queue import Queue as queueType
+
+        # define custom properties
+        self.__connection = connection
+        self.__host = host
+        self.__writeAccess = writeAccess
+        self.__queueType = queueType
+        self.__maxSize = maxSize
+        self.__minSize = minSize
+        self.__maxAge = maxAge
+        self.__maxIdle = maxIdle
+        self.__prePing = prePing
+        self.__timeout = timeout
+        self.__maxWaiters = maxWaiters
+
+        self.__lock = threading.Lock()
+        self.__idle = deque()
+        self.__waiters = []
+        self.__counter = itertools.count()
+        self.__info = {}
+        self.__size = 0
+        self.__invalidated = 0
+        self.__warmed = False
+
+        # define the metric counters
+        self.__created = 0
+        self.__recycled = 0
+        self.__discarded = 0
+        self.__timeouts = 0
+        self.__rejected = 0
+        self.__waits = 0
+        self.__waitTimes = [0] * (len(self.WaitBuckets) + 1)
+
+    def __len__(self):
+        return self.__size
+
+    def _create(self):
+        """
+        Creates a new native connection for this pool.  The slot for the
+        connection must already be reserved by the caller.
+
+        :return: <variant>
+        """
+        try:
+            native = self.__connection._connect(writeAccess=self.__writeAccess, host=self.__host)
+        except Exception:
+            self._release()
+            raise
+        else:
+            now = time.time()
+            with self.__lock:
+                self.__info[native] = {'created': now, 'used': now}
+                self.__created += 1
+            return native
+
+    def _expired(self, native):
+        """
+        Returns whether or not the given connection has outlived the maximum
+        age or idle time for this pool.
+
+        :param native: <variant>
+
+        :return: <bool>
+        """
+        info = self.__info.get(native)
+        if info is None:
+            return True
+
+        now = time.time()
+        if self.__maxAge and now - info['created'] > self.__maxAge:
+            return True
+        elif self.__maxIdle and now - info['used'] > self.__maxIdle:
+            return True
+        else:
+            return False
+
+    def _recordWait(self, msecs):
+        for i, bucket in enumerate(self.WaitBuckets):
+            if msecs <= bucket:
+                break
+        else:
+            i = len(self.WaitBuckets)
+
+        with self.__lock:
+            self.__waits += 1
+            self.__waitTimes[i] += 1
+
+    def _release(self):
+        """
+        Releases a slot within the pool, notifying the first waiting request
+        that it can create a new connection.
+        """
+        with self.__lock:
+            self.__size -= 1
+            if self.__waiters:
+                self.__waiters.pop(0)[-1].put(None)
+
+    def _remove(self, native):
+        """
+        Removes the given connection from this pool, releasing its slot.
+
+        :param native: <variant>
+        """
+        with self.__lock:
+            removed = self.__info.pop(native, None) is not None
+
+        if removed:
+            self._release()
+
+        try:
+            self.__connection._close(native)
+        except Exception:
+            pass
+
+    def _reserve(self):
+        """
+        Reserves a slot for a new connection, returning False when the pool
+        is already at its maximum size.
+
+        :return: <bool>
+        """
+        with self.__lock:
+            if self.__size < self.__maxSize:
+                self.__size += 1
+                return True
+            else:
+                return False
+
+    def _validate(self, native):
+        """
+        Validates an idle connection before handing it out, recycling it if it
+        has expired and pinging it if pre-ping is enabled or the pool was
+        invalidated since it was last used.
+
+        :param native: <variant>
+
+        :return: <bool> valid
+        """
+        conn = self.__connection
+
+        if self._expired(native):
+            self._remove(native)
+            with self.__lock:
+                self.__recycled += 1
+            return False
+
+        info = self.__info[native]
+        if conn._closed(native) or ((self.__prePing or info['used'] <= self.__invalidated) and
+                                    not conn._ping(native)):
+            self.discard(native)
+            return False
+        else:
+            return True
+
+    def _acquire(self, priority, order):
+        """
+        Takes an idle connection or reserves a slot for a new one, otherwise
+        gets in line for a connection to be returned.  This is all done while
+        holding the lock, so a connection that is checked in at the same time
+        is either taken here or handed off to the new waiter.
+
+        :param priority: <int>
+        :param order: <int>
+
+        :return: (<variant> || None, <bool> reserved, <list> || None waiter)
+        """
+        with self.__lock:
+            if self.__idle:
+                return self.__idle.popleft(), False, None
+            elif self.__size < self.__maxSize:
+                self.__size += 1
+                return None, True, None
+            elif self.__maxWaiters and len(self.__waiters) >= self.__maxWaiters:
+                self.__rejected += 1
+                raise orb.errors.PoolExhausted(self.__host, len(self.__waiters))
+            else:
+                waiter = [priority, order, self.__queueType(maxsize=1)]
+                bisect.insort(self.__waiters, waiter)
+                return None, False, waiter
+
+    def _wait(self, waiter, deadline):
+        """
+        Waits in line for a connection to be returned to the pool.  This will
+        return the connection that was handed off, or None if a slot was freed
+        up for a new connection instead.  If the deadline passes first, the
+        Empty error is raised.
+
+        :param waiter: <list> | as queued by _acquire
+        :param deadline: <float> || None
+
+        :return: <variant> || None
+        """
+        timeout = None if deadline is None else max(deadline - time.time(), 0)
+        try:
+            return waiter[-1].get(timeout=timeout)
+        except Empty:
+            with self.__lock:
+                try:
+                    self.__waiters.remove(waiter)
+                except ValueError:
+                    handed_off = True
+                else:
+                    handed_off = False
+                    self.__timeouts += 1
+
+            # a connection may have been handed off while timing out
+            if handed_off:
+                return waiter[-1].get()
+            else:
+                raise
+
+    def checkin(self, native):
+        """
+        Returns the given connection back to the pool.  Closed connections
+        are dropped from the pool.
+
+        :param native: <variant>
+        """
+        if native not in self.__info:
+            return
+        elif self.__connection._closed(native):
+            self.discard(native)
+        else:
+            self.__info[native]['used'] = time.time()
+            with self.__lock:
+                if self.__waiters:
+                    self.__waiters.pop(0)[-1].put(native)
+                else:
+                    self.__idle.append(native)
+
+    def checkout(self, priority=0, timeout=None):
+        """
+        Borrows a valid connection from the pool, creating a new one when
+        there is no idle connection and the pool has room, otherwise waiting
+        in line for one to be returned.  If no connection becomes available
+        within the timeout, a PoolTimeout error is raised.
+
+        :param priority: <int> | lower values are served first
+        :param timeout: <float> || None | seconds, defaults to the pool timeout
+
+        :return: <variant>
+        """
+        if not self.__warmed:
+            self.warm()
+
+        if timeout is None:
+            timeout = self.__timeout
+
+        deadline = time.time() + timeout if timeout else None
+        order = next(self.__counter)
+        waited = None
+        native = None
+
+        while True:
+            # re-use an idle connection, create a new one or get in line
+            if native is None:
+                native, reserved, waiter = self._acquire(priority, order)
+
+                if reserved:
+                    native = self._create()
+                    break
+
+                # wait for a connection to be returned
+                elif waiter is not None:
+                    if waited is None:
+                        log.warning('Waiting for connection to database!!!')
+                        waited = time.time()
+
+                    try:
+                        native = self._wait(waiter, deadline)
+                    except Empty:
+                        self._recordWait((time.time() - waited) * 1000)
+                        raise orb.errors.PoolTimeout(self.__host, int(timeout * 1000))
+
+            if native is not None:
+                if self._validate(native):
+                    break
+                else:
+                    native = None
+
+        if waited is not None:
+            self._recordWait((time.time() - waited) * 1000)
+
+        return native
+
+    def close(self):
+        """
+        Closes all of the idle connections within this pool.  Connections that
+        are currently checked out will be dropped when they are returned.
+        """
+        with self.__lock:
+            idle = list(self.__idle)
+            self.__idle.clear()
+
+        for native in idle:
+            self._remove(native)
+
+        self.__warmed = False
+
+    def discard(self, native):
+        """
+        Removes a broken connection from the pool.
+
+        :param native: <variant>
+        """
+        if native in self.__info:
+            self._remove(native)
+            with self.__lock:
+                self.__discarded += 1
+
+    def host(self):
+        """
+        Returns the host that this pool connects to.
+
+        :return: <str>
+        """
+        return self.__host
+
+    def invalidate(self):
+        """
+        Marks all of the currently idle connections as suspect, forcing them to
+        be pinged the next time they are borrowed.  This is called when a
+        connection to the host is lost, as the others are likely lost as well.
+        """
+        self.__invalidated = time.time()
+
+    def isConnected(self):
+        """
+        Returns whether or not there are any open connections within this pool.
+
+        :return: <bool>
+        """
+        return self.__size > 0
+
+    def metrics(self):
+        """
+        Returns the current metrics for this pool.
+
+        :return: <dict>
+        """
+        with self.__lock:
+            idle = len(self.__idle)
+            histogram = zip([str(b) for b in self.WaitBuckets] + ['inf'], self.__waitTimes)
+
+            return {
+                'host': self.__host,
+                'size': self.__size,
+                'maxSize': self.__maxSize,
+                'idle': idle,
+                'checkedOut': self.__size - idle,
+                'waiting': len(self.__waiters),
+                'created': self.__created,
+                'recycled': self.__recycled,
+                'discarded': self.__discarded,
+                'rejected': self.__rejected,
+                'timeouts': self.__timeouts,
+                'waits': self.__waits,
+                'waitTimes': dict(histogram)
+            }
+
+    def warm(self):
+        """
+        Fills the pool with connections up to the minimum size.
+        """
+        self.__warmed = True
+        while len(self) < self.__minSize and self._reserve():
+            try:
+                native = self._create()
+            except Exception:
+                log.exception('Failed to warm the connection pool')
+                break
+            else:
+                self.checkin(native)
@@ -1,9 +1,11 @@
 """ Defines the backend connection class for PostgreSQL databases. """
 
 import datetime
+import itertools
 import logging
 import os
 import orb
+import projex.iters
 import re
 import traceback
 
@@ -18,14 +20,15 @@ try:
     import psycopg2 as pg
     import psycopg2.extensions as pg_ext
 
-    from psycopg2.extras import DictCursor, register_hstore, register_json
+    from psycopg2.extras import DictCursor, HstoreAdapter, register_default_json, register_hstore
 
 except ImportError:
     log.debug('For PostgreSQL backend, download the psycopg2 module')
 
     DictCursor = None
+    HstoreAdapter = None
+    register_default_json = None
     register_hstore = None
-    register_json = None
     pg = None
     pg_ext = None
 
@@ -34,6 +37,104 @@ else:
     pg_ext.register_type(pg_ext.UNICODE)
     pg_ext.register_type(pg_ext.UNICODEARRAY)
 
+FORMAT_EXPR = re.compile('%\(([^\)]+)\)s')
+IDENTIFIER_EXPR = re.compile('^[a-zA-Z_][a-zA-Z0-9_$]*$')
+
+
+def copy_value(value):
+    """
+    Encodes the given value for the text format of a COPY statement.
+
+    :param      value | <variant>
+
+    :return     <str>
+    """
+    if value is None:
+        return '\\N'
+    elif isinstance(value, bool):
+        return 't' if value else 'f'
+    elif isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif not isinstance(value, basestring):
+        value = unicode(value)
+
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+
+def quote_identifier(name):
+    """
+    Quotes the given identifier, unless it is already quoted or is a plain
+    name that does not need to be.
+
+    :param      name | <str>
+
+    :return     <str>
+    """
+    name = name.strip()
+    if IDENTIFIER_EXPR.match(name) or name == '$user' or (len(name) > 1 and name.startswith('"') and name.endswith('"')):
+        return name
+    else:
+        return u'"{0}"'.format(name.replace('"', '""'))
+
+
+class CopyBuffer(object):
+    """
+    Exposes an iterable of COPY lines as a readable file, so that rows are
+    only encoded as the server asks for them rather than all up front.
+    """
+    def __init__(self, lines):
+        self.__lines = iter(lines)
+        self.__buffer = ''
+        self.__count = 0
+
+    def count(self):
+        """
+        Returns the number of lines that have been read from this buffer.
+
+        :return     <int>
+        """
+        return self.__count
+
+    def read(self, size=-1):
+        chunks = [self.__buffer]
+        length = len(self.__buffer)
+        while size < 0 or length < size:
+            try:
+                line = next(self.__lines)
+            except StopIteration:
+                break
+            else:
+                chunks.append(line)
+                length += len(line)
+                self.__count += 1
+
+        data = ''.join(chunks)
+        if size < 0:
+            self.__buffer = ''
+            return data
+        else:
+            self.__buffer = data[size:]
+            return data[:size]
+
+    def readline(self, size=-1):
+        if self.__buffer:
+            line, self.__buffer = self.__buffer, ''
+            return line
+
+        try:
+            line = next(self.__lines)
+        except StopIteration:
+            return ''
+        else:
+            self.__count += 1
+            return line
+
 
 # ----------------------------------------------------------------------
 
@@ -47,10 +148,61 @@ class PSQLConnection(SQLConnection):
     Creates a PostgreSQL backend connection type for handling database
     connections to PostgreSQL databases.
     """
+    def __init__(self, *args, **kwds):
+        super(PSQLConnection, self).__init__(*args, **kwds)
+
+        # the hstore type oids are looked up once per database
+        self.__hstoreOids = None
+        self.__prepareCounter = itertools.count(1)
 
     # ----------------------------------------------------------------------
     # PROTECTED METHODS
     # ----------------------------------------------------------------------
+    def _deallocate(self, native, handle):
+        """
+        Releases the given prepared statement from the connection.
+
+        :param native: <psycopg2.connection>
+        :param handle: (<str> name, <str> command)
+        """
+        try:
+            cursor = native.cursor()
+            cursor.execute('DEALLOCATE {0};'.format(handle[0]))
+        except pg.Error:
+            log.debug('Failed to deallocate {0}'.format(handle[0]))
+
+    def _executeMany(self, native, commands):
+        """
+        Folds several independent select commands into a single statement,
+        where each command becomes a scalar sub-query aggregating its rows
+        with json_agg, so they are all run in one round trip.  The rows come
+        back in their JSON form, which the columns restore the same way as
+        they do for expanded records.
+
+        :param      native   | <psycopg2.connection>
+                    commands | [(<str> sql, <dict> data), ..]
+
+        :return     [[{<str> key: <variant>, ..}, ..], ..]
+        """
+        if len(commands) < 2:
+            return super(PSQLConnection, self)._executeMany(native, commands)
+
+        fields = []
+        batch_data = {}
+        for i, (sql, data) in enumerate(commands):
+            prefix = 'many{0}_'.format(i)
+            sql = FORMAT_EXPR.sub(lambda x: '%({0}{1})s'.format(prefix, x.group(1)), sql.strip().rstrip(';'))
+            batch_data.update({prefix + key: value for key, value in data.items()})
+
+            # the sub-query is only scanned, so json_agg keeps its order
+            fields.append((
+                u'(SELECT COALESCE(json_agg("orb_many_{0}"), \'[]\'::json) '
+                u'FROM ({1}) AS "orb_many_{0}") AS "many_{0}"'
+            ).format(i, sql))
+
+        rows, _ = self._execute(native, u'SELECT {0};'.format(', '.join(fields)), batch_data)
+        return [rows[0]['many_{0}'.format(i)] for i in xrange(len(commands))]
+
     def _execute(self,
                  native,
                  command,
@@ -72,19 +224,6 @@ class PSQLConnection(SQLConnection):
             data = {}
 
         cursor = native.cursor(cursor_factory=DictCursor)
-
-        # register the hstore option
-        try:
-            register_hstore(cursor, unicode=True)
-        except pg.ProgrammingError:
-            log.warning('HSTORE is not supported in this version of Postgres!')
-
-        # register the json option
-        try:
-            register_json(cursor)
-        except pg.ProgrammingError:
-            log.warning('JSON is not supported in this version of Postgres!')
-
         start = datetime.datetime.now()
 
         log.debug('***********************')
@@ -97,10 +236,12 @@ class PSQLConnection(SQLConnection):
 
         # look for a cancelled query
         except pg_ext.QueryCanceledError as cancelled:
-            try:
-                native.rollback()
-            except StandardError as err:
-                log.error('Rollback error: {0}'.format(err))
+            # a pinned transaction is rolled back when it ends
+            if self._pinned() is not native:
+                try:
+                    native.rollback()
+                except StandardError as err:
+                    log.error('Rollback error: {0}'.format(err))
             log.critical(command)
             if data:
                 log.critical(str(data))
@@ -117,10 +258,11 @@ class PSQLConnection(SQLConnection):
 
         # look for integrity errors
         except (pg.IntegrityError, pg.OperationalError) as err:
-            try:
-                native.rollback()
-            except StandardError:
-                pass
+            if self._pinned() is not native:
+                try:
+                    native.rollback()
+                except StandardError:
+                    pass
 
             # look for a duplicate error
             duplicate_error = re.search('Key (.*) already exists.', nstr(err))
@@ -148,10 +290,11 @@ class PSQLConnection(SQLConnection):
 
         # connection has closed underneath the hood
         except (pg.Error, pg.ProgrammingError) as err:
-            try:
-                native.rollback()
-            except StandardError:
-                pass
+            if self._pinned() is not native:
+                try:
+                    native.rollback()
+                except StandardError:
+                    pass
 
             log.error(traceback.print_exc())
             raise orb.errors.QueryFailed(command, data, nstr(err))
@@ -163,7 +306,84 @@ class PSQLConnection(SQLConnection):
 
         return results, rowcount
 
-    def _open(self, db, writeAccess=False):
+    def _initialize(self, native):
+        """
+        Registers the hstore and json types for the given connection, before
+        running the database's init SQL.  The session settings are passed
+        along when connecting, so this only makes a round trip to the server
+        until the hstore types have been found.  They are looked up again for
+        each new connection until then, as the extension is created when the
+        database is synced.
+
+        :param native: <psycopg2.connection>
+        """
+        if self.__hstoreOids is None:
+            oids, array_oids = HstoreAdapter.get_oids(native)
+            if oids:
+                self.__hstoreOids = (oids, array_oids)
+            else:
+                log.warning('HSTORE is not supported in this version of Postgres!')
+        else:
+            oids, array_oids = self.__hstoreOids
+
+        if oids:
+            register_hstore(native, unicode=True, oid=oids, array_oid=array_oids)
+
+        register_default_json(native)
+
+        super(PSQLConnection, self)._initialize(native)
+
+    def _prepare(self, native, command, data):
+        """
+        Prepares the given command on the connection, replacing its keyword
+        parameters with positional ones.  Commands that bind sequences, such
+        as IN clauses, cannot be prepared as their number of values changes.
+
+        :param native: <psycopg2.connection>
+        :param command: <str>
+        :param data: <dict>
+
+        :return: (<str> name, <str> command) || None
+        """
+        command = command.strip().rstrip(';')
+        if ';' in command:
+            return None
+
+        keys = []
+        for key in FORMAT_EXPR.findall(command):
+            if isinstance(data.get(key), (list, tuple, set)):
+                return None
+            elif key not in keys:
+                keys.append(key)
+
+        name = 'orb_prepared_{0}'.format(next(self.__prepareCounter))
+        sql = FORMAT_EXPR.sub(lambda x: '${0}'.format(keys.index(x.group(1)) + 1), command)
+        sql = u'PREPARE {0} AS {1};'.format(name, sql.replace('%%', '%'))
+
+        log.debug('***********************')
+        log.debug(sql)
+        log.debug('***********************')
+
+        try:
+            cursor = native.cursor()
+            cursor.execute(sql)
+        except pg.InterfaceError:
+            raise orb.errors.ConnectionLost()
+        except pg.Error as err:
+            if self._pinned() is not native:
+                try:
+                    native.rollback()
+                except StandardError:
+                    pass
+            raise orb.errors.QueryFailed(sql, data, nstr(err))
+
+        if keys:
+            params = ', '.join('%({0})s'.format(key) for key in keys)
+            return name, u'EXECUTE {0}({1});'.format(name, params)
+        else:
+            return name, u'EXECUTE {0};'.format(name)
+
+    def _open(self, db, writeAccess=False, host=None):
         """
         Handles simple, SQL specific connection creation.  This will not
         have to manage thread information as it is already managed within
@@ -176,17 +396,35 @@ class PSQLConnection(SQLConnection):
         if not pg:
             raise orb.errors.BackendNotFound('psycopg2 is not installed.')
 
+        # setup the session settings for this connection only
+        options = []
         if db.timeout():
-            os.environ['PGOPTIONS'] = '-c statement_timeout={0}'.format(db.timeout())
+            options.append('-c statement_timeout={0}'.format(db.timeout()))
+
+        search_path = db.searchPath()
+        if search_path:
+            if isinstance(search_path, basestring):
+                search_path = search_path.split(',')
+            search_path = ','.join(quote_identifier(schema) for schema in search_path if schema.strip())
+
+            # spaces within the options have to be escaped for libpq
+            options.append('-c search_path={0}'.format(search_path.replace('\\', '\\\\').replace(' ', '\\ ')))
+
+        kwds = {}
+        if options:
+            kwds['options'] = ' '.join(options)
+        if db.applicationName():
+            kwds['application_name'] = db.applicationName()
 
         # create the python connection
         try:
             return pg.connect(database=db.name(),
                               user=db.username(),
                               password=db.password(),
-                              host=db.writeHost() if writeAccess else db.host(),
+                              host=host or (db.writeHost() if writeAccess else db.host()),
                               port=db.port(),
-                              connect_timeout=3)
+                              connect_timeout=3,
+                              **kwds)
         except pg.OperationalError as err:
             log.exception('Failed to connect to postgres')
             raise orb.errors.ConnectionFailed()
@@ -203,6 +441,214 @@ class PSQLConnection(SQLConnection):
         except pg.Error:
             pass
 
+    def _stream(self, native, command, data, size, mapper=dict):
+        """
+        Executes the given select command through a named, server-side cursor
+        so that only the given number of rows are transferred at a time.
+
+        :param      native  | <psycopg2.connection>
+                    command | <str>
+                    data    | <dict>
+                    size    | <int>
+                    mapper  | <variant>
+
+        :return     <generator> of [{<str> key: <variant>, ..}, ..]
+        """
+        log.debug('***********************')
+        log.debug(command % data)
+        log.debug('***********************')
+
+        cursor = native.cursor(name='orb_stream_{0}'.format(os.urandom(4).encode('hex')),
+                               cursor_factory=DictCursor)
+        cursor.itersize = size
+        try:
+            try:
+                cursor.execute(command, data)
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    yield [mapper(row) for row in rows]
+
+            except pg_ext.QueryCanceledError:
+                raise orb.errors.Interruption()
+            except pg.InterfaceError:
+                raise orb.errors.ConnectionLost()
+            except pg.Error as err:
+                raise orb.errors.QueryFailed(command, data, nstr(err))
+        finally:
+            if not native.closed:
+                try:
+                    cursor.close()
+                except pg.Error:
+                    pass
+
+    def _replicationLag(self, native):
+        """
+        Returns the number of seconds since the given standby last replayed a
+        transaction from its primary.  Primaries report no lag.
+
+        :param native: <psycopg2.connection>
+
+        :return: <float> || None
+        """
+        sql = (
+            u'SELECT CASE WHEN pg_is_in_recovery() '
+            u'THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) '
+            u'ELSE 0 END;'
+        )
+        try:
+            cursor = native.cursor()
+            cursor.execute(sql)
+            lag = cursor.fetchone()[0]
+            native.rollback()
+        except pg.Error:
+            return None
+        else:
+            return float(lag) if lag is not None else None
+
+    def copyIn(self, model, rows, context, size=None):
+        """
+        Bulk loads the given rows into the table for the inputted model using
+        COPY FROM STDIN, encoding each row as the server reads it.  When the
+        model has translatable columns, the rows are loaded in chunks so the
+        ids for their records can be allocated up front and their translations
+        copied into the i18n table.  All of the rows are loaded within a single
+        transaction.
+
+        :param      model   | <subclass of orb.Model>
+                    rows    | <iterable> of {<str> column: <variant>, ..} || <orb.Model>
+                    context | <orb.Context>
+                    size    | <int> || None | defaults to the batch size
+
+        :return     <int> | number of rows loaded
+        """
+        schema = model.schema()
+        id_column = schema.idColumn()
+        namespace = schema.namespace() or 'public'
+
+        standard = []
+        i18n = []
+        for col in schema.columns().values():
+            if col.testFlag(col.Flags.Virtual):
+                continue
+            elif col.testFlag(col.Flags.I18n):
+                i18n.append(col)
+            else:
+                standard.append(col)
+
+        # auto-assigned ids are only needed to link up the translations
+        allocate = id_column.testFlag(id_column.Flags.AutoAssign)
+        if allocate and not i18n:
+            standard.remove(id_column)
+
+        def _value(row, col):
+            if isinstance(row, orb.Model):
+                value = row.get(col)
+            elif col.name() in row:
+                value = row[col.name()]
+            else:
+                value = row.get(col.field(), col.default())
+            return col.dbStore('Postgres', value)
+
+        def _lines(chunk, columns, ids=None):
+            for i, row in enumerate(chunk):
+                values = [copy_value(_value(row, col)) for col in columns]
+                if ids is not None:
+                    values = [copy_value(ids[i])] + values
+                yield '\t'.join(values) + '\n'
+
+        def _copy(conn, table, fields, lines):
+            sql = u'COPY "{0}"."{1}" ({2}) FROM STDIN;'.format(namespace,
+                                                               table,
+                                                               ', '.join(u'"{0}"'.format(f) for f in fields))
+            log.debug('***********************')
+            log.debug(sql)
+            log.debug('***********************')
+
+            buffer = CopyBuffer(lines)
+            try:
+                conn.cursor().copy_expert(sql, buffer)
+            except pg.InterfaceError:
+                raise orb.errors.ConnectionLost()
+            except pg.Error as err:
+                raise orb.errors.QueryFailed(sql, {}, nstr(err))
+            return buffer.count()
+
+        count = 0
+        with self.native(writeAccess=True, priority=context.priority) as conn:
+            if not i18n:
+                count = _copy(conn, schema.dbname(), [col.field() for col in standard], _lines(rows, standard))
+            else:
+                locale = context.locale
+                i18n_fields = ['{0}_id'.format(schema.dbname()), 'locale'] + [col.field() for col in i18n]
+                columns = [col for col in standard if col != id_column]
+
+                for chunk in projex.iters.batch(rows, size or self.batchSize()):
+                    chunk = list(chunk)
+
+                    if allocate:
+                        sql = u'SELECT nextval(pg_get_serial_sequence(%(table)s, %(field)s)) AS "id" ' \
+                              u'FROM generate_series(1, %(count)s);'
+                        data = {'table': u'"{0}"."{1}"'.format(namespace, schema.dbname()),
+                                'field': id_column.field(),
+                                'count': len(chunk)}
+                        ids = [row['id'] for row in self._execute(conn, sql, data)[0]]
+                    else:
+                        ids = [_value(row, id_column) for row in chunk]
+
+                    _copy(conn, schema.dbname(), [id_column.field()] + [col.field() for col in columns],
+                          _lines(chunk, columns, ids))
+
+                    translations = [[copy_value(locale)] + [copy_value(_value(row, col)) for col in i18n] for row in chunk]
+                    _copy(conn, '{0}_i18n'.format(schema.dbname()), i18n_fields,
+                          ('\t'.join([copy_value(ids[i])] + values) + '\n' for i, values in enumerate(translations)))
+
+                    count += len(chunk)
+
+        self._invalidate(orb.Collection(model=model))
+        return count
+
+    def copyOut(self, model, context, fileobj, format='csv'):
+        """
+        Writes the rows selected for the inputted model and context to the
+        given file object using COPY TO STDOUT, without loading them into
+        python.  Rows are written as csv with a header, or in the binary
+        format of Postgres.
+
+        :param      model   | <subclass of orb.Model>
+                    context | <orb.Context>
+                    fileobj | <file>
+                    format  | <str> | 'csv' || 'binary'
+
+        :return     <int> | number of rows written
+        """
+        if format == 'csv':
+            options = 'FORMAT csv, HEADER true'
+        elif format == 'binary':
+            options = 'FORMAT binary'
+        else:
+            raise orb.errors.InvalidCopyFormat(format)
+
+        SELECT = self.statement('SELECT')
+        sql, data = self.statements().compile(SELECT, model, context)
+        if not sql:
+            return 0
+
+        data.setdefault('locale', context.locale)
+        with self.native(priority=context.priority) as conn:
+            cursor = conn.cursor()
+            try:
+                query = cursor.mogrify(sql.strip().rstrip(';'), data)
+                cursor.copy_expert('COPY ({0}) TO STDOUT WITH ({1});'.format(query, options), fileobj)
+            except pg_ext.QueryCanceledError:
+                raise orb.errors.Interruption()
+            except pg.InterfaceError:
+                raise orb.errors.ConnectionLost()
+            except pg.Error as err:
+                raise orb.errors.QueryFailed(sql, data, nstr(err))
+            return cursor.rowcount
+
     # ----------------------------------------------------------------------
 
     @classmethod
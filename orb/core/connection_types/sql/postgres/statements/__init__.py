@@ -12,4 +12,5 @@ from . import select_count
 from . import select_expand
 from . import setup
 from . import update
+from . import upsert
 from . import where
\ No newline at end of file
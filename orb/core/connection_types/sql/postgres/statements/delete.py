@@ -6,7 +6,7 @@ orb = lazy_import('orb')
 
 
 class DELETE(PSQLStatement):
-    def __call__(self, records, data=None):
+    def __call__(self, records, data=None, limit=None):
         # delete based on the collection's context
         if isinstance(records, orb.Collection) and not records.isLoaded():
             model = records.model()
@@ -22,23 +22,41 @@ class DELETE(PSQLStatement):
                 'namespace': model.schema().namespace() or 'public',
                 'table': model.schema().dbname(),
                 'id_col': model.schema().idColumn().field(),
-                'where': 'WHERE {0}'.format(where) if where else ''
+                'where': 'WHERE {0}'.format(where) if where else '',
+                'limit': limit
             }
+
+            # select the ids to remove once, so the translations and the
+            # records are removed together in a single statement
+            if limit:
+                targets = [(
+                    u'"orb_chunk" AS (\n'
+                    u'    SELECT "{id_col}" FROM "{namespace}"."{table}"\n'
+                    u'    {where}\n'
+                    u'    LIMIT {limit}\n'
+                    u')'
+                ).format(**sql_options)]
+                sql_options['where'] = u'WHERE "{id_col}" IN (SELECT "{id_col}" FROM "orb_chunk")'.format(**sql_options)
+                sql_options['ids'] = u'SELECT "{id_col}" FROM "orb_chunk"'.format(**sql_options)
+            else:
+                targets = []
+                sql_options['ids'] = u'SELECT "{id_col}" FROM "{namespace}"."{table}" {where}'.format(**sql_options)
+
+            if model.schema().columns(flags=orb.Column.Flags.I18n):
+                targets.append((
+                    u'"orb_i18n" AS (\n'
+                    u'    DELETE FROM "{namespace}"."{table}_i18n"\n'
+                    u'    WHERE "{table}_id" IN ({ids})\n'
+                    u')'
+                ).format(**sql_options))
+
             sql = (
                 u'DELETE FROM "{namespace}"."{table}"\n'
-                u'{where}'
-                u'RETURNING *;'
+                u'{where};'
             ).format(**sql_options)
 
-            if model.schema().columns(flags=orb.Column.Flags.I18n):
-                i18n_sql = (
-                    u'DELETE FROM "{namespace}"."{table}_i18n"\n'
-                    u'WHERE "{table}_id" IN (\n'
-                    u'    SELECT "{id_col}" FROM {table}'
-                    u'    {where}'
-                    u');\n'
-                ).format(**sql_options)
-                sql = i18n_sql + sql
+            if targets:
+                sql = u'WITH {0}\n{1}'.format(',\n'.join(targets), sql)
 
             records.clear()
             return sql, data
@@ -53,7 +71,7 @@ class DELETE(PSQLStatement):
             data = {}
             sql = []
             for schema, ids in delete_info.items():
-                schema_sql = u'DELETE FROM "{0}"."{1}" WHERE {2} IN %({1}_ids)s RETURNING *;'
+                schema_sql = u'DELETE FROM "{0}"."{1}" WHERE {2} IN %({1}_ids)s;'
                 schema_sql = schema_sql.format(schema.namespace() or 'public',
                                                schema.dbname(),
                                                schema.idColumn().field())
@@ -62,14 +62,13 @@ class INSERT(PSQLStatement):
                 subcmd += 'INSERT INTO "{0}"."{1}" ({2}) VALUES'.format(schema.namespace() or 'public',
                                                                         schema.dbname(),
                                                                         cols)
-                for value in values[:-1]:
-                    subcmd += '\n({0}),'.format(value)
-                subcmd += '\n({0})'.format(values[-1])
+                subcmd += '\n' + ',\n'.join('({0})'.format(value) for value in values)
                 subcmd += '\nRETURNING "{0}";'.format(id_column.field())
             elif columns['i18n']:
-                subcmd += '\nINSERT INTO "{0}"."{1}" DEFAULT VALUES RETURNING "{2}";'.format(schema.namespace() or 'public',
-                                                                                             schema.dbname(),
-                                                                                             id_column.field())
+                subcmd += ''.join('\nINSERT INTO "{0}"."{1}" DEFAULT VALUES RETURNING "{2}";'.format(schema.namespace() or 'public',
+                                                                                                      schema.dbname(),
+                                                                                                      id_column.field())
+                                  for _ in schema_records[schema]['i18n'])
 
             if columns['i18n']:
                 cols = ', '.join(['"{0}"'.format(col.field()) for col in columns['i18n']])
@@ -77,20 +76,19 @@ class INSERT(PSQLStatement):
                 subcmd += '\nINSERT INTO "{0}"."{1}_i18n" ("{1}_id", "locale", {2}) VALUES'.format(schema.namespace() or 'public',
                                                                                                    schema.dbname(),
                                                                                                    cols)
-                for i, value in enumerate(values[:-1]):
+                rows = []
+                for i, value in enumerate(values):
                     value_key = '{0}_{1}'.format(id_column.field(), i)
-                    id_value = data[value_key]
+                    id_value = data.get(value_key, 'DEFAULT')
                     if id_value == 'DEFAULT':
-                        id_value = 'LASTVAL() - {0}'.format(len(values) - (i+1))
-
-                    subcmd += '\n({0}, %(locale)s, {1}),'.format(id_value, value)
+                        offset = len(values) - (i + 1)
+                        id_value = 'LASTVAL() - {0}'.format(offset) if offset else 'LASTVAL()'
+                    else:
+                        id_value = '%({0})s'.format(value_key)
 
-                value_key = '{0}_{1}'.format(id_column.field(), i)
-                id_value = data[value_key]
-                if id_value == 'DEFAULT':
-                    id_value = 'LASTVAL()'
+                    rows.append('({0}, %(locale)s, {1})'.format(id_value, value))
 
-                subcmd += '\n({0}, %(locale)s, {1})'.format(id_value, values[-1])
+                subcmd += '\n' + ',\n'.join(rows)
                 subcmd += '\nRETURNING "{0}_id" AS "{1}";'.format(schema.dbname(), id_column.field())
 
             cmd.append(subcmd)
@@ -1,5 +1,4 @@
-import os
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from projex.lazymodule import lazy_import
 from ..psqlconnection import PSQLStatement
 
@@ -11,87 +10,148 @@ class UPDATE(PSQLStatement):
         sql = []
         data = {}
 
-        for record in records:
-            if record.isRecord():
-                changes = record.changes()
-                if changes:
-                    sub_sql, sub_data = self.generateCommand(record, changes)
-                    sql.append(sub_sql)
-                    data.update(sub_data)
+        # group the records that share the same set of changes so that each
+        # group can be updated with a single statement
+        standard = OrderedDict()
+        i18n = OrderedDict()
 
-        return u'\n'.join(sql), data
+        for record in records:
+            if not record.isRecord():
+                continue
 
-    def generateCommand(self, record, changes):
-        data = {}
-        standard_values = []
+            changes = record.changes()
+            if not changes:
+                continue
 
-        i18n_fields = defaultdict(list)
-        i18n_values = defaultdict(list)
-        i18n_keys = defaultdict(list)
+            schema = record.schema()
+            columns = sorted((col for col in changes if not col.testFlag(col.Flags.Virtual)),
+                             key=lambda x: x.field())
 
-        for column in changes:
-            if column.testFlag(column.Flags.Virtual):
-                continue
+            standard_columns = tuple(col for col in columns if not col.testFlag(col.Flags.I18n))
+            if standard_columns:
+                standard.setdefault((schema, standard_columns), []).append(record)
 
-            if column.testFlag(column.Flags.I18n):
-                for record_locale, value in record.get(column, locale='all').items():
-                    value_key = '{0}_{1}'.format(column.field(), os.urandom(4).encode('hex'))
-                    data[value_key] = column.dbStore('Postgres', value)
-                    i18n_values[record_locale].append(u'"{0}" = %({1})s'.format(column.field(), value_key))
-                    i18n_fields[record_locale].append(u'"{0}"'.format(column.field()))
-                    i18n_keys[record_locale].append(u'%({0})s'.format(value_key))
-            else:
-                value_key = '{0}_{1}'.format(column.field(), os.urandom(4).encode('hex'))
-                data[value_key] = column.dbStore('Postgres', record.get(column))
-                standard_values.append('"{0}" = %({1})s'.format(column.field(), value_key))
+            locale_values = defaultdict(dict)
+            for column in columns:
+                if column.testFlag(column.Flags.I18n):
+                    for record_locale, value in record.get(column, locale='all').items():
+                        locale_values[record_locale][column] = value
 
+            for record_locale, values in locale_values.items():
+                i18n_columns = tuple(col for col in columns if col in values)
+                row = (record, record_locale, [values[col] for col in i18n_columns])
+                i18n.setdefault((schema, i18n_columns), []).append(row)
 
-        id_key = 'id_' + os.urandom(4).encode('hex')
-        data[id_key] = record.get(record.schema().idColumn())
+        for (schema, columns), group in standard.items():
+            sub_sql, sub_data = self.updateRecords(schema, columns, group)
+            sql.append(sub_sql)
+            data.update(sub_data)
 
-        sql = []
-        if standard_values:
-            standard_sql = (
-                u'UPDATE "{namespace}"."{table}"\n'
-                u'SET {values}\n'
-                u'WHERE "{namespace}"."{table}"."{field}" = %({id})s;'
-            ).format(table=record.schema().dbname(),
-                     namespace=record.schema().namespace() or 'public',
-                     id=id_key,
-                     values=', '.join(standard_values),
-                     field=record.schema().idColumn().field())
-            sql.append(standard_sql)
-
-        if i18n_fields:
-            for locale in i18n_values:
-                i18n_sql = (
-                    u'DO $$\n'
-                    u'BEGIN\n'
-                    u'IF NOT EXISTS (\n'
-                    u'  SELECT 1\n'
-                    u'  FROM "{namespace}"."{table}_i18n"\n'
-                    u'  WHERE "{table}_id" = %({id})s AND "locale" = \'{locale}\'\n'
-                    u')\n'
-                    u'THEN\n'
-                    u'  INSERT INTO "{namespace}"."{table}_i18n" ("{table}_id", "locale", {fields})\n'
-                    u'  VALUES (%({id})s, \'{locale}\', {keys});\n'
-                    u'ELSE\n'
-                    u'  UPDATE "{table}_i18n"\n'
-                    u'  SET {values}\n'
-                    u'  WHERE "{table}_id" = %({id})s AND "locale" = \'{locale}\';\n'
-                    u'END IF;\n'
-                    u'END $$;'
-                ).format(table=record.schema().dbname(),
-                         namespace=record.schema().namespace() or 'public',
-                         id=id_key,
-                         locale=locale,
-                         values=', '.join(i18n_values[locale]),
-                         keys=', '.join(i18n_keys[locale]),
-                         fields=', '.join(i18n_fields[locale]))
-                sql.append(i18n_sql)
+        for (schema, columns), rows in i18n.items():
+            sub_sql, sub_data = self.upsertTranslations(schema, columns, rows)
+            sql.append(sub_sql)
+            data.update(sub_data)
 
         return u'\n'.join(sql), data
 
+    def updateRecord(self, schema, columns, record):
+        data = {}
+        values = []
+
+        for column in columns:
+            value_key = self.valueKey(column.field())
+            data[value_key] = column.dbStore('Postgres', record.get(column))
+            values.append(u'"{0}" = %({1})s'.format(column.field(), value_key))
+
+        id_key = self.valueKey('id')
+        data[id_key] = record.get(schema.idColumn())
+
+        sql = (
+            u'UPDATE "{namespace}"."{table}"\n'
+            u'SET {values}\n'
+            u'WHERE "{namespace}"."{table}"."{field}" = %({id})s;'
+        ).format(table=schema.dbname(),
+                 namespace=schema.namespace() or 'public',
+                 id=id_key,
+                 values=', '.join(values),
+                 field=schema.idColumn().field())
+
+        return sql, data
+
+    def updateRecords(self, schema, columns, records):
+        id_column = schema.idColumn()
+
+        # changing the id of a record needs to match on its old id
+        if len(records) == 1 or id_column in columns:
+            sql = []
+            data = {}
+            for record in records:
+                sub_sql, sub_data = self.updateRecord(schema, columns, record)
+                sql.append(sub_sql)
+                data.update(sub_data)
+            return u'\n'.join(sql), data
+
+        data = {}
+        rows = []
+        for record in records:
+            keys = [self.valueKey('id')]
+            data[keys[0]] = record.get(id_column)
+
+            for column in columns:
+                value_key = self.valueKey(column.field())
+                data[value_key] = column.dbStore('Postgres', record.get(column))
+                keys.append(value_key)
+
+            rows.append(u'({0})'.format(', '.join(u'%({0})s'.format(key) for key in keys)))
+
+        # the values are typed by the empty select from the table
+        fields = [id_column.field()] + [column.field() for column in columns]
+        sql = (
+            u'UPDATE "{namespace}"."{table}"\n'
+            u'SET {values}\n'
+            u'FROM (\n'
+            u'  SELECT {fields} FROM "{namespace}"."{table}" WHERE false\n'
+            u'  UNION ALL\n'
+            u'  VALUES {rows}\n'
+            u') AS "orb_values"\n'
+            u'WHERE "{namespace}"."{table}"."{field}" = "orb_values"."{field}";'
+        ).format(table=schema.dbname(),
+                 namespace=schema.namespace() or 'public',
+                 values=', '.join(u'"{0}" = "orb_values"."{0}"'.format(column.field()) for column in columns),
+                 fields=', '.join(u'"{0}"'.format(field) for field in fields),
+                 rows=',\n         '.join(rows),
+                 field=id_column.field())
+
+        return sql, data
+
+    def upsertTranslations(self, schema, columns, rows):
+        data = {}
+        values = []
+
+        for record, record_locale, record_values in rows:
+            keys = [self.valueKey('id'), self.valueKey('locale')]
+            data[keys[0]] = record.get(schema.idColumn())
+            data[keys[1]] = record_locale
+
+            for column, value in zip(columns, record_values):
+                value_key = self.valueKey(column.field())
+                data[value_key] = column.dbStore('Postgres', value)
+                keys.append(value_key)
+
+            values.append(u'({0})'.format(', '.join(u'%({0})s'.format(key) for key in keys)))
+
+        sql = (
+            u'INSERT INTO "{namespace}"."{table}_i18n" ("{table}_id", "locale", {fields})\n'
+            u'VALUES {values}\n'
+            u'ON CONFLICT ("{table}_id", "locale") DO UPDATE\n'
+            u'SET {updates};'
+        ).format(table=schema.dbname(),
+                 namespace=schema.namespace() or 'public',
+                 fields=', '.join(u'"{0}"'.format(column.field()) for column in columns),
+                 values=',\n       '.join(values),
+                 updates=', '.join(u'"{0}" = EXCLUDED."{0}"'.format(column.field()) for column in columns))
+
+        return sql, data
 
 
 PSQLStatement.registerAddon('UPDATE', UPDATE())
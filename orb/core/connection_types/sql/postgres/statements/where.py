@@ -1,4 +1,3 @@
-import os
 from projex.lazymodule import lazy_import
 from ..psqlconnection import PSQLStatement
 
@@ -61,7 +60,7 @@ class WHERE(PSQLStatement):
 
             # generate the sql field
             field = fields.get(column) or self.generateField(model, column, query, aliases)
-            value_key = u'{0}_{1}'.format(column.field(), os.urandom(4).encode('hex'))
+            value_key = self.valueKey(column.field())
 
             # calculate any math operations to the sql field
             for op, target in query.math():
@@ -78,15 +77,7 @@ class WHERE(PSQLStatement):
             except KeyError:
                 raise orb.errors.QueryInvalid('{0} is an unknown operator'.format(orb.Query.Op(op)))
 
-            def convert_value(val):
-                if isinstance(val, orb.Model):
-                    return val.get(val.schema().idColumn(), inflated=False)
-                elif isinstance(val, (tuple, list, set)):
-                    return tuple(convert_value(v) for v in val)
-                else:
-                     return val
-
-            value = convert_value(value)
+            value = self.convertValue(value)
 
             # convert data from a query
             if isinstance(value, (orb.Query, orb.QueryCompound)):
@@ -134,12 +125,8 @@ class WHERE(PSQLStatement):
                 # in an empty list -- we can just ignore this filter
                 elif op == orb.Query.Op.IsNotIn and not value:
                     return '', {}
-                elif op in (orb.Query.Op.Contains, orb.Query.Op.DoesNotContain):
-                    value = u'%{0}%'.format(value)
-                elif op in (orb.Query.Op.Startswith, orb.Query.Op.DoesNotStartwith):
-                    value = u'{0}%'.format(value)
-                elif op in (orb.Query.Op.Endswith, orb.Query.Op.DoesNotEndwith):
-                    value = u'%{0}'.format(value)
+
+                value = self.bindValue(op, value)
 
                 if invert:
                     opts = (u'%({0})s'.format(value_key), sql_op, field)
@@ -169,6 +156,24 @@ class WHERE(PSQLStatement):
 
         return sql, data
 
+    def bindValue(self, op, value):
+        if op in (orb.Query.Op.Contains, orb.Query.Op.DoesNotContain):
+            return u'%{0}%'.format(value)
+        elif op in (orb.Query.Op.Startswith, orb.Query.Op.DoesNotStartwith):
+            return u'{0}%'.format(value)
+        elif op in (orb.Query.Op.Endswith, orb.Query.Op.DoesNotEndwith):
+            return u'%{0}'.format(value)
+        else:
+            return value
+
+    def convertValue(self, value):
+        if isinstance(value, orb.Model):
+            return value.get(value.schema().idColumn(), inflated=False)
+        elif isinstance(value, (tuple, list, set)):
+            return tuple(self.convertValue(v) for v in value)
+        else:
+            return value
+
     def generateField(self, model, column, query, aliases):
         alias = aliases.get(model) or model.schema().dbname()
         field = column.field()
@@ -0,0 +1,147 @@
+"""
+Defines the replica router that the SQL based backends use to distribute
+read queries across a database's read replicas.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from projex.lazymodule import lazy_import
+
+from ...local import local
+
+log = logging.getLogger(__name__)
+orb = lazy_import('orb')
+
+
+class ReplicaRouter(object):
+    """
+    Chooses the host that a read query should be run against.  Replicas are
+    balanced by weight or by their number of checked out connections, and are
+    ejected for a period of time when they fail or fall too far behind the
+    primary.  Reads made shortly after a write from the same thread or
+    greenlet are pinned to the primary so they can see their own changes.
+    """
+    LagCheckInterval = 5  # seconds
+
+    def __init__(self, connection):
+        self.__connection = connection
+        self.__lock = threading.Lock()
+        self.__ejected = {}
+        self.__lagChecked = {}
+
+    def _writes(self):
+        store = local('orb.sql.writes')
+        try:
+            return store.times
+        except AttributeError:
+            store.times = {}
+            return store.times
+
+    def check(self, host, native):
+        """
+        Checks the replication lag for the given replica host, if the database
+        defines a maximum lag.  Replicas are checked at most once every few
+        seconds, and are ejected when they are lagging behind.
+
+        :param host: <str>
+        :param native: <variant>
+
+        :return: <bool> | whether or not the replica can be used
+        """
+        db = self.__connection.database()
+        max_lag = db.maxReplicaLag()
+        if not max_lag:
+            return True
+
+        now = time.time()
+        with self.__lock:
+            if now - self.__lagChecked.get(host, 0) < self.LagCheckInterval:
+                return True
+            self.__lagChecked[host] = now
+
+        lag = self.__connection._replicationLag(native)
+        if lag is not None and lag > max_lag:
+            log.warning('Replica {0} is lagging by {1} seconds'.format(host, lag))
+            self.eject(host)
+            return False
+        else:
+            return True
+
+    def choose(self):
+        """
+        Returns the host that the next read query should be sent to.
+
+        :return: <str>
+        """
+        db = self.__connection.database()
+        replicas = db.readHosts()
+
+        # no replicas defined, use the primary read host
+        if not replicas:
+            return db.host()
+
+        # pin reads to the primary after a recent write
+        window = db.stickyWrites()
+        if window and time.time() - self._writes().get(id(self), 0) < window:
+            return db.writeHost()
+
+        now = time.time()
+        with self.__lock:
+            for host, until in self.__ejected.items():
+                if until <= now:
+                    del self.__ejected[host]
+
+            available = [(host, weight) for host, weight in replicas.items()
+                         if weight > 0 and host not in self.__ejected]
+
+        # all the replicas are down, fallback to the primary
+        if not available:
+            return db.writeHost()
+
+        if db.balancing() == 'leastConnections':
+            def load(item):
+                host, weight = item
+                return self.__connection.pool(host=host).metrics()['checkedOut'] / float(weight)
+
+            return min(available, key=load)[0]
+        else:
+            pick = random.uniform(0, sum(weight for _, weight in available))
+            for host, weight in available:
+                pick -= weight
+                if pick <= 0:
+                    return host
+            return available[-1][0]
+
+    def eject(self, host):
+        """
+        Removes the given replica from the rotation for the database's
+        replica retry period.
+
+        :param host: <str>
+        """
+        db = self.__connection.database()
+        if host not in db.readHosts():
+            return
+
+        log.warning('Ejecting replica {0}'.format(host))
+        with self.__lock:
+            self.__ejected[host] = time.time() + db.replicaRetry()
+
+    def ejected(self):
+        """
+        Returns the replica hosts that are currently out of rotation.
+
+        :return: [<str>, ..]
+        """
+        now = time.time()
+        with self.__lock:
+            return [host for host, until in self.__ejected.items() if until > now]
+
+    def markWrite(self):
+        """
+        Records that the current thread or greenlet wrote to the primary.
+        """
+        self._writes()[id(self)] = time.time()
@@ -6,13 +6,21 @@ import datetime
 import contextlib
 import logging
 import orb
+import re
 import sys
+import threading
 
 from abc import abstractmethod
-from collections import defaultdict
+from collections import OrderedDict
 
 log = logging.getLogger(__name__)
 
+FORMAT_EXPR = re.compile('%\(([^\)]+)\)s')
+
+from ...local import local
+from .cache import LRUCache, StatementCache
+from .pool import ConnectionPool
+from .router import ReplicaRouter
 from .sqlstatement import SQLStatement
 
 
@@ -24,6 +32,8 @@ class SQLConnection(orb.Connection):
     to define different SQL connections.f
     """
 
+    IsolationLevels = ('READ UNCOMMITTED', 'READ COMMITTED', 'REPEATABLE READ', 'SERIALIZABLE')
+
     def __init__(self, database):
         super(SQLConnection, self).__init__(database)
 
@@ -35,9 +45,13 @@ class SQLConnection(orb.Connection):
 
         # define custom properties
         self.__batchSize = 500
-        self.__maxSize = int(orb.system.settings().max_connections)
-        self.__poolSize = defaultdict(lambda: 0)
-        self.__pool = defaultdict(Queue)
+        self.__queueType = Queue
+        self.__poolLock = threading.Lock()
+        self.__pools = {}
+        self.__router = ReplicaRouter(self)
+        self.__statements = StatementCache(int(orb.system.settings().statement_cache_size))
+        self.__prepareHits = LRUCache(int(orb.system.settings().statement_cache_size))
+        self.__prepared = {}
 
     # ----------------------------------------------------------------------
     #                       EVENTS
@@ -57,9 +71,109 @@ class SQLConnection(orb.Connection):
     # ----------------------------------------------------------------------
     #                       PROTECTED METHODS
     # ----------------------------------------------------------------------
+    def _begin(self, native, isolation=None, readOnly=False):
+        """
+        Starts a transaction on the given native connection.  The drivers
+        open a transaction with the first statement run after a commit, so
+        the default implementation only sets its characteristics.
+
+        :param native: <variant>
+        :param isolation: <str> || None
+        :param readOnly: <bool>
+        """
+        options = []
+        if isolation:
+            options.append(u'ISOLATION LEVEL {0}'.format(isolation))
+        if readOnly:
+            options.append(u'READ ONLY')
+
+        if options:
+            self._execute(native, u'SET TRANSACTION {0};'.format(', '.join(options)), returning=False)
+
     def _closed(self, native):
         return native.closed
 
+    def _cached(self, model, context, sql, data):
+        """
+        Returns the query result cache of the model along with the key for the
+        given statement, when the results of the statement can be cached.
+        Reads made within a transaction are never cached, as they may see
+        changes that have not been committed.
+
+        :param model: <subclass of orb.Model>
+        :param context: <orb.Context>
+        :param sql: <str>
+        :param data: <dict>
+
+        :return: (<orb.DataCache> || None, <tuple> || None)
+        """
+        cache = model.dataCache() if context.useCache else None
+        if cache is None or self._pinned() is not None:
+            return None, None
+        return cache, (sql, context.locale, repr(sorted(data.items())))
+
+    def _checkoutRead(self, priority):
+        """
+        Checks out a connection for a read query, routing it to one of the
+        database's read replicas when they are defined.  Replicas that cannot
+        be connected to or that are lagging behind are ejected, and the next
+        available host is tried.
+
+        :param priority: <int>
+
+        :return: (<ConnectionPool>, <variant>)
+        """
+        replicas = self.database().readHosts()
+        for _ in xrange(len(replicas) + 1):
+            host = self.__router.choose()
+            pool = self.pool(host=host)
+
+            try:
+                conn = pool.checkout(priority=priority)
+            except orb.errors.ConnectionFailed:
+                if host in replicas:
+                    self.__router.eject(host)
+                    continue
+                raise
+
+            if host not in replicas or self.__router.check(host, conn):
+                return pool, conn
+            else:
+                pool.checkin(conn)
+
+        pool = self.pool(writeAccess=True)
+        return pool, pool.checkout(priority=priority)
+
+    def _connect(self, writeAccess=False, host=None):
+        """
+        Creates a new native connection for the pool, notifying the database
+        before and after the connection is made.
+
+        :param writeAccess: <bool>
+        :param host: <str> || None
+
+        :return: <variant>
+        """
+        db = self.database()
+
+        # process a pre-connect event
+        event = orb.events.ConnectionEvent()
+        db.onPreConnect(event)
+
+        conn = self._open(db, writeAccess=writeAccess, host=host)
+
+        # setup the session once for the life of the connection
+        if conn is not None:
+            try:
+                self._initialize(conn)
+            except Exception:
+                self._close(conn)
+                raise
+
+        event = orb.events.ConnectionEvent(success=conn is not None, native=conn)
+        db.onPostConnect(event)
+        return conn
+
     @abstractmethod
     def _execute(self,
                  native,
@@ -83,11 +197,12 @@ class SQLConnection(orb.Connection):
         """
 
     @abstractmethod
-    def _open(self, db, writeAccess=False):
+    def _open(self, db, writeAccess=False, host=None):
         """
         Handles simple, SQL specific connection creation.  This will not
         have to manage thread information as it is already managed within
-        the main open method for the SQL class.
+        the main open method for the SQL class.  If no host is given, the
+        database's read or write host is used.
 
         :return     <variant> | backend specific database connection
         """
@@ -96,8 +211,230 @@ class SQLConnection(orb.Connection):
         native.commit()
 
     def _close(self, native):
+        self.__prepared.pop(native, None)
         native.close()
 
+    def _deallocate(self, native, handle):
+        """
+        Releases a statement that was prepared on the given connection.
+
+        :param native: <variant>
+        :param handle: <variant> | result from _prepare
+        """
+        pass
+
+    def _end(self, native, commit=True):
+        """
+        Commits or rolls back the transaction on the given native connection.
+
+        :param native: <variant>
+        :param commit: <bool>
+
+        :return: <bool> | whether or not the connection can be used again
+        """
+        if commit:
+            self._commit(native)
+            return True
+        else:
+            return self._rollback(native) is not None
+
+    def _executeBatches(self, statement, records, context):
+        """
+        Renders and executes the given statement for the records in chunks of
+        the batch size, so that no single statement grows too large.  When
+        there is more than one chunk, they are all executed on the same
+        connection within a single transaction.  The cached query results for
+        the models of the records are cleared afterwards.
+
+        :param      statement | <orb.core.connection_types.sql.SQLStatement>
+                    records   | [<orb.Model>, ..] || <orb.Collection>
+                    context   | <orb.Context>
+
+        :return     [{<str> key: <variant>, ..}, ..], <int> rowcount
+        """
+        if isinstance(records, orb.Collection):
+            records = records.records()
+
+        size = self.batchSize() or len(records)
+        chunks = [records[i:i + size] for i in xrange(0, len(records), size)]
+
+        def _render(chunk):
+            with SQLStatement.scope():
+                return statement(chunk)
+
+        if not chunks:
+            return [], 0
+
+        elif context.dryRun:
+            for chunk in chunks:
+                sql, data = _render(chunk)
+                print sql, data
+            return [], 0
+
+        elif len(chunks) == 1:
+            sql, data = _render(chunks[0])
+            if not sql.strip():
+                return [], 0
+            results, rowcount = self.execute(sql, data, writeAccess=True, priority=context.priority)
+
+        else:
+            results = []
+            rowcount = 0
+            with self.native(writeAccess=True, priority=context.priority) as conn:
+                for chunk in chunks:
+                    sql, data = _render(chunk)
+                    if not sql.strip():
+                        continue
+
+                    data.setdefault('locale', context.locale)
+                    chunk_results, chunk_count = self._execute(conn, sql, data)
+                    results += chunk_results
+                    rowcount += chunk_count
+
+        self._invalidate(records)
+        return results, rowcount
+
+    def _executeMany(self, native, commands):
+        """
+        Executes several independent commands on the given native connection,
+        returning the results for each of them.  Backends whose drivers can
+        pipeline commands should send them all in a single round trip here,
+        the default implementation executes them one after the other.
+
+        :param native: <variant>
+        :param commands: [(<str> sql, <dict> data), ..]
+
+        :return: [[{<str> key: <variant>, ..}, ..], ..]
+        """
+        return [self._execute(native, sql, data)[0] for sql, data in commands]
+
+    def _executePrepared(self,
+                         native,
+                         command,
+                         data=None,
+                         returning=True,
+                         mapper=dict):
+        """
+        Executes the given command through a statement prepared on the native
+        connection.  Commands are only prepared once they have been run as many
+        times as the database's prepare threshold, and each connection keeps
+        its most recently used statements, deallocating the others.  When the
+        backend cannot prepare the command, it is executed directly.
+
+        :param      native     | <variant>
+                    command    | <str>
+                    data       | <dict> || None
+                    returning  | <bool>
+                    mapper     | <variant>
+
+        :return     [{<str> key: <variant>, ..}, ..], <int> rowcount
+        """
+        db = self.database()
+        if not db.prepareStatements():
+            return self._execute(native, command, data, returning, mapper)
+
+        handles = self.__prepared.get(native)
+        if handles is None:
+            handles = self.__prepared.setdefault(native, LRUCache(db.maxPreparedStatements()))
+
+        handle = handles.get(command)
+        if handle is None:
+            hits = self.__prepareHits.get(command, 0) + 1
+            self.__prepareHits.set(command, hits)
+            if hits < db.prepareThreshold():
+                return self._execute(native, command, data, returning, mapper)
+
+            # a failed prepare must not abort a pinned transaction, and is not retried
+            pinned = self._pinned() is native
+            if pinned:
+                self._savepoint(native, 'SAVEPOINT', 'orb_prepare')
+            try:
+                handle = self._prepare(native, command, data) or False
+            except orb.errors.QueryFailed as err:
+                log.debug('Failed to prepare statement: {0}'.format(err))
+                if pinned:
+                    self._savepoint(native, 'ROLLBACK TO SAVEPOINT', 'orb_prepare')
+                handle = False
+            else:
+                if pinned:
+                    self._savepoint(native, 'RELEASE SAVEPOINT', 'orb_prepare')
+
+            for _, removed in handles.set(command, handle):
+                if removed:
+                    self._deallocate(native, removed)
+
+        if not handle:
+            return self._execute(native, command, data, returning, mapper)
+
+        # drop the handle on error so it is prepared again next time
+        try:
+            return self._execute(native, handle[-1], data, returning, mapper)
+        except orb.errors.DatabaseError:
+            handles.pop(command)
+            raise
+
+    def _initialize(self, native):
+        """
+        Prepares a newly opened native connection for use.  This is run once
+        for each physical connection, so backends should setup anything here
+        that would otherwise need to be setup for every query, before running
+        the database's init SQL.
+
+        :param native: <variant>
+        """
+        sql = self.database().initSql()
+        if sql:
+            self._execute(native, sql, returning=False)
+            self._commit(native)
+
+    def _invalidate(self, records):
+        """
+        Clears the cached query results for the models of the given records,
+        once they have been written to the database.  Within a transaction,
+        the models are cleared when it is committed instead, so that other
+        readers cannot cache the rows from before the commit.
+
+        :param records: [<orb.Model>, ..] || <orb.Collection>
+        """
+        if isinstance(records, orb.Collection) and records.model() is not None:
+            models = {records.model()}
+        else:
+            models = {type(record) for record in records}
+
+        transactions = self._transactions()
+        if transactions:
+            transactions[0]['invalidate'].update(models)
+            return
+
+        for model in models:
+            orb.DataCache.invalidate(model)
+
+    def _pinned(self):
+        """
+        Returns the native connection pinned by a transaction for the current
+        thread, if any.
+
+        :return: <variant> || None
+        """
+        transactions = self._transactions()
+        return transactions[0]['native'] if transactions else None
+
+    def _prepare(self, native, command, data):
+        """
+        Prepares the given command on the native connection.  Backends that
+        support server-side prepared statements should return a handle whose
+        last item is the command that executes the prepared statement with the
+        same data keys.  The default implementation returns None, as the
+        command cannot be prepared.
+
+        :param native: <variant>
+        :param command: <str>
+        :param data: <dict>
+
+        :return: <tuple> || None
+        """
+        return None
+
     @abstractmethod
     def _interrupt(self, threadId, native):
         """
@@ -107,6 +444,71 @@ class SQLConnection(orb.Connection):
                     connection | <variant> | backend specific database.
         """
 
+    def _savepoint(self, native, command, name):
+        """
+        Runs a savepoint command on the given native connection.
+
+        :param native: <variant>
+        :param command: <str> | SAVEPOINT, RELEASE SAVEPOINT or ROLLBACK TO SAVEPOINT
+        :param name: <str>
+        """
+        self._execute(native, u'{0} {1};'.format(command, name), returning=False)
+
+    def _stream(self, native, command, data, size, mapper=dict):
+        """
+        Executes the given select command, yielding its results in chunks of
+        the given size as they are fetched from the database.  Backends should
+        use server-side cursors here so that only one chunk is held in memory
+        at a time.
+
+        :param      native  | <variant>
+                    command | <str>
+                    data    | <dict>
+                    size    | <int>
+                    mapper  | <variant>
+
+        :return     <generator> of [{<str> key: <variant>, ..}, ..]
+        """
+        cursor = native.cursor()
+        try:
+            cursor.execute(command, data)
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield [mapper(row) for row in rows]
+        finally:
+            cursor.close()
+
+    def _ping(self, native):
+        """
+        Checks whether or not the given native connection is still alive.
+
+        :param native: <variant>
+
+        :return: <bool>
+        """
+        try:
+            cursor = native.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+            native.rollback()
+        except Exception:
+            return False
+        else:
+            return True
+
+    def _replicationLag(self, native):
+        """
+        Returns the number of seconds the given replica connection is behind
+        its primary, or None if it cannot be determined for this backend.
+
+        :param native: <variant>
+
+        :return: <float> || None
+        """
+        return None
+
     def _rollback(self, native):
         try:
             native.rollback()
@@ -118,6 +520,20 @@ class SQLConnection(orb.Connection):
         else:
             return native
 
+    def _transactions(self):
+        """
+        Returns the stack of transactions that the current thread has begun
+        on this connection.
+
+        :return: [<dict>, ..]
+        """
+        store = local('orb.sql.transactions')
+        try:
+            stacks = store.stacks
+        except AttributeError:
+            stacks = store.stacks = {}
+        return stacks.setdefault(self, [])
+
     #----------------------------------------------------------------------
     #                       PUBLIC METHODS
     #----------------------------------------------------------------------
@@ -158,22 +574,55 @@ class SQLConnection(orb.Connection):
         else:
             self.execute(u'\n'.join(sql), data, writeAccess=True)
 
+    def begin(self, isolation=None, readOnly=False):
+        """
+        Starts a transaction for the current thread.  A single connection is
+        checked out and pinned, so every statement run from this thread goes
+        through it until the transaction is ended, and is committed together.
+        Beginning a transaction while one is active creates a savepoint.
+
+        :param      isolation | <str> || None | one of the IsolationLevels
+                    readOnly  | <bool>
+        """
+        transactions = self._transactions()
+        if transactions:
+            name = 'orb_savepoint_{0}'.format(len(transactions))
+            self._savepoint(transactions[0]['native'], 'SAVEPOINT', name)
+            transactions.append({'savepoint': name})
+            return
+
+        if isolation is not None:
+            isolation = isolation.upper().replace('_', ' ')
+            if isolation not in self.IsolationLevels:
+                raise orb.errors.InvalidIsolationLevel(isolation)
+
+        priority = orb.Context().priority
+        if readOnly:
+            pool, native = self._checkoutRead(priority)
+        else:
+            pool = self.pool(writeAccess=True)
+            native = pool.checkout(priority=priority)
+            self.__router.markWrite()
+
+        transactions.append({'pool': pool, 'native': native, 'invalidate': set()})
+        try:
+            self._begin(native, isolation=isolation, readOnly=readOnly)
+        except Exception:
+            transactions.pop()
+            if self._closed(native) or self._rollback(native) is None:
+                pool.discard(native)
+            else:
+                pool.checkin(native)
+            raise
+
     def close(self):
         """
         Closes the connection to the database for this connection.
 
         :return     <bool> closed
         """
-        for pool in self.__pool.values():
-            while not pool.empty():
-                conn = pool.get_nowait()
-                try:
-                    self._close(conn)
-                except Exception:
-                    pass
-
-        # reset the pool size after closing all connections
-        self.__poolSize.clear()
+        for pool in self.__pools.values():
+            pool.close()
 
     def count(self, model, context):
         """
@@ -188,7 +637,7 @@ class SQLConnection(orb.Connection):
         SELECT_COUNT = self.statement('SELECT COUNT')
 
         try:
-            sql, data = SELECT_COUNT(model, context)
+            sql, data = self.__statements.compile(SELECT_COUNT, model, context)
         except orb.errors.QueryIsNull:
             return 0
         else:
@@ -196,12 +645,21 @@ class SQLConnection(orb.Connection):
                 print sql % data
                 return 0
             else:
+                cache, key = self._cached(model, context, sql, data)
+                if cache is not None:
+                    count = cache.get(key)
+                    if count is not None:
+                        return count
+
                 try:
-                    rows, _ = self.execute(sql, data)
+                    rows, _ = self.execute(sql, data, priority=context.priority, prepare=True)
                 except orb.errors.EmptyCommand:
                     rows = []
 
-                return sum([row['count'] for row in rows])
+                count = sum([row['count'] for row in rows])
+                if cache is not None:
+                    cache.set(key, count)
+                return count
 
     def commit(self):
         """
@@ -241,22 +699,97 @@ class SQLConnection(orb.Connection):
 
     def delete(self, records, context):
         """
-        Removes the inputted record from the database.
+        Removes the inputted records from the database.  When given a
+        collection that has not been loaded, its query is deleted directly
+        in chunks of the batch size, each committed on its own, so that
+        large deletes neither load the records nor hold long locks.
 
         :param      records  | <orb.Collection>
                     context  | <orb.Context>
 
-        :return     <int> number of rows removed
+        :return     [], <int> number of rows removed
         """
         # include various schema records to remove
         DELETE = self.statement('DELETE')
-        sql, data = DELETE(records, context)
+
+        if isinstance(records, orb.Collection) and not records.isLoaded():
+            size = self.batchSize()
+            total = 0
+            while True:
+                with SQLStatement.scope():
+                    sql, data = DELETE(records, limit=size)
+
+                if context.dryRun:
+                    print sql % data
+                    return [], 0
+
+                _, count = self.execute(sql, data,
+                                        returning=False,
+                                        writeAccess=True,
+                                        priority=context.priority)
+                total += count
+
+                # without a batch size, everything is removed at once
+                if not size or count < size:
+                    self._invalidate(records)
+                    return [], total
+
+        with SQLStatement.scope():
+            sql, data = DELETE(records, context)
 
         if context.dryRun:
             print sql % data
-            return 0
+            return [], 0
+        else:
+            results = self.execute(sql, data, returning=False, writeAccess=True, priority=context.priority)
+            self._invalidate(records)
+            return results
+
+    def end(self, commit=True):
+        """
+        Ends the innermost transaction for the current thread.  Savepoints are
+        released or rolled back, while the outermost transaction is committed
+        or rolled back and its connection returned to the pool.
+
+        :param      commit | <bool>
+        """
+        transactions = self._transactions()
+        if not transactions:
+            return
+
+        transaction = transactions[-1]
+        if 'savepoint' in transaction:
+            transactions.pop()
+            command = 'RELEASE SAVEPOINT' if commit else 'ROLLBACK TO SAVEPOINT'
+            try:
+                self._savepoint(transactions[0]['native'], command, transaction['savepoint'])
+            except Exception:
+                if commit:
+                    raise
+                log.exception('Failed to roll back to the savepoint.')
+            return
+
+        # the connection stays pinned until the transaction has been ended
+        pool = transaction['pool']
+        native = transaction['native']
+        try:
+            reusable = not self._closed(native) and self._end(native, commit=commit)
+        except Exception:
+            transactions.pop()
+            pool.discard(native)
+            if commit:
+                raise
+            log.exception('Failed to roll back the transaction.')
         else:
-            return self.execute(sql, data, writeAccess=True)
+            transactions.pop()
+            if reusable:
+                pool.checkin(native)
+            else:
+                pool.discard(native)
+
+            if commit:
+                for model in transaction['invalidate']:
+                    orb.DataCache.invalidate(model)
 
     def execute(self,
                 command,
@@ -265,7 +798,9 @@ class SQLConnection(orb.Connection):
                 mapper=dict,
                 writeAccess=False,
                 dryRun=False,
-                locale=None):
+                locale=None,
+                priority=None,
+                prepare=False):
         """
         Executes the inputted command into the current \
         connection cursor.
@@ -277,6 +812,8 @@ class SQLConnection(orb.Connection):
                     returning  | <bool>
                     mapper     | <variant>
                     retries    | <int>
+                    priority   | <int> || None | pool checkout priority
+                    prepare    | <bool> | run through a prepared statement
 
         :return     [{<str> key: <variant>, ..}, ..], <int> rowcount
         """
@@ -295,12 +832,13 @@ class SQLConnection(orb.Connection):
         start = datetime.datetime.now()
 
         try:
-            with self.native(writeAccess=writeAccess) as conn:
-                results, rowcount = self._execute(conn,
-                                                  command,
-                                                  data,
-                                                  returning,
-                                                  mapper)
+            with self.native(writeAccess=writeAccess, priority=priority) as conn:
+                execute = self._executePrepared if prepare else self._execute
+                results, rowcount = execute(conn,
+                                            command,
+                                            data,
+                                            returning,
+                                            mapper)
 
         # always raise interruption errors as these need to be handled
         # from a thread properly
@@ -339,7 +877,8 @@ class SQLConnection(orb.Connection):
         """
         Inserts the table instance into the database.  If the
         dryRun flag is specified, then the command will be
-        logged but not executed.
+        logged but not executed.  Records are inserted in chunks
+        of the batch size, within a single transaction.
 
         :param      records  | <orb.Table>
                     lookup   | <orb.LookupOptions>
@@ -347,13 +886,7 @@ class SQLConnection(orb.Connection):
 
         :return     <dict> changes
         """
-        INSERT = self.statement('INSERT')
-        sql, data = INSERT(records)
-        if context.dryRun:
-            print sql, data
-            return [], 0
-        else:
-            return self.execute(sql, data, writeAccess=True)
+        return self._executeBatches(self.statement('INSERT'), records, context)
 
     def batchSize(self):
         """
@@ -371,21 +904,44 @@ class SQLConnection(orb.Connection):
 
         :return     <bool> connected
         """
-        for pool in self.__pool.values():
-            if not pool.empty():
-                return True
-        return False
+        return any(pool.isConnected() for pool in self.__pools.values())
+
+    def metrics(self):
+        """
+        Returns the connection pool metrics for each host that this
+        connection has connected to.
+
+        :return     {<str> host: <dict>, ..}
+        """
+        return {host: pool.metrics() for host, pool in self.__pools.items()}
 
     @contextlib.contextmanager
-    def native(self, writeAccess=False, isolation_level=None):
+    def native(self, writeAccess=False, isolation_level=None, priority=None):
         """
         Opens a new database connection to the database defined
-        by the inputted database.
+        by the inputted database.  When the pool is full, the request will
+        wait in line based on its priority, defaulting to the priority of the
+        current context.
 
         :return     <varaint> native connection
         """
-        host = self.database().writeHost() if writeAccess else self.database().host()
-        conn = self.open(writeAccess=writeAccess)
+        # statements within a transaction run through its pinned connection,
+        # which is committed when the transaction ends
+        pinned = self._pinned()
+        if pinned is not None:
+            yield pinned
+            return
+
+        if priority is None:
+            priority = orb.Context().priority
+
+        if writeAccess:
+            pool = self.pool(writeAccess=True)
+            conn = pool.checkout(priority=priority)
+            self.__router.markWrite()
+        else:
+            pool, conn = self._checkoutRead(priority)
+
         try:
             if isolation_level is not None:
                 if conn.isolation_level == isolation_level:
@@ -393,52 +949,82 @@ class SQLConnection(orb.Connection):
                 else:
                     conn.set_isolation_level(isolation_level)
             yield conn
-        except Exception:
-            if self._closed(conn):
+        except Exception as err:
+            # when a connection is lost, the other idle connections for the
+            # host are suspect as well, so make sure they get validated
+            if isinstance(err, orb.errors.ConnectionLost):
+                pool.invalidate()
+                self.__router.eject(pool.host())
+
+            if self._closed(conn) or isinstance(err, orb.errors.ConnectionLost):
+                pool.discard(conn)
+                conn = None
+            elif self._rollback(conn) is None:
+                pool.discard(conn)
                 conn = None
-                self.close()
-            else:
-                conn = self._rollback(conn)
             raise
         else:
             if not self._closed(conn):
                 self._commit(conn)
         finally:
-            if conn is not None and not self._closed(conn):
-                if isolation_level is not None:
+            if conn is not None:
+                if isolation_level is not None and not self._closed(conn):
                     conn.set_isolation_level(isolation_level)
-                self.__pool[host].put(conn)
+                pool.checkin(conn)
 
-    def open(self, writeAccess=False):
+    def open(self, writeAccess=False, priority=None):
         """
-        Returns the sqlite database for the current thread.
+        Borrows a native connection from the pool for the read or write host.
+        The connection must be given back to the pool when finished with it,
+        so the native context manager is the preferred way to access one.
 
         :return     <variant> || None
         """
-        host = self.database().writeHost() if writeAccess else self.database().host()
-        pool = self.__pool[host]
+        if priority is None:
+            priority = orb.Context().priority
+        return self.pool(writeAccess=writeAccess).checkout(priority=priority)
 
-        if self.__poolSize[host] >= self.__maxSize or pool.qsize():
-            if pool.qsize() == 0:
-                log.warning('Waiting for connection to database!!!')
-            return pool.get()
-        else:
-            db = self.database()
+    def pool(self, writeAccess=False, host=None):
+        """
+        Returns the connection pool for the given host, or the read or write
+        host of this connection's database, creating it from the database's
+        pool options on first access.
 
-            # process a pre-connect event
-            event = orb.events.ConnectionEvent()
-            db.onPreConnect(event)
+        :param      writeAccess | <bool>
+                    host        | <str> || None
 
-            self.__poolSize[host] += 1
-            try:
-                conn = self._open(self.database(), writeAccess=writeAccess)
-            except Exception:
-                self.__poolSize[host] -= 1
-                raise
-            else:
-                event = orb.events.ConnectionEvent(success=conn is not None, native=conn)
-                db.onPostConnect(event)
-                return conn
+        :return     <orb.core.connection_types.sql.pool.ConnectionPool>
+        """
+        db = self.database()
+        if host is None:
+            host = db.writeHost() if writeAccess else db.host()
+
+        try:
+            return self.__pools[host]
+        except KeyError:
+            with self.__poolLock:
+                if host not in self.__pools:
+                    self.__pools[host] = ConnectionPool(self,
+                                                        host=host,
+                                                        writeAccess=writeAccess,
+                                                        queueType=self.__queueType,
+                                                        maxSize=db.poolSize(host),
+                                                        minSize=db.minPoolSize(),
+                                                        maxAge=db.maxConnectionAge(),
+                                                        maxIdle=db.maxConnectionIdle(),
+                                                        prePing=db.prePing(),
+                                                        timeout=db.checkoutTimeout(),
+                                                        maxWaiters=db.maxWaiters())
+                return self.__pools[host]
+
+    def router(self):
+        """
+        Returns the router used to distribute read queries across the
+        database's read replicas.
+
+        :return     <orb.core.connection_types.sql.router.ReplicaRouter>
+        """
+        return self.__router
 
     def rollback(self):
         """
@@ -455,18 +1041,94 @@ class SQLConnection(orb.Connection):
 
     def select(self, model, context):
         SELECT = self.statement('SELECT')
-        sql, data = SELECT(model, context)
+        sql, data = self.__statements.compile(SELECT, model, context)
         if not sql:
             return []
         elif context.dryRun:
             log.info(sql % data)
             return []
         else:
+            cache, key = self._cached(model, context, sql, data)
+            if cache is not None:
+                rows = cache.get(key)
+                if rows is not None:
+                    return [dict(row) for row in rows]
+
             try:
-                return self.execute(sql, data)[0]
+                rows = self.execute(sql, data, priority=context.priority, prepare=True)[0]
             except orb.errors.EmptyCommand:
                 return [], 0
 
+            if cache is not None:
+                cache.set(key, [dict(row) for row in rows])
+            return rows
+
+    def selectMany(self, queries):
+        """
+        Runs several independent queries through a single connection.  Every
+        count is combined into one statement of scalar sub-queries, and the
+        selects are executed together with it through _executeMany, which
+        backends that can fold them into one round trip override.
+
+        :param      queries | [(<str> 'records' || 'count', <subclass of orb.Model>, <orb.Context>), ..]
+
+        :return     [[{<str> column: <variant> value, ..}, ..] || <int>, ..]
+        """
+        SELECT = self.statement('SELECT')
+        SELECT_COUNT = self.statement('SELECT COUNT')
+
+        commands = []
+        counts = []
+        slots = []
+        for method, model, context in queries:
+            statement = SELECT_COUNT if method == 'count' else SELECT
+            try:
+                sql, data = self.__statements.compile(statement, model, context)
+            except orb.errors.QueryIsNull:
+                sql, data = '', {}
+
+            sql = sql.strip().rstrip(';')
+            if not sql or context.dryRun:
+                if sql:
+                    print sql % data
+                slots.append(None)
+                continue
+
+            data.setdefault('locale', context.locale)
+            if method == 'count':
+                slots.append(('count', len(counts)))
+                counts.append((sql, data))
+            else:
+                slots.append(('records', len(commands)))
+                commands.append((sql + ';', data))
+
+        # prefix the values of each count so they can share the same statement
+        if counts:
+            fields = []
+            count_data = {}
+            for i, (sql, data) in enumerate(counts):
+                prefix = 'batch{0}_'.format(i)
+                sql = FORMAT_EXPR.sub(lambda x: '%({0}{1})s'.format(prefix, x.group(1)), sql)
+                count_data.update({prefix + key: value for key, value in data.items()})
+                fields.append(u'({0}) AS count_{1}'.format(sql, i))
+
+            commands.append((u'SELECT {0};'.format(', '.join(fields)), count_data))
+
+        results = []
+        if commands:
+            with self.native(priority=queries[0][2].priority) as conn:
+                results = self._executeMany(conn, commands)
+
+        output = []
+        for (method, model, context), slot in zip(queries, slots):
+            if slot is None:
+                output.append(0 if method == 'count' else [])
+            elif slot[0] == 'count':
+                output.append(results[-1][0]['count_{0}'.format(slot[1])] or 0)
+            else:
+                output.append(results[slot[1]])
+        return output
+
     def setBatchSize(self, size):
         """
         Sets the maximum number of records that can be inserted for a single
@@ -476,11 +1138,55 @@ class SQLConnection(orb.Connection):
         """
         self.__batchSize = size
 
+    def statements(self):
+        """
+        Returns the cache of compiled select statements for this connection.
+
+        :return     <orb.core.connection_types.sql.cache.StatementCache>
+        """
+        return self.__statements
+
+    def stream(self, model, context, size=1000):
+        """
+        Selects the records for the given model and context, yielding the raw
+        rows as they are fetched from the database in chunks of the given size
+        rather than loading the entire result into memory.  The connection is
+        held until the stream is exhausted or closed.
+
+        :param      model   | <subclass of orb.Model>
+                    context | <orb.Context>
+                    size    | <int>
+
+        :return     <generator> of {<str> key: <variant>, ..}
+        """
+        SELECT = self.statement('SELECT')
+        sql, data = self.__statements.compile(SELECT, model, context)
+        if not sql:
+            return
+        elif context.dryRun:
+            log.info(sql % data)
+            return
+
+        data.setdefault('locale', context.locale)
+        with self.native(priority=context.priority) as conn:
+            try:
+                for rows in self._stream(conn, sql.strip(), data, size):
+                    for row in rows:
+                        yield row
+
+            # clear out any open transaction when the stream is stopped early
+            except GeneratorExit:
+                if self._pinned() is not conn:
+                    self._rollback(conn)
+                raise
+
     def update(self, records, context):
         """
         Updates the modified data in the database for the
         inputted record.  If the dryRun flag is specified then
-        the command will be logged but not executed.
+        the command will be logged but not executed.  Records that
+        share the same changes are updated together, in chunks of
+        the batch size.
 
         :param      record   | <orb.Table>
                     lookup   | <orb.LookupOptions>
@@ -488,13 +1194,44 @@ class SQLConnection(orb.Connection):
 
         :return     <dict> changes
         """
-        UPDATE = self.statement('UPDATE')
-        sql, data = UPDATE(records)
-        if context.dryRun:
-            print sql, data
-            return [], 0
-        else:
-            return self.execute(sql, data, writeAccess=True)
+        return self._executeBatches(self.statement('UPDATE'), records, context)
+
+    def upsert(self, records, index, columns, context):
+        """
+        Inserts the given records in chunks of the batch size, matching any
+        existing records by the unique index.  Existing records have the given
+        columns updated.  Records that share the same index values are only
+        written once.
+
+        :param      records | [<orb.Model>, ..]
+                    index   | <orb.Index>
+                    columns | [<orb.Column>, ..]
+                    context | <orb.Context>
+
+        :return     [{<str> key: <variant>, ..} || None, ..] | stored row per record
+        """
+        UPSERT = self.statement('UPSERT')
+        if isinstance(records, orb.Collection):
+            records = records.records()
+
+        index_columns = index.columns()
+
+        def _key(values):
+            return tuple(value.lower() if isinstance(value, basestring) and
+                         not col.testFlag(col.Flags.CaseSensitive) else value
+                         for col, value in zip(index_columns, values))
+
+        keys = [_key([record.get(col, inflated=False) for col in index_columns]) for record in records]
+
+        unique = OrderedDict()
+        for key, record in zip(keys, records):
+            unique.setdefault(key, record)
+
+        results, _ = self._executeBatches(lambda chunk: UPSERT(chunk, index, columns), unique.values(), context)
+
+        # map the stored rows back onto the records by their index values
+        rows = {_key([row.get(col.field()) for col in index_columns]): row for row in results}
+        return [rows.get(key) for key in keys]
 
     @classmethod
     def statement(cls, code=''):
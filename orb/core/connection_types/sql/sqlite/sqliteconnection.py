@@ -48,6 +48,44 @@ def does_not_match(expr, item):
     """
     return re.match(expr, item) is None
 
+def format_command(cmd, data):
+    """
+    Maps the dictionary keywords within the command to the ordered parameter
+    style that sqlite requires, expanding any list values in place.
+
+    :param      cmd  | <str>
+                data | <dict>
+
+    :return     (<str> command, [<variant> arg, ..])
+    """
+    def _gen_sub_value(val):
+        output = []
+        replace = []
+
+        for sub_value in val:
+            if isinstance(sub_value, (list, tuple, set)):
+                sub_cmd, vals = _gen_sub_value(sub_value)
+                replace.append(sub_cmd)
+                output += vals
+            else:
+                replace.append('?')
+                output.append(sub_value)
+
+        return '({0})'.format(','.join(replace)), output
+
+    args = []
+    for grp, key in FORMAT_EXPR.findall(cmd):
+        value = data[key]
+        if isinstance(value, (list, tuple, set)):
+            replace, values = _gen_sub_value(value)
+            cmd = cmd.replace(grp, replace, 1)
+            args += values
+        else:
+            cmd = cmd.replace(grp, '?', 1)
+            args.append(value)
+
+    return cmd, args
+
 def dict_factory(cursor, row):
     """
     Converts the cursor information from a SQLite query to a dictionary.
@@ -83,9 +121,43 @@ class SQLiteConnection(SQLConnection):
     # ----------------------------------------------------------------------
     # PROTECTED METHODS
     # ----------------------------------------------------------------------
+    def _begin(self, native, isolation=None, readOnly=False):
+        """
+        Starts a transaction on the given native connection.  SQLite
+        transactions are always serializable, so the isolation level is not
+        used.  Read-only transactions are enforced through the query_only
+        pragma and defer their lock until the first read.
+
+        :param native: <sqlite3.Connection>
+        :param isolation: <str> || None
+        :param readOnly: <bool>
+        """
+        native.isolation_level = None
+        if readOnly:
+            self._execute(native, 'PRAGMA query_only = ON;', returning=False)
+            self._execute(native, 'BEGIN DEFERRED TRANSACTION;', returning=False)
+        else:
+            self._execute(native, 'BEGIN IMMEDIATE TRANSACTION;', returning=False)
+
     def _closed(self, native):
         return self.__threaded_connections.get(native) != threading.current_thread().ident
 
+    def _end(self, native, commit=True):
+        """
+        Commits or rolls back the transaction started on the given native
+        connection.
+
+        :param native: <sqlite3.Connection>
+        :param commit: <bool>
+
+        :return: <bool>
+        """
+        try:
+            self._execute(native, 'COMMIT;' if commit else 'ROLLBACK;', returning=False)
+        finally:
+            self._execute(native, 'PRAGMA query_only = OFF;', returning=False)
+        return True
+
     def _execute(self,
                  native,
                  command,
@@ -109,28 +181,17 @@ class SQLiteConnection(SQLConnection):
         # check to make sure the connection hasn't been reset or lost
         cursor = native.cursor()
 
+        # statements within a transaction are committed when it ends
+        in_transaction = self._pinned() is native
+
         # determine if we're executing multiple statements at once
         commands = [cmd for cmd in command.split(';') if cmd]
-        if len(commands) > 1:
-            native.isolation_level = 'IMMEDIATE'
-            commands.insert(0, 'BEGIN TRANSACTION')
-        else:
-            native.isolation_level = None
-
-        def _gen_sub_value(val):
-            output = []
-            replace = []
-
-            for sub_value in val:
-                if isinstance(sub_value, (list, tuple, set)):
-                    cmd, vals = _gen_sub_value(sub_value)
-                    replace.append(cmd)
-                    output += vals
-                else:
-                    replace.append('?')
-                    output.append(sub_value)
-
-                return '({0})'.format(','.join(replace)), output
+        if not in_transaction:
+            if len(commands) > 1:
+                native.isolation_level = 'IMMEDIATE'
+                commands.insert(0, 'BEGIN TRANSACTION')
+            else:
+                native.isolation_level = None
 
         rowcount = 0
         for cmd in commands:
@@ -139,17 +200,7 @@ class SQLiteConnection(SQLConnection):
 
             # map the dictionary keywords to the param based for sqlite
             # (sqlite requires ordered options vs. keywords)
-            args = []
-            for grp, key in FORMAT_EXPR.findall(cmd):
-                value = data[key]
-                if isinstance(value, (list, tuple, set)):
-                    replace, values = _gen_sub_value(value)
-                    cmd = cmd.replace(grp, replace)
-                    args += values
-                else:
-                    cmd = cmd.replace(grp, '?')
-                    args.append(value)
-
+            cmd, args = format_command(cmd, data)
 
             log.debug('***********************')
             log.debug(command)
@@ -193,12 +244,13 @@ class SQLiteConnection(SQLConnection):
         else:
             results = []
 
-        native.isolation_level = None
-        native.commit()
+        if not in_transaction:
+            native.isolation_level = None
+            native.commit()
 
         return results, rowcount
 
-    def _open(self, db, writeAccess=False):
+    def _open(self, db, writeAccess=False, host=None):
         """
         Handles simple, SQL specific connection creation.  This will not
         have to manage thread information as it is already managed within
@@ -213,8 +265,13 @@ class SQLiteConnection(SQLConnection):
 
         dbname = db.name()
 
+        # sqlite prepares every statement, so re-use its own statement cache
+        kwds = {}
+        if db.prepareStatements():
+            kwds['cached_statements'] = db.maxPreparedStatements()
+
         try:
-            sqlite_db = sqlite.connect(dbname)
+            sqlite_db = sqlite.connect(dbname, **kwds)
             sqlite_db.create_function('REGEXP', 2, matches)
             sqlite_db.row_factory = dict_factory
             sqlite_db.text_factory = unicode
@@ -238,10 +295,44 @@ class SQLiteConnection(SQLConnection):
         except StandardError:
             pass
 
-    def delete(self, records, context):
-        count = len(records)
-        super(SQLiteConnection, self).delete(records, context)
-        return [], count
+    def _stream(self, native, command, data, size, mapper=dict):
+        """
+        Executes the given select command and fetches its results from the
+        cursor in chunks rather than loading them all into memory at once.
+
+        :param      native  | <sqlite3.Connection>
+                    command | <str>
+                    data    | <dict>
+                    size    | <int>
+                    mapper  | <variant>
+
+        :return     <generator> of [{<str> key: <variant>, ..}, ..]
+        """
+        cmd, args = format_command(command.strip().rstrip(';') + ';', data)
+
+        log.debug('***********************')
+        log.debug(cmd)
+        log.debug(args)
+        log.debug('***********************')
+
+        cursor = native.cursor()
+        try:
+            try:
+                cursor.execute(cmd, tuple(args))
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    yield [mapper(row) for row in rows]
+
+            except sqlite.OperationalError as err:
+                if err == 'interrupted':
+                    raise orb.errors.Interruption()
+                else:
+                    raise orb.errors.QueryFailed(cmd, args, nstr(err))
+        finally:
+            cursor.close()
+
 
     def schemaInfo(self, context):
         tables_sql = "select name from sqlite_master where type = 'table';"
@@ -272,6 +363,25 @@ class SQLiteConnection(SQLConnection):
 
         return output
 
+    def upsert(self, records, index, columns, context):
+        """
+        Inserts the given records, matching any existing records by the unique
+        index.  The native upsert returns the stored rows, which needs SQLite
+        3.35 or newer, so older versions look up each record through the index
+        before saving it instead.
+
+        :param      records | [<orb.Model>, ..]
+                    index   | <orb.Index>
+                    columns | [<orb.Column>, ..]
+                    context | <orb.Context>
+
+        :return     [{<str> key: <variant>, ..} || None, ..] | stored row per record
+        """
+        if sqlite.sqlite_version_info < (3, 35, 0):
+            return orb.Connection.upsert(self, records, index, columns, context)
+        else:
+            return super(SQLiteConnection, self).upsert(records, index, columns, context)
+
     # ----------------------------------------------------------------------
 
     @classmethod
@@ -8,4 +8,5 @@ from . import insert
 from . import select
 from . import select_count
 from . import update
+from . import upsert
 from . import where
\ No newline at end of file
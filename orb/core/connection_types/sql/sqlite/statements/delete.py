@@ -6,7 +6,7 @@ orb = lazy_import('orb')
 
 
 class DELETE(SQLiteStatement):
-    def __call__(self, records, data=None):
+    def __call__(self, records, data=None, limit=None):
         # delete based on the collection's context
         if isinstance(records, orb.Collection) and not records.isLoaded():
             model = records.model()
@@ -20,12 +20,26 @@ class DELETE(SQLiteStatement):
 
             sql_options = {
                 'table': model.schema().dbname(),
-                'where': 'WHERE {0}'.format(where) if where else ''
+                'id_col': model.schema().idColumn().field(),
+                'where': 'WHERE {0}'.format(where) if where else '',
+                'limit': limit
             }
-            sql = (
-                u'DELETE FROM `{table}`\n'
-                u'{where};'
-            ).format(**sql_options)
+
+            # delete a chunk of the matching records at a time
+            if limit:
+                sql = (
+                    u'DELETE FROM `{table}`\n'
+                    u'WHERE `{id_col}` IN (\n'
+                    u'    SELECT `{id_col}` FROM `{table}`\n'
+                    u'    {where}\n'
+                    u'    LIMIT {limit}\n'
+                    u');'
+                ).format(**sql_options)
+            else:
+                sql = (
+                    u'DELETE FROM `{table}`\n'
+                    u'{where};'
+                ).format(**sql_options)
 
             records.clear()
             return sql, data
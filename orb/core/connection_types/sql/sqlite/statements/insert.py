@@ -19,6 +19,7 @@ class INSERT(SQLiteStatement):
 
             # define the
             if not schema in schema_meta:
+                id_column = schema.idColumn()
                 i18n = []
                 standard = []
                 for col in schema.columns().values():
@@ -27,47 +28,70 @@ class INSERT(SQLiteStatement):
 
                     if col.testFlag(col.Flags.I18n):
                         i18n.append(col)
-                    elif not col.testFlag(col.Flags.AutoAssign):
+                    elif col is id_column or not col.testFlag(col.Flags.AutoAssign):
                         standard.append(col)
 
                 schema_meta[schema] = {'i18n': i18n, 'standard': standard}
 
-            if not schema in schema_meta:
-                schema_meta[schema] = {'i18n': [], 'standard': []}
-
+            id_column = schema.idColumn()
             for key, columns in schema_meta[schema].items():
                 data.update({'{0}_{1}'.format(col.field(), i): col.dbStore('SQLite', record.get(col)) for col in columns})
-                values = ','.join(['%({0}_{1})s'.format(col.field(), i) for col in columns])
-                schema_records[schema][key].append(values)
+
+            # records without an id are assigned one by the database
+            if id_column.testFlag(id_column.Flags.AutoAssign) and record.id() is None:
+                group = 'auto'
+            else:
+                group = 'known'
+
+            schema_records[schema][group].append(i)
 
         cmd = []
         for schema, columns in schema_meta.items():
             id_column = schema.idColumn()
+            known = schema_records[schema]['known']
+            auto = schema_records[schema]['auto']
             subcmd = ''
 
-            if columns['standard']:
-                cols = ', '.join(['`{0}`'.format(col.field()) for col in columns['standard']])
-                values = schema_records[schema]['standard']
-                subcmd += 'INSERT INTO `{0}` ({1}) VALUES'.format(schema.dbname(), cols)
-                for value in values[:-1]:
-                    subcmd += '\n({0}),'.format(value)
-                subcmd += '\n({0});'.format(values[-1])
-                subcmd += '\nSELECT last_insert_rowid() AS `{0}`;'.format(id_column.field())
-
-            elif columns['i18n']:
-                subcmd += '\nINSERT INTO `{0}` DEFAULT VALUES;'.format(schema.dbname(), id_column.field())
+            # insert the records that already carry their ids first, so the last statement
+            # run before the lookup below adds the sequential rowids for the rest
+            cols = ', '.join(['`{0}`'.format(col.field()) for col in columns['standard']])
+            for indexes in (known, auto):
+                if indexes:
+                    values = ',\n'.join('({0})'.format(','.join('%({0}_{1})s'.format(col.field(), i)
+                                                                  for col in columns['standard']))
+                                        for i in indexes)
+                    subcmd += '\nINSERT INTO `{0}` ({1}) VALUES\n{2};'.format(schema.dbname(), cols, values)
+
+            # each record resolves to its own id, or to its offset within the auto assigned range
+            offsets = {i: offset for offset, i in enumerate(auto)}
+            rows = []
+            for i in sorted(known + auto):
+                if i in offsets:
+                    row = ['{0}'.format(i), 'NULL', '{0}'.format(offsets[i])]
+                else:
+                    row = ['{0}'.format(i), '%({0}_{1})s'.format(id_column.field(), i), 'NULL']
+
+                row += ['%({0}_{1})s'.format(col.field(), i) for col in columns['i18n']]
+                rows.append('({0})'.format(', '.join(row)))
+
+            select = 'SELECT {{0}} FROM (SELECT last_insert_rowid() - changes() + 1 AS `first`) AS `a`, ' \
+                     '(VALUES\n{0}) AS `v` ORDER BY `v`.`column1`'.format(',\n'.join(rows))
+            record_id = 'COALESCE(`v`.`column2`, `a`.`first` + `v`.`column3`)'
 
             if columns['i18n']:
                 cols = ', '.join(['`{0}`'.format(col.field()) for col in columns['i18n']])
-                values = schema_records[schema]['i18n']
-                subcmd += '\nINSERT INTO `{0}_i18n` (`{0}_id`, `locale`, {1}) VALUES'.format(schema.dbname(), cols)
-                for i, value in enumerate(values[:-1]):
-                    subcmd += '\n(last_insert_rowid() - {0}, %(locale)s, {1}),'.format(len(values) - (i+1), value)
-                subcmd += '\n(last_insert_rowid(), %(locale)s, {0});'.format(values[-1])
-                subcmd += '\nSELECT last_insert_rowid() AS `{1}`;'.format(schema.dbname(), id_column.field())
+                values = ', '.join(['`v`.`column{0}`'.format(c + 4) for c in xrange(len(columns['i18n']))])
+                subcmd += '\nINSERT INTO `{0}_i18n` (`{0}_id`, `locale`, {1})\n'.format(schema.dbname(), cols)
+                subcmd += select.format('{0}, %(locale)s, {1}'.format(record_id, values)) + ';'
+
+                # the rows added by a single statement are assigned sequential rowids
+                subcmd += '\nSELECT `{0}_id` AS `{1}` FROM `{0}_i18n` WHERE `_rowid_` > last_insert_rowid() - changes() ' \
+                          'ORDER BY `_rowid_`;'.format(schema.dbname(), id_column.field())
+            else:
+                subcmd += '\n' + select.format('{0} AS `{1}`'.format(record_id, id_column.field())) + ';'
 
             cmd.append(subcmd)
 
         return '\n'.join(cmd), data
 
-SQLiteStatement.registerAddon('INSERT', INSERT())
\ No newline at end of file
+SQLiteStatement.registerAddon('INSERT', INSERT())
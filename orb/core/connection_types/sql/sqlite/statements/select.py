@@ -113,14 +113,18 @@ class SELECT(SQLiteStatement):
             cmd.append(u'GROUP BY {0}'.format(', '.join(sql_group_by)))
         if sql_order_by:
             cmd.append(u'ORDER BY {0}'.format(', '.join(sql_order_by)))
-        if context.start:
-            if not isinstance(context.start, (int, long)):
-                raise orb.errors.DatabaseError('Invalid value provided for start')
-            cmd.append(u'OFFSET {0}'.format(context.start))
+        # sqlite requires the LIMIT to come before the OFFSET, and a limit
+        # of -1 to define an offset without one
         if context.limit > 0:
             if not isinstance(context.limit, (int, long)):
                 raise orb.errors.DatabaseError('Invalid value provided for limit')
             cmd.append(u'LIMIT {0}'.format(context.limit))
+        elif context.start:
+            cmd.append(u'LIMIT -1')
+        if context.start:
+            if not isinstance(context.start, (int, long)):
+                raise orb.errors.DatabaseError('Invalid value provided for start')
+            cmd.append(u'OFFSET {0}'.format(context.start))
 
         return u'\n'.join(cmd), data
 
@@ -0,0 +1,68 @@
+from projex.lazymodule import lazy_import
+from ..sqliteconnection import SQLiteStatement
+
+orb = lazy_import('orb')
+
+
+class UPSERT(SQLiteStatement):
+    def __call__(self, records, index, columns=None):
+        """
+        Inserts the given records, matching existing records by the columns
+        of the unique index.  When a record already exists, the given columns
+        are updated, otherwise the existing record is left as it is.  Either
+        way, the stored row for every record is returned, which requires
+        SQLite 3.35 or newer for the RETURNING clause.
+
+        :param records: [<orb.Model>, ..]
+        :param index: <orb.Index>
+        :param columns: [<orb.Column>, ..] || None
+
+        :return: <str> sql, <dict> data
+        """
+        if isinstance(records, orb.Collection):
+            records = records.records()
+
+        schema = index.schema()
+        insert_columns = [col for col in schema.columns().values()
+                          if not col.testFlag(col.Flags.Virtual) and
+                          not col.testFlag(col.Flags.I18n) and
+                          not col.testFlag(col.Flags.AutoAssign)]
+
+        data = {}
+        values = []
+        for record in records:
+            keys = []
+            for column in insert_columns:
+                value_key = self.valueKey(column.field())
+                data[value_key] = column.dbStore('SQLite', record.get(column))
+                keys.append(value_key)
+
+            values.append(u'({0})'.format(', '.join(u'%({0})s'.format(key) for key in keys)))
+
+        # the conflict target has to match the collation of the unique index
+        target = [u'`{0}`'.format(col.field()) if col.testFlag(col.Flags.CaseSensitive)
+                  else u'`{0}` COLLATE NOCASE'.format(col.field())
+                  for col in index.columns()]
+
+        # an update is always made so the existing rows are returned
+        if columns:
+            updates = [u'`{0}` = excluded.`{0}`'.format(col.field()) for col in columns]
+        else:
+            updates = [u'`{0}` = `{0}`'.format(col.field()) for col in index.columns()[:1]]
+
+        sql = (
+            u'INSERT INTO `{table}` ({fields})\n'
+            u'VALUES {values}\n'
+            u'ON CONFLICT ({target}) DO UPDATE\n'
+            u'SET {updates}\n'
+            u'RETURNING *;'
+        ).format(table=schema.dbname(),
+                 fields=', '.join(u'`{0}`'.format(col.field()) for col in insert_columns),
+                 values=',\n       '.join(values),
+                 target=', '.join(target),
+                 updates=', '.join(updates))
+
+        return sql, data
+
+
+SQLiteStatement.registerAddon('UPSERT', UPSERT())
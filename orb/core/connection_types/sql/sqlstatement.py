@@ -6,8 +6,11 @@ out.
 import logging
 
 from abc import abstractmethod
+from contextlib import contextmanager
 from projex.addon import AddonManager
 
+from ...local import local
+
 log = logging.getLogger(__name__)
 
 
@@ -23,6 +26,51 @@ class SQLStatement(AddonManager):
         # this method will need to be implemented to render each individual template
         # based on its own needs
 
+    @staticmethod
+    @contextmanager
+    def scope():
+        """
+        Groups the statements that are rendered within it so that they share
+        one sequence of value keys.  The sequence restarts for each outermost
+        scope, which means the same statement will always render the same SQL.
+
+        :usage
+
+            |with SQLStatement.scope() as keys:
+            |    sql, data = SELECT(model, context)
+
+        :return     [<str> key, ..] | the keys generated within the scope
+        """
+        store = local('orb.sql.statement')
+        depth = getattr(store, 'depth', 0)
+        if not depth:
+            store.count = 0
+            store.keys = []
+
+        store.depth = depth + 1
+        try:
+            yield store.keys
+        finally:
+            store.depth = depth
+
+    @staticmethod
+    def valueKey(name):
+        """
+        Returns the next unique key to use when binding a value within the
+        current scope.
+
+        :param      name | <str>
+
+        :return     <str>
+        """
+        store = local('orb.sql.statement')
+        store.count = getattr(store, 'count', 0) + 1
+
+        key = u'{0}_{1}'.format(name, store.count)
+        if getattr(store, 'depth', 0):
+            store.keys.append(key)
+        return key
+
 # define the default lengths
 SQLStatement.registerAddon('Length::Color', 25)
 SQLStatement.registerAddon('Length::String', 256)
@@ -6,10 +6,9 @@ will map to one of the classes defined in this module.
 """
 
 import copy
-import threading
-from collections import defaultdict
 from projex.lazymodule import lazy_import
-from projex.locks import ReadWriteLock, WriteLocker, ReadLocker
+
+from .local import local
 
 orb = lazy_import('orb')
 
@@ -39,12 +38,14 @@ class Context(object):
         'order': None,
         'page': None,
         'pageSize': None,
+        'priority': None,
         'scope': None,
         'returning': 'records',
         'start': None,
         'timezone': None,
         'where': None,
-        'useBaseQuery': True
+        'useBaseQuery': True,
+        'useCache': True
     }
 
     QueryFields = {
@@ -60,9 +61,18 @@ class Context(object):
 
     UnhashableOptions = {
         'db',
+        'priority',
         'scope'
     }
 
+    Priorities = {
+        'interactive': 0,
+        'default': 5,
+        'batch': 10
+    }
+
+    HashKeys = tuple(sorted(set(Defaults) - UnhashableOptions))
+
     def __eq__(self, other):
         return hash(self) == hash(other)
 
@@ -70,13 +80,13 @@ class Context(object):
         return hash(self) != hash(other)
 
     def __hash__(self):
-        keys = sorted(self.Defaults.keys())
+        try:
+            return self.__cache['hash']
+        except KeyError:
+            pass
 
         hash_keys = []
-        for key in keys:
-            if key in self.__class__.UnhashableOptions:
-                continue
-
+        for key in self.HashKeys:
             value = self.raw_values.get(key, self.__class__.Defaults[key])
             if isinstance(value, (list, set)):
                 value = tuple(value)
@@ -88,8 +98,9 @@ class Context(object):
 
             hash_keys.append(hash_value)
 
-
-        return hash(tuple(hash_keys))
+        # the hash is cached until the values for this context change
+        output = self.__cache['hash'] = hash(tuple(hash_keys))
+        return output
 
     def __enter__(self):
         """
@@ -115,6 +126,7 @@ class Context(object):
 
     def __init__(self, **kwds):
         self.__dict__['raw_values'] = {}
+        self.__dict__['_Context__cache'] = {}
         self.update(kwds)
 
     def __getattr__(self, key):
@@ -128,6 +140,7 @@ class Context(object):
             raise AttributeError(key)
         else:
             self.raw_values[key] = value
+            self.__cache.clear()
 
     def __iter__(self):
         for k in self.Defaults:
@@ -148,6 +161,33 @@ class Context(object):
 
         return Context(**properties)
 
+    def derive(self, **kwds):
+        """
+        Returns a new context that shares the values of this one, replacing
+        the given values.  Unlike creating a new context from this one, the
+        default contexts are not merged in again.
+
+        :usage
+
+            |sub_context = context.derive(limit=10)
+
+        :return     <orb.Context>
+        """
+        values = dict(self.raw_values)
+        if kwds:
+            if isinstance(kwds.get('columns'), (str, unicode)):
+                kwds['columns'] = kwds['columns'].split(',')
+            if isinstance(kwds.get('where'), dict):
+                kwds['where'] = orb.Query.fromJSON(kwds['where'])
+
+            self._validate(kwds)
+            values.update({k: v for k, v in kwds.items() if k in self.Defaults})
+
+        out = Context.__new__(Context)
+        out.__dict__['raw_values'] = values
+        out.__dict__['_Context__cache'] = {}
+        return out
+
     @property
     def db(self):
         try:
@@ -183,6 +223,15 @@ class Context(object):
 
         :return: <dict>
         """
+        # the tree is cached for each model, and a copy is returned as callers modify it
+        def copy_tree(tree):
+            return {key: copy_tree(children) for key, children in tree.items()}
+
+        try:
+            return copy_tree(self.__cache[('expandtree', model)])
+        except KeyError:
+            pass
+
         if model and not self.columns:
             schema = model.schema()
             defaults = schema.columns(flags=orb.Column.Flags.AutoExpand).keys()
@@ -190,20 +239,17 @@ class Context(object):
         else:
             defaults = []
 
-        expand = self.expand or defaults
-        if not expand:
-            return {}
-
         def build_tree(parts, tree):
             tree.setdefault(parts[0], {})
             if len(parts) > 1:
                 build_tree(parts[1:], tree[parts[0]])
 
         tree = {}
-        for branch in expand:
+        for branch in self.expand or defaults:
             build_tree(branch.split('.'), tree)
 
-        return tree
+        self.__cache[('expandtree', model)] = tree
+        return copy_tree(tree)
 
     def isNull(self):
         """
@@ -228,7 +274,25 @@ class Context(object):
         if isinstance(out, set):
             return list(out)
         elif isinstance(out, (str, unicode)):
-            return [(x.strip('+-'), 'desc' if x.startswith('-') else 'asc') for x in out.split(',') if x]
+            try:
+                return list(self.__cache['order'])
+            except KeyError:
+                order = [(x.strip('+-'), 'desc' if x.startswith('-') else 'asc') for x in out.split(',') if x]
+                self.__cache['order'] = order
+                return list(order)
+        else:
+            return out
+
+    @property
+    def priority(self):
+        out = self.raw_values.get('priority')
+        if out is None:
+            return self.Priorities['default']
+        elif isinstance(out, (str, unicode)):
+            try:
+                return self.Priorities[out]
+            except KeyError:
+                raise orb.errors.ContextError('{0} is not a valid priority'.format(out))
         else:
             return out
 
@@ -332,64 +396,55 @@ class Context(object):
         if isinstance(where, (orb.Query, orb.QueryCompound)):
             other_context['where'] &= self.where
 
-        # validate values
-        if other_context.get('start') is not None and (type(other_context['start']) != int or other_context['start'] < 0):
+        self._validate(other_context)
+
+        # update the raw values
+        self.raw_values.update({k: v for k, v in other_context.items() if k in self.Defaults})
+        self.__cache.clear()
+
+    @staticmethod
+    def _validate(values):
+        """
+        Validates the slicing values for a context.
+
+        :param      values | <dict>
+        """
+        if values.get('start') is not None and (type(values['start']) != int or values['start'] < 0):
             msg = 'Start needs to be a positive number, got {0} instead'
-            raise orb.errors.ContextError(msg.format(other_context.get('start)')))
-        if other_context.get('page') is not None and (type(other_context['page']) != int or other_context['page'] < 1):
+            raise orb.errors.ContextError(msg.format(values.get('start)')))
+        if values.get('page') is not None and (type(values['page']) != int or values['page'] < 1):
             msg = 'Page needs to be a number equal to or greater than 1, got {0} instead'
-            raise orb.errors.ContextError(msg.format(other_context.get('page')))
-        if other_context.get('limit') is not None and (type(other_context['limit']) != int or other_context['limit'] < 1):
+            raise orb.errors.ContextError(msg.format(values.get('page')))
+        if values.get('limit') is not None and (type(values['limit']) != int or values['limit'] < 1):
             msg = 'Limit needs to be a number equal to or greater than 1, got {0} instead'
-            raise orb.errors.ContextError(msg.format(other_context.get('limit')))
-        if other_context.get('pageSize') is not None and (type(other_context['pageSize']) != int or other_context['pageSize'] < 1):
+            raise orb.errors.ContextError(msg.format(values.get('limit')))
+        if values.get('pageSize') is not None and (type(values['pageSize']) != int or values['pageSize'] < 1):
             msg = 'Page size needs to be a number equal to or greater than 1, got {0} instead'
-            raise orb.errors.ContextError(msg.format(other_context.get('pageSize')))
+            raise orb.errors.ContextError(msg.format(values.get('pageSize')))
 
-        # update the raw values
-        self.raw_values.update({k: v for k, v in other_context.items() if k in self.Defaults})
+    @staticmethod
+    def _defaultStack():
+        store = local('orb.context')
+        try:
+            return store.defaults
+        except AttributeError:
+            store.defaults = []
+            return store.defaults
 
     @classmethod
     def defaultContexts(cls):
-        defaults = getattr(cls, '_{0}__defaults'.format(cls.__name__), None)
-        if defaults is None:
-            defaults = defaultdict(list)
-            lock = ReadWriteLock()
-            setattr(cls, '_{0}__defaults'.format(cls.__name__), defaults)
-            setattr(cls, '_{0}__defaultsLock'.format(cls.__name__), lock)
-        else:
-            lock = getattr(cls, '_{0}__defaultsLock'.format(cls.__name__))
+        """
+        Returns the stack of default contexts for the current thread, or the
+        current greenlet when the worker_class setting is 'gevent'.
 
-        tid = threading.currentThread().ident
-        with ReadLocker(lock):
-            return defaults.get(tid) or []
+        :return     [<orb.Context>, ..]
+        """
+        return cls._defaultStack()
 
     @classmethod
     def popDefaultContext(cls):
-        defaults = getattr(cls, '_{0}__defaults'.format(cls.__name__), None)
-        if defaults is None:
-            defaults = defaultdict(list)
-            lock = ReadWriteLock()
-            setattr(cls, '_{0}__defaults'.format(cls.__name__), defaults)
-            setattr(cls, '_{0}__defaultsLock'.format(cls.__name__), lock)
-        else:
-            lock = getattr(cls, '_{0}__defaultsLock'.format(cls.__name__))
-
-        tid = threading.currentThread().ident
-        with WriteLocker(lock):
-            defaults[tid].pop()
+        cls._defaultStack().pop()
 
     @classmethod
     def pushDefaultContext(cls, context):
-        defaults = getattr(cls, '_{0}__defaults'.format(cls.__name__), None)
-        if defaults is None:
-            defaults = defaultdict(list)
-            lock = ReadWriteLock()
-            setattr(cls, '_{0}__defaults'.format(cls.__name__), defaults)
-            setattr(cls, '_{0}__defaultsLock'.format(cls.__name__), lock)
-        else:
-            lock = getattr(cls, '_{0}__defaultsLock'.format(cls.__name__))
-
-        tid = threading.currentThread().ident
-        with WriteLocker(lock):
-            defaults[tid].append(context)
+        cls._defaultStack().append(context)
@@ -26,7 +26,25 @@ class Database(object):
                  name=None,
                  writeHost=None,
                  timeout=20000,
-                 credentials=None):
+                 credentials=None,
+                 poolSize=None,
+                 minPoolSize=0,
+                 maxConnectionAge=0,
+                 maxConnectionIdle=0,
+                 prePing=False,
+                 checkoutTimeout=None,
+                 maxWaiters=0,
+                 readHosts=None,
+                 balancing='weighted',
+                 maxReplicaLag=0,
+                 replicaRetry=30,
+                 stickyWrites=0,
+                 applicationName=None,
+                 searchPath=None,
+                 initSql=None,
+                 prepareStatements=False,
+                 prepareThreshold=5,
+                 maxPreparedStatements=100):
 
         # define custom properties
         self.__connection = None
@@ -39,9 +57,28 @@ class Database(object):
         self.__password = password
         self.__credentials = credentials
         self.__timeout = timeout  # ms
+        self.__poolSize = poolSize
+        self.__minPoolSize = minPoolSize
+        self.__maxConnectionAge = maxConnectionAge  # seconds
+        self.__maxConnectionIdle = maxConnectionIdle  # seconds
+        self.__prePing = prePing
+        self.__checkoutTimeout = checkoutTimeout  # seconds
+        self.__maxWaiters = maxWaiters
+        self.__readHosts = {}
+        self.setBalancing(balancing)
+        self.__maxReplicaLag = maxReplicaLag  # seconds
+        self.__replicaRetry = replicaRetry  # seconds
+        self.__stickyWrites = stickyWrites  # seconds
+        self.__applicationName = applicationName
+        self.__searchPath = searchPath
+        self.__initSql = initSql
+        self.__prepareStatements = prepareStatements
+        self.__prepareThreshold = prepareThreshold
+        self.__maxPreparedStatements = maxPreparedStatements
 
         # setup the connection type
         self.setConnection(connectionType)
+        self.setReadHosts(readHosts)
 
     def __del__(self):
         self.disconnect()
@@ -82,6 +119,34 @@ class Database(object):
         """
         self.connection().addNamespace(namespace, orb.Context(**context))
 
+    def applicationName(self):
+        """
+        Returns the name that this application reports to the database server
+        when it connects.
+
+        :return     <str> || None
+        """
+        return self.__applicationName
+
+    def balancing(self):
+        """
+        Returns the strategy used to balance reads across the read replicas.
+        This will be either 'weighted' or 'leastConnections'.
+
+        :return     <str>
+        """
+        return self.__balancing
+
+    def checkoutTimeout(self):
+        """
+        Returns the maximum number of seconds a request will wait for a
+        connection from the pool before raising a PoolTimeout error.  A value
+        of None will wait indefinitely.
+
+        :return     <float> || None
+        """
+        return self.__checkoutTimeout
+
     def code(self):
         """
         Returns the ID code for this database.  Using codes for different database instances will allow
@@ -135,6 +200,15 @@ class Database(object):
         """
         return self.__host
 
+    def initSql(self):
+        """
+        Returns the SQL that is run once for every new connection made to
+        this database, after the backend has setup its session.
+
+        :return     <str> || None
+        """
+        return self.__initSql
+
     def interrupt(self, threadId=None):
         """
         Interrupts the thread at the given id.
@@ -153,6 +227,136 @@ class Database(object):
         """
         return self.__connection.isConnected()
 
+    def maxConnectionAge(self):
+        """
+        Returns the maximum number of seconds a pooled connection will be kept
+        open for before it is recycled.  A value of 0 will keep connections
+        open indefinitely.
+
+        :return     <int>
+        """
+        return self.__maxConnectionAge
+
+    def maxConnectionIdle(self):
+        """
+        Returns the maximum number of seconds a pooled connection can sit idle
+        before it is recycled.  A value of 0 will keep idle connections open
+        indefinitely.
+
+        :return     <int>
+        """
+        return self.__maxConnectionIdle
+
+    def maxReplicaLag(self):
+        """
+        Returns the maximum number of seconds a read replica can fall behind
+        the primary before it is ejected.  A value of 0 disables lag checks.
+
+        :return     <float>
+        """
+        return self.__maxReplicaLag
+
+    def maxWaiters(self):
+        """
+        Returns the maximum number of requests that can wait in line for a
+        connection from each pool before new requests are rejected with a
+        PoolExhausted error.  A value of 0 does not limit the line.
+
+        :return     <int>
+        """
+        return self.__maxWaiters
+
+    def metrics(self):
+        """
+        Returns the connection pool metrics for this database, per host.
+
+        :return     {<str> host: <dict>, ..}
+        """
+        return self.__connection.metrics()
+
+    def maxPreparedStatements(self):
+        """
+        Returns the maximum number of prepared statements that will be kept
+        open on each connection before the least recently used one is
+        deallocated.
+
+        :return     <int>
+        """
+        return self.__maxPreparedStatements
+
+    def minPoolSize(self):
+        """
+        Returns the number of connections that will be opened up front and kept
+        warm within each connection pool.
+
+        :return     <int>
+        """
+        return self.__minPoolSize
+
+    def poolSize(self, host=None):
+        """
+        Returns the maximum number of connections that can be opened to the
+        given host.  The pool size can be defined per host by assigning a
+        dictionary, otherwise it will fall back to the max_connections setting.
+
+        :param      host | <str> || None
+
+        :return     <int>
+        """
+        size = self.__poolSize
+        if isinstance(size, dict):
+            size = size.get(host)
+
+        if size is None:
+            size = orb.system.settings().max_connections
+        return int(size)
+
+    def readHosts(self):
+        """
+        Returns the read replicas for this database, mapped to their weight.
+
+        :return     {<str> host: <int> weight, ..}
+        """
+        return self.__readHosts
+
+    def replicaRetry(self):
+        """
+        Returns the number of seconds an ejected read replica is kept out of
+        rotation before it is tried again.
+
+        :return     <float>
+        """
+        return self.__replicaRetry
+
+    def prepareStatements(self):
+        """
+        Returns whether or not frequently run select statements are prepared
+        on the server for each connection.  This should be disabled when
+        connecting through a proxy that pools connections per transaction,
+        such as PgBouncer, as the prepared statements live on the session.
+
+        :return     <bool>
+        """
+        return self.__prepareStatements
+
+    def prepareThreshold(self):
+        """
+        Returns the number of times a statement has to be run before it will
+        be prepared on the server.
+
+        :return     <int>
+        """
+        return self.__prepareThreshold
+
+    def prePing(self):
+        """
+        Returns whether or not pooled connections are validated with a ping
+        before being handed out.
+
+        :return     <bool>
+        """
+        return self.__prePing
+
     def timeout(self):
         """
         Returns the maximum number of milliseconds to allow a query to occur before timing it out.
@@ -185,6 +389,166 @@ class Database(object):
         """
         return self.__port
 
+    def searchPath(self):
+        """
+        Returns the schema search path for connections to this database, for
+        the backends that support one.
+
+        :return     <str> || [<str>, ..] || None
+        """
+        return self.__searchPath
+
+    def setApplicationName(self, name):
+        """
+        Sets the name that this application reports to the database server.
+        This will only affect connections that are made afterwards.
+
+        :param      name | <str> || None
+        """
+        self.__applicationName = name
+
+    def setBalancing(self, balancing):
+        """
+        Sets the strategy used to balance reads across the read replicas.
+
+        :param      balancing | <str> | 'weighted' || 'leastConnections'
+        """
+        if balancing not in ('weighted', 'leastConnections'):
+            raise orb.errors.OrbError('Invalid balancing strategy: {0}'.format(balancing))
+        self.__balancing = balancing
+
+    def setCheckoutTimeout(self, seconds):
+        """
+        Sets the maximum number of seconds a request will wait for a
+        connection from the pool.
+
+        :param      seconds | <float> || None
+        """
+        self.__checkoutTimeout = seconds
+
+    def setInitSql(self, sql):
+        """
+        Sets the SQL that is run once for every new connection made to this
+        database.
+
+        :param      sql | <str> || None
+        """
+        self.__initSql = sql
+
+    def setMaxConnectionAge(self, seconds):
+        """
+        Sets the maximum number of seconds a pooled connection will be kept
+        open for before it is recycled.
+
+        :param      seconds | <int>
+        """
+        self.__maxConnectionAge = seconds
+
+    def setMaxConnectionIdle(self, seconds):
+        """
+        Sets the maximum number of seconds a pooled connection can sit idle
+        before it is recycled.
+
+        :param      seconds | <int>
+        """
+        self.__maxConnectionIdle = seconds
+
+    def setMaxReplicaLag(self, seconds):
+        """
+        Sets the maximum number of seconds a read replica can fall behind the
+        primary before it is ejected.
+
+        :param      seconds | <float>
+        """
+        self.__maxReplicaLag = seconds
+
+    def setMaxWaiters(self, count):
+        """
+        Sets the maximum number of requests that can wait in line for a
+        connection from each pool.
+
+        :param      count | <int>
+        """
+        self.__maxWaiters = count
+
+    def setMaxPreparedStatements(self, count):
+        """
+        Sets the maximum number of prepared statements to keep open on each
+        connection.
+
+        :param      count | <int>
+        """
+        self.__maxPreparedStatements = count
+
+    def setMinPoolSize(self, size):
+        """
+        Sets the number of connections to keep warm within each pool.
+
+        :param      size | <int>
+        """
+        self.__minPoolSize = size
+
+    def setPoolSize(self, size):
+        """
+        Sets the maximum number of connections to open per host.  This can be
+        an integer for all hosts, or a dictionary keyed by host.
+
+        :param      size | <int> || {<str> host: <int>, ..} || None
+        """
+        self.__poolSize = size
+
+    def setReadHosts(self, hosts):
+        """
+        Sets the read replicas that read queries will be distributed across.
+        This can be a list of hosts, a list of (host, weight) pairs, or a
+        dictionary of hosts to weights.  Hosts default to a weight of 1.
+
+        :param      hosts | [<str>, ..] || [(<str>, <int>), ..] || {<str>: <int>, ..} || None
+        """
+        if not hosts:
+            self.__readHosts = {}
+        elif isinstance(hosts, dict):
+            self.__readHosts = dict(hosts)
+        else:
+            self.__readHosts = dict(host if isinstance(host, (list, tuple)) else (host, 1)
+                                    for host in hosts)
+
+    def setReplicaRetry(self, seconds):
+        """
+        Sets the number of seconds an ejected read replica is kept out of
+        rotation.
+
+        :param      seconds | <float>
+        """
+        self.__replicaRetry = seconds
+
+    def setPrepareStatements(self, state):
+        """
+        Sets whether or not frequently run select statements are prepared on
+        the server for each connection.
+
+        :param      state | <bool>
+        """
+        self.__prepareStatements = state
+
+    def setPrepareThreshold(self, count):
+        """
+        Sets the number of times a statement has to be run before it will be
+        prepared on the server.
+
+        :param      count | <int>
+        """
+        self.__prepareThreshold = count
+
+    def setPrePing(self, state):
+        """
+        Sets whether or not pooled connections are validated with a ping
+        before being handed out.
+
+        :param      state | <bool>
+        """
+        self.__prePing = state
+
     def setName(self, name):
         """
         Sets the database name that will be used at the lower level to manage \
@@ -228,6 +592,23 @@ class Database(object):
         """
         self._default = state
 
+    def setSearchPath(self, path):
+        """
+        Sets the schema search path for connections to this database.
+
+        :param      path | <str> || [<str>, ..] || None
+        """
+        self.__searchPath = path
+
+    def setStickyWrites(self, seconds):
+        """
+        Sets the number of seconds after a write that reads from the same
+        thread or greenlet will be sent to the primary.
+
+        :param      seconds | <float>
+        """
+        self.__stickyWrites = seconds
+
     def setTimeout(self, msecs):
         """
         Sets the maximum number of milliseconds to allow a query to run on
@@ -289,6 +670,16 @@ class Database(object):
         """
         self.__writeHost = host
 
+    def stickyWrites(self):
+        """
+        Returns the number of seconds after a write that reads from the same
+        thread or greenlet will be sent to the primary, so that they can read
+        their own writes.  A value of 0 disables this.
+
+        :return     <float>
+        """
+        return self.__stickyWrites
+
     def sync(self, models=None, **context):
         """
         Syncs the database by calling its schema sync method.  If
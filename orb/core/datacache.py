@@ -0,0 +1,176 @@
+"""
+Defines the DataCache classes used to cache the results of the queries made
+for the models that opt in to caching through their `__cache__` property.
+"""
+
+import threading
+import time
+
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from projex.addon import AddonManager
+from projex.lazymodule import lazy_import
+
+orb = lazy_import('orb')
+
+
+class DataCache(AddonManager):
+    """
+    Base class for the query result caches.  A cache is created for each model
+    that defines the `__cache__` property, and holds the rows for the compiled
+    statements run for it.  Entries expire after the timeout of the cache,
+    which is capped by the max_cache_timeout setting, and all of a model's
+    entries are cleared whenever records are written through it.
+
+    :usage
+
+        |class User(orb.Table):
+        |    __cache__ = {'timeout': 60, 'backend': 'LRU', 'size': 1000}
+
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, timeout=None):
+        max_timeout = int(orb.system.settings().max_cache_timeout) / 1000.0
+        self.__timeout = min(timeout, max_timeout) if timeout else max_timeout
+
+    @abstractmethod
+    def clear(self):
+        """
+        Removes all the entries from this cache.
+        """
+
+    @abstractmethod
+    def get(self, key, default=None):
+        """
+        Returns the entry for the given key, or the default value when there
+        is no entry or it has expired.
+
+        :param key: <hashable>
+        :param default: <variant>
+
+        :return: <variant>
+        """
+
+    @abstractmethod
+    def set(self, key, value):
+        """
+        Stores the value for the given key until the timeout of this cache.
+
+        :param key: <hashable>
+        :param value: <variant>
+        """
+
+    def timeout(self):
+        """
+        Returns the number of seconds that entries are kept for.
+
+        :return: <float>
+        """
+        return self.__timeout
+
+    @classmethod
+    def create(cls, options):
+        """
+        Creates a new cache from the `__cache__` property of a model, which
+        can be True, a timeout in seconds or a dictionary of options with an
+        optional backend name.
+
+        :param options: <bool> || <int> || <dict>
+
+        :return: <orb.DataCache> || None
+        """
+        if not options:
+            return None
+        elif options is True:
+            options = {}
+        elif isinstance(options, (int, float)):
+            options = {'timeout': options}
+        else:
+            options = dict(options)
+
+        backend = options.pop('backend', 'Memory')
+        cache_type = cls.byName(backend)
+        if cache_type is None:
+            raise orb.errors.BackendNotFound(backend)
+        return cache_type(**options)
+
+    @staticmethod
+    def invalidate(model):
+        """
+        Clears the cached entries for the given model and the models that it
+        inherits from, as their queries include its records.
+
+        :param model: <subclass of orb.Model>
+        """
+        for cls in model.__mro__:
+            if issubclass(cls, orb.Model):
+                cache = cls.dataCache()
+                if cache is not None:
+                    cache.clear()
+
+
+class MemoryDataCache(DataCache):
+    """
+    Caches the entries in memory until they expire.  When a size is given, the
+    least recently used entries are removed once the cache is full.
+    """
+    def __init__(self, timeout=None, size=None):
+        super(MemoryDataCache, self).__init__(timeout=timeout)
+
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__size = size
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self.__lock:
+            try:
+                expires, value = self.__entries.pop(key)
+            except KeyError:
+                return default
+
+            if expires <= now:
+                return default
+
+            self.__entries[key] = (expires, value)
+            return value
+
+    def set(self, key, value):
+        now = time.time()
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = (now + self.timeout(), value)
+
+            # remove the oldest entries, which are the first to expire
+            while self.__entries:
+                first_key, (expires, _) = next(self.__entries.iteritems())
+                if expires <= now or (self.__size and len(self.__entries) > self.__size):
+                    self.__entries.pop(first_key)
+                else:
+                    break
+
+    def size(self):
+        """
+        Returns the maximum number of entries for this cache.
+
+        :return: <int> || None
+        """
+        return self.__size
+
+
+class LRUDataCache(MemoryDataCache):
+    """
+    Caches up to the given number of entries in memory, removing the least
+    recently used entries once it is full.
+    """
+    def __init__(self, timeout=None, size=1000):
+        super(LRUDataCache, self).__init__(timeout=timeout, size=size)
+
+
+DataCache.registerAddon('Memory', MemoryDataCache)
+DataCache.registerAddon('LRU', LRUDataCache)
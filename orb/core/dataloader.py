@@ -0,0 +1,114 @@
+"""
+Defines the DataLoader class that batches the lookups of records by their id
+so that they can be made with a single query for each model.
+"""
+
+import threading
+
+from collections import defaultdict
+from projex.lazymodule import lazy_import
+
+from .local import local
+
+orb = lazy_import('orb')
+
+
+class DataLoader(object):
+    """
+    Gathers the ids of the references that are loaded from the database while
+    the loader is active for the current thread or greenlet.  The first time
+    a reference is looked up, the rows for all of the gathered ids of its
+    model are fetched together, and later lookups use the loaded rows.
+
+    :usage
+
+        |with orb.DataLoader():
+        |    for order in Order.all():
+        |        print order.get('customer')  # one query for all customers
+
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending = defaultdict(set)
+        self.__rows = {}
+
+    def __enter__(self):
+        self._stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        stack = self._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        else:
+            stack.remove(self)
+
+    def clear(self):
+        """
+        Removes all the pending ids and loaded rows from this loader.
+        """
+        with self.__lock:
+            self.__pending.clear()
+            self.__rows.clear()
+
+    def defer(self, model, key):
+        """
+        Adds the given id to be loaded with the next lookup for the model.
+
+        :param model: <subclass of orb.Model>
+        :param key: <variant>
+        """
+        if (model, key) not in self.__rows:
+            with self.__lock:
+                self.__pending[model].add(key)
+
+    def load(self, model, key, **context):
+        """
+        Returns the row for the given model and id, fetching it along with all
+        of the pending ids for the model when it has not been loaded yet.
+
+        :param model: <subclass of orb.Model>
+        :param key: <variant>
+        :param context: <orb.Context> descriptor
+
+        :return: <dict> || None
+        """
+        try:
+            return self.__rows[(model, key)]
+        except KeyError:
+            pass
+
+        with self.__lock:
+            keys = self.__pending.pop(model, set())
+        keys.add(key)
+
+        id_column = model.schema().idColumn()
+        rows = model.fetchMany([k for k in keys if (model, k) not in self.__rows],
+                               inflated=False,
+                               **context)
+        with self.__lock:
+            for row in rows:
+                if row is not None:
+                    row_id = row.get(id_column.field(), row.get(id_column.name()))
+                    self.__rows[(model, row_id)] = row
+
+        return self.__rows.get((model, key))
+
+    @staticmethod
+    def _stack():
+        store = local('orb.dataloader')
+        try:
+            return store.stack
+        except AttributeError:
+            store.stack = []
+            return store.stack
+
+    @staticmethod
+    def current():
+        """
+        Returns the innermost data loader that is active.
+
+        :return: <orb.DataLoader> || None
+        """
+        stack = DataLoader._stack()
+        return stack[-1] if stack else None
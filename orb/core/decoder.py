@@ -0,0 +1,149 @@
+"""
+Defines the RowDecoder class that maps the rows returned from the database to
+the columns of a model.
+"""
+
+import threading
+
+from projex.lazymodule import lazy_import
+
+orb = lazy_import('orb')
+
+
+class RowDecoder(object):
+    """
+    Resolves the fields of a row to the columns of a model once for each set
+    of fields, so loading the rows of a query only needs to restore the values
+    of the columns that change them.  Decoders are cached by their model and
+    fields, and can be looked up with the `byFields` method.
+    """
+    CacheSize = 1000
+
+    __cache = {}
+    __cacheLock = threading.Lock()
+
+    def __init__(self, model, fields):
+        schema = model.schema()
+        dbname = schema.dbname()
+        base_restore = orb.Column.dbRestore.__func__
+        base_inflate = orb.Column.restore.__func__
+
+        self.__columns = []
+        self.__values = {}
+        self.__preloads = []
+        self.__polymorph = None
+
+        for field in fields:
+            try:
+                model_dbname, name = field.split('.')
+            except ValueError:
+                model_dbname, name = dbname, field
+
+            # make sure the value is specific to this model
+            if model_dbname != dbname:
+                continue
+
+            try:
+                column = schema.column(name)
+            except orb.errors.ColumnNotFound:
+                column = None
+
+            # preloaded reverse lookups and pipes
+            if not column:
+                self.__preloads.append((field, name))
+                continue
+
+            # only restore the values for columns that modify them
+            if column.testFlag(column.Flags.I18n) or type(column).dbRestore.__func__ is not base_restore:
+                restore = column.dbRestore
+            else:
+                restore = None
+
+            self.__columns.append((field, column, restore))
+
+            # only restore the values for use for columns that modify them
+            if column.testFlag(column.Flags.I18n) or type(column).restore.__func__ is not base_inflate:
+                inflate = column.restore
+            else:
+                inflate = None
+
+            self.__values.setdefault(column, (field, restore, inflate))
+
+            if column.testFlag(column.Flags.Polymorphic) and self.__polymorph is None:
+                self.__polymorph = column
+
+    def decode(self, row, context=None):
+        """
+        Restores the values from the given row, returning the values for the
+        columns and the preloaded values for its collectors.
+
+        :param row: <dict>
+        :param context: <orb.Context> || None
+
+        :return: {<orb.Column>: <variant>, ..}, {<str>: <variant>, ..}
+        """
+        clean = {}
+        for field, column, restore in self.__columns:
+            if column in clean and isinstance(clean[column], orb.Model):
+                continue
+            elif restore is None:
+                clean[column] = row[field]
+            else:
+                clean[column] = restore(row[field], context=context)
+
+        preload = {name: row[field] for field, name in self.__preloads}
+        return clean, preload
+
+    def values(self, row, columns, contexts):
+        """
+        Restores the values of the given columns from the row for use, as
+        they are returned from a collection's values, without loading a
+        record for the row.
+
+        :param row: <dict>
+        :param columns: [<orb.Column>, ..]
+        :param contexts: [<orb.Context>, ..] | the context for each column
+
+        :return: [<variant>, ..]
+        """
+        output = []
+        for column, context in zip(columns, contexts):
+            field, restore, inflate = self.__values[column]
+            value = row[field]
+            if restore is not None:
+                value = restore(value, context=context)
+            if inflate is not None:
+                value = inflate(value, context=context)
+            output.append(value)
+        return output
+
+    def polymorphicColumn(self):
+        """
+        Returns the polymorphic column that is included in the fields for
+        this decoder, if any.
+
+        :return: <orb.Column> || None
+        """
+        return self.__polymorph
+
+    @classmethod
+    def byFields(cls, model, fields):
+        """
+        Returns the decoder for the given model and fields, creating it the
+        first time a set of fields is loaded.
+
+        :param model: <subclass of orb.Model>
+        :param fields: [<str>, ..]
+
+        :return: <orb.core.decoder.RowDecoder>
+        """
+        key = (model, tuple(fields))
+        try:
+            return cls.__cache[key]
+        except KeyError:
+            decoder = cls(model, key[1])
+            with cls.__cacheLock:
+                if len(cls.__cache) >= cls.CacheSize:
+                    cls.__cache.clear()
+                cls.__cache[key] = decoder
+            return decoder
@@ -0,0 +1,163 @@
+"""
+Defines the Future class that is used to run database operations in the
+background.  Work is run by the configured worker class -- as greenlets when
+the worker_class setting is 'gevent', otherwise by a shared pool of threads
+sized by the max_workers setting.
+"""
+
+import logging
+import sys
+import threading
+
+from projex.lazymodule import lazy_import
+
+log = logging.getLogger(__name__)
+orb = lazy_import('orb')
+
+_workers = None
+_workersLock = threading.Lock()
+
+
+class Future(object):
+    """
+    Represents the result of an operation that is running in the background.
+
+    :usage
+
+        |future = User.select().recordsAsync()
+        |... do other work ...
+        |users = future.result()
+    """
+    def __init__(self):
+        if orb.system.settings().worker_class == 'gevent':
+            from gevent.event import Event
+        else:
+            from threading import Event
+
+        self.__event = Event()
+        self.__lock = threading.Lock()
+        self.__callbacks = []
+        self.__result = None
+        self.__excInfo = None
+
+    def _resolve(self, result=None, excInfo=None):
+        """
+        Resolves this future with the given result or exception information,
+        and runs any of its callbacks.
+
+        :param result: <variant>
+        :param excInfo: (<type>, <Exception>, <traceback>) || None
+        """
+        with self.__lock:
+            self.__result = result
+            self.__excInfo = excInfo
+            self.__event.set()
+            callbacks = self.__callbacks
+            self.__callbacks = []
+
+        for callback in callbacks:
+            self._call(callback)
+
+    def _call(self, callback):
+        try:
+            callback(self)
+        except Exception:
+            log.exception('Failed to process future callback')
+
+    def addCallback(self, callback):
+        """
+        Adds a callback to be run once this future is resolved.  The callback
+        receives the future as its only argument.  If the future has already
+        been resolved, the callback is run immediately.
+
+        :param callback: <callable>
+        """
+        with self.__lock:
+            if not self.__event.is_set():
+                self.__callbacks.append(callback)
+                return
+
+        self._call(callback)
+
+    def done(self):
+        """
+        Returns whether or not this future has been resolved.
+
+        :return: <bool>
+        """
+        return self.__event.is_set()
+
+    def exception(self, timeout=None):
+        """
+        Waits for this future to resolve and returns the error that was raised
+        by its operation, if any.
+
+        :param timeout: <float> || None | seconds
+
+        :return: <Exception> || None
+        """
+        if not self.__event.wait(timeout):
+            raise orb.errors.TaskTimeout(timeout)
+        return self.__excInfo[1] if self.__excInfo else None
+
+    def result(self, timeout=None):
+        """
+        Waits for this future to resolve and returns its result.  If its
+        operation raised an error, it will be re-raised here.
+
+        :param timeout: <float> || None | seconds
+
+        :return: <variant>
+        """
+        if not self.__event.wait(timeout):
+            raise orb.errors.TaskTimeout(timeout)
+        elif self.__excInfo:
+            raise self.__excInfo[0], self.__excInfo[1], self.__excInfo[2]
+        else:
+            return self.__result
+
+
+def _run(future, defaults, func, args, kwds):
+    # run the work within the default contexts of the caller
+    for context in defaults:
+        orb.Context.pushDefaultContext(context)
+
+    try:
+        result = func(*args, **kwds)
+    except Exception:
+        future._resolve(excInfo=sys.exc_info())
+    else:
+        future._resolve(result)
+    finally:
+        for _ in defaults:
+            orb.Context.popDefaultContext()
+
+
+def submit(func, *args, **kwds):
+    """
+    Runs the given function in the background and returns a future for its
+    result.  The default contexts active for the caller are carried over to
+    the worker.
+
+    :param func: <callable>
+
+    :return: <orb.Future>
+    """
+    global _workers
+
+    future = Future()
+    task_args = (future, list(orb.Context.defaultContexts()), func, args, kwds)
+
+    if orb.system.settings().worker_class == 'gevent':
+        import gevent
+        gevent.spawn(_run, *task_args)
+    else:
+        if _workers is None:
+            with _workersLock:
+                if _workers is None:
+                    from multiprocessing.pool import ThreadPool
+                    _workers = ThreadPool(int(orb.system.settings().max_workers))
+
+        _workers.apply_async(_run, task_args)
+
+    return future
@@ -0,0 +1,134 @@
+"""
+Defines the IdentityMap class that resolves each database row to a single
+model instance within a scope.
+"""
+
+import threading
+
+from projex.lazymodule import lazy_import
+
+from .local import local
+
+orb = lazy_import('orb')
+
+
+class IdentityMap(object):
+    """
+    Maps the records that are inflated from the database by their model and
+    id while the map is active, so the same row always resolves to the same
+    instance.  Maps are scoped to the current thread or greenlet, and can be
+    used around a request or a transaction.  A record that already exists in
+    the map is refreshed with the newly loaded data, unless it has been
+    modified.
+
+    :usage
+
+        |with orb.IdentityMap():
+        |    posts = Post.all(expand='author')
+        |    assert posts[0].get('author') is posts[1].get('author')
+
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__records = {}
+
+    def __enter__(self):
+        self._stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        stack = self._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        else:
+            stack.remove(self)
+
+    def __len__(self):
+        return len(self.__records)
+
+    def clear(self):
+        """
+        Removes all the records from this map.
+        """
+        with self.__lock:
+            self.__records.clear()
+
+    def get(self, model, key, default=None):
+        """
+        Returns the record stored for the given model and id.
+
+        :param model: <subclass of orb.Model>
+        :param key: <variant>
+        :param default: <variant>
+
+        :return: <orb.Model> || <variant>
+        """
+        return self.__records.get((model, key), default)
+
+    def inflate(self, model, values, context=None):
+        """
+        Returns the record for the given model that is mapped to the id
+        within the values, loading the values into a new record when none is
+        stored yet.
+
+        :param model: <subclass of orb.Model>
+        :param values: <dict>
+        :param context: <orb.Context> || None
+
+        :return: <orb.Model>
+        """
+        id_column = model.schema().idColumn()
+        key = values.get(id_column.field(), values.get(id_column.name()))
+
+        record = self.get(model, key) if key is not None else None
+        if record is None:
+            event = orb.events.LoadEvent(data=values)
+            record = model(loadEvent=event, context=context)
+            return self.store(record) if key is not None else record
+
+        # refresh the existing record, without losing any unsaved changes
+        elif not record.isModified():
+            record._load(orb.events.LoadEvent(record=record, data=values))
+
+        return record
+
+    def remove(self, record):
+        """
+        Removes the given record from this map.
+
+        :param record: <orb.Model>
+        """
+        with self.__lock:
+            self.__records.pop((type(record), record.id()), None)
+
+    def store(self, record):
+        """
+        Stores the given record in this map, returning the record that is
+        mapped to its model and id, which will be the existing one if the row
+        was already stored.
+
+        :param record: <orb.Model>
+
+        :return: <orb.Model>
+        """
+        with self.__lock:
+            return self.__records.setdefault((type(record), record.id()), record)
+
+    @staticmethod
+    def _stack():
+        store = local('orb.identitymap')
+        try:
+            return store.stack
+        except AttributeError:
+            store.stack = []
+            return store.stack
+
+    @staticmethod
+    def current():
+        """
+        Returns the innermost identity map that is active.
+
+        :return: <orb.IdentityMap> || None
+        """
+        stack = IdentityMap._stack()
+        return stack[-1] if stack else None
@@ -0,0 +1,43 @@
+"""
+Defines the execution-local storage used throughout orb.  Values stored are
+local to the current greenlet when the worker_class setting is 'gevent',
+otherwise they are local to the current thread.
+"""
+
+import threading
+
+from projex.lazymodule import lazy_import
+
+orb = lazy_import('orb')
+
+_storage = {}
+_storageLock = threading.Lock()
+
+
+def local(name):
+    """
+    Returns the execution-local storage object registered for the given name,
+    creating it on first access.
+
+    :usage
+
+        |from orb.core.local import local
+        |store = local('orb.writes')
+        |store.__dict__.setdefault('hosts', {})
+
+    :param name: <str>
+
+    :return: <threading.local> || <gevent.local.local>
+    """
+    try:
+        return _storage[name]
+    except KeyError:
+        with _storageLock:
+            if name not in _storage:
+                if orb.system.settings().worker_class == 'gevent':
+                    from gevent.local import local as local_type
+                else:
+                    local_type = threading.local
+
+                _storage[name] = local_type()
+            return _storage[name]
@@ -0,0 +1,74 @@
+"""
+Defines the locks used to protect the data of the models and collections.
+The locks can be disabled for single-threaded and greenlet based workers by
+setting the locking_strategy setting to 'none', in which case a shared no-op
+lock is used in place of allocating a read-write lock for every instance.
+"""
+
+from projex import locks
+from projex.lazymodule import lazy_import
+
+orb = lazy_import('orb')
+
+
+class NoLock(object):
+    """
+    Defines a lock that does nothing, which is used in place of the
+    read-write locks when locking is disabled.  The lock is its own locker,
+    so no objects are created to acquire it.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        return False
+
+    def reader_acquire(self):
+        pass
+
+    def reader_release(self):
+        pass
+
+    def writer_acquire(self):
+        pass
+
+    def writer_release(self):
+        pass
+
+
+NO_LOCK = NoLock()
+
+
+def ReadWriteLock():
+    """
+    Returns a new read-write lock, or the shared no-op lock when the
+    locking_strategy setting is 'none'.
+
+    :return: <projex.locks.ReadWriteLock> || <orb.core.locks.NoLock>
+    """
+    if orb.system.settings().locking_strategy == 'none':
+        return NO_LOCK
+    else:
+        return locks.ReadWriteLock()
+
+
+def ReadLocker(lock):
+    """
+    Returns the context manager that acquires the given lock for reading.
+
+    :param lock: <projex.locks.ReadWriteLock> || <orb.core.locks.NoLock>
+
+    :return: <projex.locks.ReadLocker> || <orb.core.locks.NoLock>
+    """
+    return lock if lock is NO_LOCK else locks.ReadLocker(lock)
+
+
+def WriteLocker(lock):
+    """
+    Returns the context manager that acquires the given lock for writing.
+
+    :param lock: <projex.locks.ReadWriteLock> || <orb.core.locks.NoLock>
+
+    :return: <projex.locks.WriteLocker> || <orb.core.locks.NoLock>
+    """
+    return lock if lock is NO_LOCK else locks.WriteLocker(lock)
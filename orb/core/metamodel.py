@@ -116,6 +116,7 @@ class MetaModel(type):
 
             # check to see if a schema is already defined
             schema = attrs.pop('__schema__', None)
+            cache = attrs.pop('__cache__', None)
 
             # otherwise, create a new schema
             if schema is None:
@@ -138,6 +139,7 @@ class MetaModel(type):
 
             # register the class to the system
             setattr(new_model, '_{0}__schema'.format(schema.name()), schema)
+            setattr(new_model, '_{0}__dataCache'.format(name), orb.DataCache.create(cache))
             schema.setModel(new_model)
             orb.system.register(schema)
 
@@ -9,10 +9,11 @@ import projex.security
 import projex.text
 
 from collections import defaultdict
-from projex.locks import ReadLocker, ReadWriteLock, WriteLocker
 from projex.lazymodule import lazy_import
 from projex import funcutil
 
+from .decoder import RowDecoder
+from .locks import ReadLocker, ReadWriteLock, WriteLocker
 from .metamodel import MetaModel
 from .search import SearchEngine
 
@@ -288,7 +289,7 @@ class Model(object):
                 record_id = tuple(record)
 
             if not self.__delayed:
-                data = self.fetch(record_id, inflated=False, context=self.__context)
+                data = self._fetchData(record_id)
             else:
                 data = {self.schema().idColumn().name(): record_id}
 
@@ -302,6 +303,22 @@ class Model(object):
         if update_values:
             self.update(update_values)
 
+    def _fetchData(self, record_id):
+        """
+        Returns the raw data from the database for the given id, using the
+        active data loader when there is one.
+
+        :param record_id: <variant>
+
+        :return: <dict> || None
+        """
+        loader = orb.DataLoader.current()
+        if loader is not None:
+            data = loader.load(type(self), record_id, context=self.__context)
+            if data is not None:
+                return data
+        return self.fetch(record_id, inflated=False, context=self.__context)
+
     def _load(self, event):
         """
         Processes a load event by setting the properties of this record
@@ -312,35 +329,12 @@ class Model(object):
         if not event.data:
             return
 
-        context = self.context()
-        schema = self.schema()
-        dbname = schema.dbname()
-        clean = {}
-
-        for col, value in event.data.items():
-            try:
-                model_dbname, col_name = col.split('.')
-            except ValueError:
-                col_name = col
-                model_dbname = dbname
+        decoder = RowDecoder.byFields(type(self), event.data.keys())
+        clean, preload = decoder.decode(event.data, context=self.context())
 
-            # make sure the value we're setting is specific to this model
-            try:
-                column = schema.column(col_name)
-            except orb.errors.ColumnNotFound:
-                column = None
-
-            if model_dbname != dbname or (column in clean and isinstance(clean[column], Model)):
-                continue
-
-            # look for preloaded reverse lookups and pipes
-            elif not column:
-                self.__preload[col_name] = value
-
-            # extract the value from the database
-            else:
-                value = column.dbRestore(value, context=context)
-                clean[column] = value
+        # look for preloaded reverse lookups and pipes
+        if preload:
+            self.__preload.update(preload)
 
         # update the local values
         with WriteLocker(self.__dataLock):
@@ -349,6 +343,13 @@ class Model(object):
                 self.__values[col.name()] = (default, val)
                 self.__loaded.add(col)
 
+        # gather the references to load together when one is first looked up
+        loader = orb.DataLoader.current()
+        if loader is not None:
+            for col, val in clean.items():
+                if val is not None and isinstance(col, orb.ReferenceColumn) and not isinstance(val, Model):
+                    loader.defer(col.referenceModel(), val)
+
         if self.processEvent(event):
             self.onLoad(event)
 
@@ -432,7 +433,7 @@ class Model(object):
 
         :return     <orb.LookupOptions>
         """
-        output = orb.Context(context=self.__context) if self.__context is not None else orb.Context()
+        output = self.__context.derive() if self.__context is not None else orb.Context()
         output.update(context)
         return output
 
@@ -480,6 +481,14 @@ class Model(object):
 
         return count
 
+    def deleteAsync(self, **context):
+        """
+        Removes this record from the database in the background.
+
+        :return     <orb.Future>
+        """
+        return orb.futures.submit(self.delete, **context)
+
     def get(self, column, useMethod=True, **context):
         """
         Returns the value for the column for this record.
@@ -753,6 +762,16 @@ class Model(object):
             self.onPostSave(event)
         return True
 
+    def saveAsync(self, values=None, **context):
+        """
+        Saves this record to the database in the background.
+
+        :param values: None or dictionary of values to update before save
+
+        :return     <orb.Future>
+        """
+        return orb.futures.submit(self.save, values=values, **context)
+
     def set(self, column, value, useMethod=True, **context):
         """
         Sets the value for this record at the inputted column
@@ -1023,6 +1042,69 @@ class Model(object):
 
         return callbacks.get(eventType, []) if eventType is not None else callbacks
 
+    @classmethod
+    def bulkCreate(cls, rows, **context):
+        """
+        Shortcut for creating many new records for this table at once.  The
+        records are inserted in chunks of the connection's batch size within a
+        single transaction, rather than one statement per record.
+
+        :param     rows | [<dict>, ..]
+
+        :return    <orb.Collection>
+        """
+        records = []
+        for values in rows:
+            record = cls(context=orb.Context(**context))
+            record.update(values)
+            records.append(record)
+
+        collection = orb.Collection(records, model=cls, **context)
+        collection.save()
+        return collection
+
+    @classmethod
+    def bulkUpsert(cls, rows, index=None, update=True, **context):
+        """
+        Creates or updates many records for this table at once, matching the
+        existing records by a unique index.  This is the bulk form of a
+        get-or-create when update is False.
+
+        :param     rows | [<dict>, ..]
+        :param     index | <str> || <orb.Index> || None | defaults to the first unique index
+        :param     update | <bool> || [<str>, ..] | columns to update on existing records,
+                            True will update the columns given in the rows
+
+        :return    <orb.Collection>
+        """
+        rows = list(rows)
+        if update is True:
+            update = sorted({key for values in rows for key in values})
+
+        records = []
+        for values in rows:
+            record = cls(context=orb.Context(**context))
+            record.update(values)
+            records.append(record)
+
+        collection = orb.Collection(records, model=cls, **context)
+        return collection.upsert(index=index, update=update)
+
+    @classmethod
+    def copyIn(cls, rows, **context):
+        """
+        Bulk loads the given rows into this table, using the backend's bulk
+        load when it has one.  Unlike saving records, no events are processed
+        for the rows that are loaded.
+
+        :param     rows | <iterable> of <dict> || <orb.Model>
+
+        :return    <int> | number of rows loaded
+        """
+        context = orb.Context(**context)
+        conn = context.db.connection()
+        return conn.copyIn(cls, rows, context)
+
     @classmethod
     def create(cls, values, **context):
         """
@@ -1067,6 +1149,16 @@ class Model(object):
 
         return record
 
+    @classmethod
+    def dataCache(cls):
+        """
+        Returns the query result cache for this model, if it opted in to
+        caching through its `__cache__` property.
+
+        :return: <orb.DataCache> || None
+        """
+        return getattr(cls, '_{0}__dataCache'.format(cls.__name__), None)
+
     @classmethod
     def ensureExists(cls, values, defaults=None, **context):
         """
@@ -1108,6 +1200,20 @@ class Model(object):
 
         return record
 
+    @classmethod
+    def upsert(cls, values, index=None, update=True, **context):
+        """
+        Creates a new record for this table, or updates the existing one that
+        matches the values of a unique index, in a single statement.
+
+        :param     values | <dict>
+        :param     index | <str> || <orb.Index> || None | defaults to the first unique index
+        :param     update | <bool> || [<str>, ..] | columns to update on an existing record
+
+        :return    <orb.Table>
+        """
+        return cls.bulkUpsert([values], index=index, update=update, **context).records()[0]
+
     @classmethod
     def processEvent(cls, event):
         """
@@ -1168,6 +1274,40 @@ class Model(object):
 
         return cls.select(**context).first()
 
+    @classmethod
+    def fetchMany(cls, keys, **context):
+        """
+        Looks up the records for the given ids with a single query.  The
+        results are returned in the order of the ids, with None for any id
+        that was not found.
+
+        :param keys: [<variant>, ..]
+        :param context: <orb.Context>
+
+        :return: [<orb.Model> || <dict> || None, ..]
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+
+        context['where'] = orb.Query(cls).in_(keys) & context.get('where')
+
+        # don't have slicing for lookup by id
+        context['page'] = None
+        context['pageSize'] = None
+        context['start'] = None
+        context['limit'] = None
+
+        id_column = cls.schema().idColumn()
+        lookup = {}
+        for record in cls.select(**context).records():
+            if isinstance(record, Model):
+                lookup[record.id()] = record
+            else:
+                lookup[record.get(id_column.field(), record.get(id_column.name()))] = record
+
+        return [lookup.get(key) for key in keys]
+
     @classmethod
     def inflate(cls, values, **context):
         """
@@ -1181,38 +1321,52 @@ class Model(object):
         """
         context = orb.Context(**context)
 
-        # inflate values from the database into the given class type
+        schema = cls.schema()
+
+        # inflate values from the database into the given class type, only
+        # reading the values of a record when it may need to be morphed
         if isinstance(values, Model):
+            polymorphs = schema.columns(flags=orb.Column.Flags.Polymorphic).values()
+            column = polymorphs[0] if polymorphs else None
             record = values
-            values = dict(values)
+            values = dict(values) if column else {}
         else:
+            column = RowDecoder.byFields(cls, values.keys()).polymorphicColumn()
             record = None
 
-        schema = cls.schema()
-        polymorphs = schema.columns(flags=orb.Column.Flags.Polymorphic).values()
-        column = polymorphs[0] if polymorphs else None
-
         # attempt to expand the class to its defined polymorphic type
         if column and column.field() in values:
             morph_cls_name = values.get(column.name(), values.get(column.field()))
             morph_cls = orb.system.model(morph_cls_name)
             id_col = schema.idColumn().name()
             if morph_cls and morph_cls != cls:
-                try:
-                    record = morph_cls(values[id_col], context=context)
-                except KeyError:
-                    raise orb.errors.RecordNotFound(schema=morph_cls.schema(),
-                                                    column=values.get(id_col))
+                identity_map = orb.IdentityMap.current()
+                if identity_map is not None:
+                    record = identity_map.get(morph_cls, values.get(id_col))
+
+                if record is None:
+                    try:
+                        record = morph_cls(values[id_col], context=context)
+                    except KeyError:
+                        raise orb.errors.RecordNotFound(schema=morph_cls.schema(),
+                                                        column=values.get(id_col))
+
+                    if identity_map is not None:
+                        record = identity_map.store(record)
 
         if record is None:
-            event = orb.events.LoadEvent(record=record, data=values)
-            record = cls(loadEvent=event, context=context)
+            identity_map = orb.IdentityMap.current()
+            if identity_map is not None:
+                record = identity_map.inflate(cls, values, context=context)
+            else:
+                event = orb.events.LoadEvent(record=record, data=values)
+                record = cls(loadEvent=event, context=context)
 
         return record
 
     def read(self):
         record_id = self.id()
-        data = self.fetch(record_id, inflated=False, context=self.__context)
+        data = self._fetchData(record_id)
 
         if not data:
             raise errors.RecordNotFound(schema=self.schema(),
@@ -1237,6 +1391,21 @@ class Model(object):
                 del callbacks[eventType][i]
                 break
 
+    @classmethod
+    def rowType(cls):
+        """
+        Returns the lightweight read-only row type for this model, which is
+        used for collections that are selected with `returning='rows'`.
+
+        :return: <subclass of orb.Row>
+        """
+        key = '_{0}__rowType'.format(cls.__name__)
+        row_type = cls.__dict__.get(key)
+        if row_type is None:
+            row_type = orb.Row.create(cls)
+            setattr(cls, key, row_type)
+        return row_type
+
     @classmethod
     def schema(cls):
         """  Returns the class object's schema information. """
@@ -1289,3 +1458,13 @@ class Model(object):
         :param      query | <orb.Query> || None
         """
         setattr(cls, '_%s__baseQuery' % cls.__name__, query)
+
+    @classmethod
+    def setDataCache(cls, cache):
+        """
+        Sets the query result cache for this model, replacing the one created
+        from its `__cache__` property.
+
+        :param      cache | <orb.DataCache> || None
+        """
+        setattr(cls, '_%s__dataCache' % cls.__name__, cache)
@@ -52,6 +52,37 @@ class Pipe(Collector):
         pipe_q = orb.Query(through, self.to()).in_(to_records)
         return through.select(columns=[self.from_()], where=pipe_q)
 
+    def collectMany(self, records, **context):
+        through = self.throughModel()
+        target = self.toModel()
+        from_field = self.fromColumn().field()
+        to_field = self.toColumn().field()
+
+        ids = [record.id() for record in records if record.isRecord()]
+        if not ids:
+            return {}
+
+        links = through.select(where=orb.Query(through, self.from_()).in_(ids)).values(from_field, to_field)
+        target_ids = list({to_id for _, to_id in links})
+        if not target_ids:
+            return {}
+
+        # load the targets once, keeping the order for the collection
+        context['where'] = orb.Query(target).in_(target_ids) & context.get('where')
+        positions = {}
+        targets = {}
+        for i, record in enumerate(target.select(**context)):
+            positions[record.id()] = i
+            targets[record.id()] = record
+
+        output = {}
+        for from_id, to_id in links:
+            if to_id in targets:
+                output.setdefault(from_id, []).append(to_id)
+
+        return {from_id: [targets[to_id] for to_id in sorted(set(to_ids), key=positions.get)]
+                for from_id, to_ids in output.items()}
+
     def copy(self):
         out = super(Pipe, self).copy()
         out._Pipe__through = self.__through
@@ -1251,7 +1251,7 @@ class QueryCompound(object):
     def __hash__(self):
         return hash((
             self.__op,
-            hash(hash(q) for q in self.__queries)
+            tuple(hash(q) for q in self.__queries)
         ))
 
     def __json__(self):
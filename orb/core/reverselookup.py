@@ -44,6 +44,21 @@ class ReverseLookup(Collector):
         sub_q._Query__model = rmodel
         return rmodel.select(columns=[self.targetColumn()], where=sub_q)
 
+    def collectMany(self, records, **context):
+        ids = [record.id() for record in records if record.isRecord()]
+        if not ids:
+            return {}
+
+        model = self.referenceModel()
+        field = self.targetColumn().field()
+
+        context['where'] = orb.Query(model, self.__target).in_(ids) & context.get('where')
+
+        output = {}
+        for record in model.select(**context):
+            output.setdefault(record.get(field), []).append(record)
+        return output
+
     def copy(self):
         out = super(ReverseLookup, self).copy()
         out._ReverseLookup__reference = self.__reference
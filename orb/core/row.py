@@ -0,0 +1,142 @@
+"""
+Defines the Row class, a lightweight read-only alternative to the Model class
+for loading large numbers of records.
+"""
+
+from projex.lazymodule import lazy_import
+
+from .decoder import RowDecoder
+
+orb = lazy_import('orb')
+
+
+class Row(object):
+    """
+    Stores the values for a record in slots, without the change tracking,
+    locking and caching of a model instance.  A row type is created for each
+    model through its `rowType` method, and rows are returned for collections
+    that are selected with `returning='rows'`.  Values are accessed as
+    attributes by column name, references are stored as their ids and
+    translatable columns hold the value for the locale they were loaded with.
+    Columns whose names clash with the methods of the row are stored with a
+    trailing underscore, such as `values_`, and can also be read through `get`.
+
+    :usage
+
+        |for row in User.all(returning='rows'):
+        |    print row.username, row.user_type
+
+    """
+    __slots__ = ()
+    __model__ = None
+    __columns__ = ()
+    __slotmap__ = {}
+
+    def __init__(self, *values):
+        for (name, _), value in zip(self.__columns__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, key, value):
+        raise orb.errors.ColumnReadOnly(schema=self.__model__.schema(), column=key)
+
+    def __eq__(self, other):
+        return type(self) == type(other) and tuple(self.values()) == tuple(other.values())
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((type(self), tuple(self.values())))
+
+    def __iter__(self):
+        for name, column in self.__columns__:
+            if not column.testFlag(column.Flags.Private):
+                yield column.field(), getattr(self, name, None)
+
+    def __json__(self, *args):
+        return dict(self)
+
+    def __repr__(self):
+        return '<{0}Row {1}>'.format(self.__model__.__name__, ', '.join(
+            '{0}={1!r}'.format(column.name(), getattr(self, name, None)) for name, column in self.__columns__
+        ))
+
+    def get(self, column, default=None):
+        """
+        Returns the value for the given column name or field.
+
+        :param column: <str> || <orb.Column>
+        :param default: <variant>
+
+        :return: <variant>
+        """
+        if not isinstance(column, orb.Column):
+            column = self.__model__.schema().column(column, raise_=False)
+
+        if column is None:
+            return default
+        else:
+            return getattr(self, self.__slotmap__.get(column.name(), column.name()), default)
+
+    def values(self):
+        """
+        Returns the values for this row in the order of its columns.
+
+        :return: [<variant>, ..]
+        """
+        return [getattr(self, name, None) for name, _ in self.__columns__]
+
+    @classmethod
+    def create(cls, model):
+        """
+        Creates a new row type for the given model, with a slot for each of
+        its stored columns.  Slots that would hide an attribute of the row are
+        renamed with a trailing underscore.
+
+        :param model: <subclass of orb.Model>
+
+        :return: <subclass of orb.Row>
+        """
+        columns = []
+        slotnames = {}
+        for column in model.schema().columns().values():
+            if column.testFlag(column.Flags.Virtual):
+                continue
+
+            name = column.name()
+            while hasattr(cls, name) or name in slotnames.values():
+                name += '_'
+
+            slotnames[column.name()] = name
+            columns.append((name, column))
+
+        attrs = {
+            '__slots__': tuple(name for name, _ in columns),
+            '__model__': model,
+            '__columns__': tuple(columns),
+            '__slotmap__': slotnames
+        }
+        return type('{0}Row'.format(model.__name__), (cls,), attrs)
+
+    @classmethod
+    def fromData(cls, data, context=None):
+        """
+        Creates a new row from the data returned from the database.
+
+        :param data: <dict>
+        :param context: <orb.Context> || None
+
+        :return: <orb.Row>
+        """
+        clean, _ = RowDecoder.byFields(cls.__model__, data.keys()).decode(data, context=context)
+
+        values = []
+        for _, column in cls.__columns__:
+            value = clean.get(column)
+            if isinstance(value, orb.Model):
+                value = value.id()
+            elif isinstance(value, dict) and column.testFlag(column.Flags.I18n) and context is not None:
+                value = value.get(context.locale)
+            values.append(value)
+
+        return cls(*values)
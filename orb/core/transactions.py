@@ -16,3 +16,35 @@ class SingleTransaction(object):
     def __exit__(self, exc_type, error, traceback):
         for db in self.__databases:
             db.disconnect()
+
+
+class Transaction(object):
+    """
+    Runs every statement made for a database within this context through a
+    single connection, committing them together when the context exits or
+    rolling them back when an error is raised.  Nesting transactions creates
+    savepoints, so an inner block can be rolled back on its own.
+
+    :usage
+
+        |with orb.Transaction():
+        |    user.save()
+        |    with orb.Transaction():
+        |        group.save()
+
+    """
+    def __init__(self, db=None, isolation=None, readOnly=False):
+        self.__db = db
+        self.__isolation = isolation
+        self.__readOnly = readOnly
+        self.__connection = None
+
+    def __enter__(self):
+        db = self.__db or orb.Context().db
+        self.__connection = db.connection()
+        self.__connection.begin(isolation=self.__isolation, readOnly=self.__readOnly)
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        conn, self.__connection = self.__connection, None
+        conn.end(commit=exc_type is None)
@@ -63,6 +63,16 @@ class ValidationError(OrbError):
         self.context = context
 
 
+# A
+# ------------------------------------------------------------------------------
+
+class ActionNotAllowed(DatabaseError):
+    """ Raised when a backend connection does not support the requested action """
+    def __init__(self, action):
+        msg = u'{0} is not supported by this connection'.format(action)
+        super(ActionNotAllowed, self).__init__(msg)
+
+
 # B
 # ------------------------------------------------------------------------------
 
@@ -195,6 +205,11 @@ class IdNotFound(SchemaError):
     DEFAULT_MESSAGE = u'No id column found for {schema} model'
 
 
+class IndexNotFound(SchemaError):
+    """ Raised when the model does not have a unique index to match records on """
+    DEFAULT_MESSAGE = u'No unique index found for {schema} model'
+
+
 class Interruption(DatabaseError):
     """ Raised when a backend connection or process is remotely terminated """
     def __init__(self):
@@ -223,6 +238,65 @@ class InvalidIndexArguments(ValidationError):
         self.index = index
 
 
+class InvalidBatchMethod(ValidationError):
+    """ Raised when deferring a collection to a batch with a method it cannot run """
+    def __init__(self, method):
+        msg = u'{0} is not a method that can be batched'.format(method)
+        super(InvalidBatchMethod, self).__init__(msg)
+
+
+class InvalidCopyFormat(ValidationError):
+    """ Raised when copying records out of a backend in a format it does not support """
+    def __init__(self, format):
+        msg = u'{0} is not a supported copy format'.format(format)
+        super(InvalidCopyFormat, self).__init__(msg)
+
+
+class InvalidIsolationLevel(ValidationError):
+    """ Raised when starting a transaction with an isolation level the backend does not support """
+    def __init__(self, isolation):
+        msg = u'{0} is not a supported isolation level'.format(isolation)
+        super(InvalidIsolationLevel, self).__init__(msg)
+
+
+class InvalidToken(ValidationError):
+    """ Raised when a continuation token cannot be used to page a collection """
+    def __init__(self, token):
+        msg = u'{0} is not a valid continuation token'.format(token)
+        super(InvalidToken, self).__init__(msg)
+
+
+# P
+# -----------------------------------------------------------------------------
+
+
+class PoolError(DatabaseError):
+    """ Base class for all connection pool related errors """
+    pass
+
+
+class PoolExhausted(PoolError):
+    """ Raised when a connection is requested but too many requests are already waiting on the pool """
+    def __init__(self, host=None, waiters=None):
+        msg = u'Too many requests are waiting for a connection to the database'
+
+        self.host = host
+        self.waiters = waiters
+
+        super(PoolExhausted, self).__init__(msg)
+
+
+class PoolTimeout(PoolError):
+    """ Raised when a connection could not be checked out of the pool in time """
+    def __init__(self, host=None, msecs=None):
+        msg = u'Timed out waiting for a connection to the database'
+
+        self.host = host
+        self.msecs = msecs
+
+        super(PoolTimeout, self).__init__(msg)
+
+
 # Q
 # -----------------------------------------------------------------------------
 
@@ -291,6 +365,16 @@ class SearchEngineNotFound(OrbError):
 # -----------------------------------------------------------------------------
 
 
+class TaskTimeout(OrbError):
+    """ Raised when waiting on the result of a background task takes too long """
+    def __init__(self, seconds=None):
+        msg = u'Timed out waiting for the background task to complete'
+
+        self.seconds = seconds
+
+        super(TaskTimeout, self).__init__(msg)
+
+
 class ModelNotFound(SchemaError):
     """ Raised when looking for a model but none can be found """
     DEFAULT_MESSAGE = u'Could not find {schema} model'
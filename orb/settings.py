@@ -10,10 +10,13 @@ class Settings(object):
     Defaults = {
         'default_locale': 'en_US',
         'default_page_size': '40',
+        'locking_strategy': 'rwlock',
         'max_cache_timeout': str(1000 * 60 * 60 * 24),  # 24 hours
         'max_connections': '10',
+        'max_workers': '10',
         'security_key': '',
         'server_timezone': 'US/Pacific',
+        'statement_cache_size': '500',
         'worker_class': 'default'
     }
 
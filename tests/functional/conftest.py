@@ -221,6 +221,10 @@ def Document(testing_schema):
 def Role(testing_schema):
     return testing_schema['Role']
 
+@pytest.fixture(scope='session')
+def UserType(testing_schema):
+    return testing_schema['UserType']
+
 @pytest.fixture(scope='session')
 def Employee(testing_schema):
     return testing_schema['Employee']
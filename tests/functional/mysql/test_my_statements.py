@@ -30,6 +30,19 @@ def test_my_statement_insert_records(orb, User, my_sql):
     statement, data = st([user_a, user_b])
     assert 'INSERT INTO `orb_testing`.`users`' in statement
 
+def test_my_statement_insert_i18n_records(orb, Document, my_sql):
+    st = my_sql.statement('INSERT')
+
+    doc_a = Document(title='a')
+    doc_b = Document(title='b')
+    statement, data = st([doc_a, doc_b])
+
+    # both records are added by one statement, so the ids follow the first
+    assert statement.count('INSERT INTO `orb_testing`.`documents`') == 1
+    assert 'LAST_INSERT_ID() + 0' in statement
+    assert 'LAST_INSERT_ID() + 1' in statement
+    assert 'LIMIT 2' in statement
+
 def test_my_statement_insert_records_in_namespace(orb, User, my_sql):
     user_a = User(username='bob')
     user_b = User(username='sally')
@@ -417,4 +417,50 @@ def test_read_write_servers(orb, Comment):
 
 def test_null_query(orb, Comment):
     assert len(Comment.select(where=orb.Query('id').in_([]))) == 0
-    assert len(Comment.select(where=orb.Query('id').notIn([]))) == len(Comment.select())
\ No newline at end of file
+    assert len(Comment.select(where=orb.Query('id').notIn([]))) == len(Comment.select())
+def test_pg_api_transaction_nested_error(orb, pg_db, Group):
+    names = ['pg_transaction_{0}'.format(i) for i in range(3)]
+    q = orb.Query('name').in_(names)
+
+    with orb.Transaction(pg_db):
+        Group({'name': names[0]}).save()
+        try:
+            with orb.Transaction(pg_db):
+                Group({'name': names[1]}).save()
+                Group({'name': names[0]}).save()
+        except orb.errors.DuplicateEntryFound:
+            pass
+        else:
+            assert False
+        Group({'name': names[2]}).save()
+
+    assert Group.select(where=q, order='+name').values('name') == [names[0], names[2]]
+
+    Group.select(where=q).delete()
+
+def test_pg_api_batch(orb, pg_db, pg_sql, Group):
+    names = ['pg_batch_{0}'.format(i) for i in range(3)]
+    Group.bulkCreate({'name': name} for name in names)
+
+    groups = Group.select(where=orb.Query('name').in_(names), order='+name')
+    queries = [('count', Group, groups.context()), ('records', Group, groups.context())]
+
+    # the count and the select share a single statement
+    executed = []
+    execute = pg_sql._execute
+
+    def _execute(native, command, data=None, *args, **kwds):
+        executed.append(command)
+        return execute(native, command, data, *args, **kwds)
+
+    pg_sql._execute = _execute
+    try:
+        count, records = pg_sql.selectMany(queries)
+    finally:
+        del pg_sql._execute
+
+    assert len(executed) == 1
+    assert count == 3
+    assert [record['name'] for record in records] == names
+
+    groups.delete()
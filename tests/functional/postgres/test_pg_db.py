@@ -2,5 +2,13 @@ def test_pg_loaded(orb):
     from orb.core.connection_types.sql.postgres import PSQLConnection
     assert orb.Connection.byName('Postgres') == PSQLConnection
 
+def test_pg_quote_identifier(orb):
+    from orb.core.connection_types.sql.postgres.psqlconnection import quote_identifier
+    assert quote_identifier(' public ') == 'public'
+    assert quote_identifier('$user') == '$user'
+    assert quote_identifier('"My Schema"') == '"My Schema"'
+    assert quote_identifier('my schema') == '"my schema"'
+    assert quote_identifier('my"schema') == '"my""schema"'
+
 def test_pg_db_sync(orb, pg_db, testing_schema, Comment, TestAllColumns):
     pg_db.sync()
\ No newline at end of file
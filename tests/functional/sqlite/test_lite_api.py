@@ -258,6 +258,327 @@ def test_lite_api_select_multiple_columns(orb, User):
     assert type(data[0]) == tuple
     assert (1, 'bob') in data
 
+def test_lite_api_select_async(orb, User):
+    future = User.select(where=orb.Query('username') == 'bob').recordsAsync()
+    records = future.result(timeout=5)
+    assert future.done()
+    assert len(records) == 1 and records[0].get('username') == 'bob'
+
+    assert User.select().countAsync().result(timeout=5) == User.select().count()
+
+def test_lite_api_iterate_prefetch(orb, User):
+    ids = [record.id() for record in User.select(order='+id').iterate(batch=1, prefetch=True)]
+    assert ids == User.select().ids(order='+id')
+
+def test_lite_api_stream(orb, User):
+    users = User.select(order='+id')
+    ids = [record.id() for record in users.stream(size=1)]
+    assert ids == User.select().ids(order='+id')
+    assert not users.isLoaded()
+
+def test_lite_api_statement_cache(orb, lite_db, User):
+    cache = lite_db.connection().statements()
+    cache.clear()
+
+    bob = User.select(where=orb.Query('username') == 'bob').first()
+    missing = User.select(where=orb.Query('username') == 'missing').first()
+    bob_again = User.select(where=orb.Query('username') == 'bob').first()
+    assert bob.get('username') == 'bob'
+    assert missing is None
+    assert bob_again.id() == bob.id()
+    assert cache.stats()['size'] == 1
+    assert cache.stats()['hits'] == 2
+
+def test_lite_api_keyset(orb, User, UserType):
+    assert User.select(order='+username').keyset() is None
+    assert [(col.name(), direction) for col, direction in User.select().keyset()] == [('id', 'asc')]
+    assert [(col.name(), direction) for col, direction in UserType.select(order='-code').keyset()] == [('code', 'desc'), ('id', 'asc')]
+
+def test_lite_api_iterate_keyset(orb, UserType):
+    codes = [record.get('code') for record in UserType.select(order='-code').iterate(batch=1)]
+    assert codes == UserType.select(order='-code').values('code')
+
+def test_lite_api_after_token(orb, User):
+    ids = []
+    users = User.select(order='-id').after(None, pageSize=1)
+    while users is not None:
+        ids += users.ids()
+        token = users.nextToken()
+        users = User.select(order='-id').after(token, pageSize=1) if token else None
+
+    assert ids == User.select().ids(order='-id')
+
+def test_lite_api_after_offset_token(orb, User):
+    token = User.select(order='+username').after(None, pageSize=1).nextToken()
+    users = User.select(order='+username').after(token, pageSize=1)
+    assert users.ids() == User.select().ids(order='+username')[1:2]
+
+def test_lite_api_after_invalid_token(orb, User):
+    try:
+        User.select().after('not a token')
+    except orb.errors.InvalidToken:
+        pass
+    else:
+        assert False
+
+def test_lite_api_bulk_create(orb, lite_db, Group):
+    names = ['bulk_{0}'.format(i) for i in range(5)]
+    conn = lite_db.connection()
+    conn.setBatchSize(2)
+    try:
+        groups = Group.bulkCreate([{'name': name} for name in names])
+    finally:
+        conn.setBatchSize(500)
+
+    assert all(group.isRecord() for group in groups)
+    assert not any(group.isModified() for group in groups)
+    assert [group.get('name') for group in groups] == names
+    assert Group.select(where=orb.Query('name').in_(names)).ids(order='+id') == [group.id() for group in groups]
+
+    groups.delete()
+
+def test_lite_api_bulk_create_explicit_ids(orb, lite_db, Group):
+    max_id = Group.select().ids(order='-id', limit=1)
+    first = (max_id[0] if max_id else 0) + 1000
+    rows = [{'name': 'explicit_0'},
+            {'id': first, 'name': 'explicit_1'},
+            {'name': 'explicit_2'},
+            {'id': first + 10, 'name': 'explicit_3'}]
+
+    groups = Group.bulkCreate(rows)
+    try:
+        ids = [group.id() for group in groups]
+        assert ids[1] == first
+        assert ids[3] == first + 10
+        assert ids[0] != ids[2]
+        assert first + 10 < ids[0] < ids[2]
+
+        names = [row['name'] for row in rows]
+        records = Group.select(where=orb.Query('name').in_(names), order='+name')
+        assert [(group.id(), group.get('name')) for group in records] == zip(ids, names)
+    finally:
+        groups.delete()
+
+def test_lite_api_bulk_update(orb, lite_sql, Group):
+    groups = Group.bulkCreate([{'name': 'update_{0}'.format(i)} for i in range(3)])
+    for group in groups:
+        group.set('name', group.get('name').replace('update_', 'updated_'))
+
+    sql, data = lite_sql.statement('UPDATE')(groups)
+    assert sql.count('UPDATE') == 1
+    assert 'CASE' in sql
+
+    groups.save()
+
+    names = ['updated_{0}'.format(i) for i in range(3)]
+    assert Group.select(where=orb.Query('name').in_(names)).ids(order='+id') == [group.id() for group in groups]
+
+    groups.delete()
+
+def test_lite_api_collection_delete_query(orb, lite_db, Group):
+    names = ['delete_{0}'.format(i) for i in range(5)]
+    Group.bulkCreate({'name': name} for name in names)
+
+    conn = lite_db.connection()
+    size = conn.batchSize()
+    conn.setBatchSize(2)
+    try:
+        groups = Group.select(where=orb.Query('name').in_(names))
+        assert groups.delete() == 5
+        assert not groups.isLoaded()
+
+        # without a batch size, the query is deleted in a single statement
+        Group.bulkCreate({'name': name} for name in names)
+        conn.setBatchSize(None)
+        assert Group.select(where=orb.Query('name').in_(names)).delete() == 5
+    finally:
+        conn.setBatchSize(size)
+
+    assert Group.select(where=orb.Query('name').in_(names)).count() == 0
+
+def test_lite_api_transaction(orb, lite_db, Group):
+    names = ['transaction_{0}'.format(i) for i in range(3)]
+    q = orb.Query('name').in_(names)
+
+    try:
+        with orb.Transaction(lite_db):
+            Group({'name': names[0]}).save()
+            raise StandardError('rollback')
+    except StandardError:
+        pass
+
+    assert Group.select(where=q).count() == 0
+
+    with orb.Transaction(lite_db):
+        Group({'name': names[0]}).save()
+        try:
+            with orb.Transaction(lite_db):
+                Group({'name': names[1]}).save()
+                raise StandardError('rollback')
+        except StandardError:
+            pass
+        Group({'name': names[2]}).save()
+
+    assert Group.select(where=q, order='+name').values('name') == [names[0], names[2]]
+
+    # a database error in the inner block only rolls back to its savepoint
+    Group.select(where=q).delete()
+    with orb.Transaction(lite_db):
+        Group({'name': names[0]}).save()
+        try:
+            with orb.Transaction(lite_db):
+                Group({'name': names[1]}).save()
+                Group({'name': names[0]}).save()
+        except orb.errors.DuplicateEntryFound:
+            pass
+        else:
+            assert False
+        Group({'name': names[2]}).save()
+
+    assert Group.select(where=q, order='+name').values('name') == [names[0], names[2]]
+
+    with orb.Transaction(lite_db, readOnly=True):
+        try:
+            Group({'name': names[1]}).save()
+        except orb.errors.DatabaseError:
+            pass
+        else:
+            assert False
+
+    try:
+        orb.Transaction(lite_db, isolation='snapshot').__enter__()
+    except orb.errors.InvalidIsolationLevel:
+        pass
+    else:
+        assert False
+
+    Group.select(where=q).delete()
+
+def test_lite_api_batch(orb, lite_db, Group):
+    names = ['batch_{0}'.format(i) for i in range(3)]
+    Group.bulkCreate({'name': name} for name in names)
+
+    groups = Group.select(where=orb.Query('name').in_(names), order='+name')
+    missing = Group.select(where=orb.Query('name') == 'batch_missing')
+
+    with orb.Batch(lite_db) as batch:
+        count = batch.defer(groups, 'count')
+        records = batch.defer(groups)
+        first = batch.defer(groups, 'first')
+        none = batch.defer(missing, 'first')
+        assert not groups.isLoaded()
+
+    assert count.result() == 3
+    assert [group.get('name') for group in records.result()] == names
+    assert first.result().get('name') == names[-1]
+    assert none.result() is None
+    assert groups.isLoaded()
+
+    try:
+        orb.Batch(lite_db).defer(groups, 'last')
+    except orb.errors.InvalidBatchMethod:
+        pass
+    else:
+        assert False
+
+    groups.delete()
+
+def test_lite_api_data_cache(orb, lite_db, Group):
+    names = ['cache_{0}'.format(i) for i in range(2)]
+    q = orb.Query('name').in_(names)
+
+    Group.setDataCache(orb.DataCache.create({'backend': 'LRU', 'timeout': 60}))
+    try:
+        assert Group.select(where=q).count() == 0
+
+        # writes made outside of the model are not seen until it is written through
+        lite_db.connection().execute(u"INSERT INTO `groups` (`name`) VALUES ('cache_0');", writeAccess=True)
+        assert Group.select(where=q).count() == 0
+        assert Group.select(where=q).count(useCache=False) == 1
+
+        Group({'name': names[1]}).save()
+        assert Group.select(where=q).count() == 2
+        assert sorted(Group.select(where=q).values('name')) == names
+
+        Group.select(where=q).delete()
+        assert Group.select(where=q).count() == 0
+
+        # writes made within a transaction clear the cache once it commits
+        cache = Group.dataCache()
+        cleared = []
+        clear = cache.clear
+        cache.clear = lambda: cleared.append(True) or clear()
+        with orb.Transaction(lite_db):
+            Group({'name': names[0]}).save()
+            assert not cleared
+        assert cleared
+        assert Group.select(where=q).count() == 1
+
+        Group.select(where=q).delete()
+    finally:
+        Group.setDataCache(None)
+
+def test_lite_api_upsert(orb, Group):
+    names = ['upsert_{0}'.format(i) for i in range(3)]
+    groups = Group.bulkUpsert({'name': name} for name in names)
+    ids = [group.id() for group in groups]
+    assert None not in ids
+
+    names.append('upsert_3')
+    groups = Group.bulkUpsert(({'name': name} for name in names), update=False)
+    assert [group.id() for group in groups][:3] == ids
+    assert Group.select(where=orb.Query('name').in_(names)).count() == 4
+
+    assert Group.upsert({'name': 'upsert_0'}, index='byName').id() == ids[0]
+
+    try:
+        Group.upsert({'name': 'upsert_0'}, index='byId')
+    except orb.errors.IndexNotFound:
+        pass
+    else:
+        assert False
+
+    Group.select(where=orb.Query('name').in_(names)).delete()
+
+def test_lite_api_upsert_without_returning(orb, Group, monkeypatch):
+    import sqlite3
+
+    # versions before 3.35 cannot return the rows from an upsert
+    monkeypatch.setattr(sqlite3, 'sqlite_version_info', (3, 34, 1))
+
+    names = ['upsert_legacy_{0}'.format(i) for i in range(2)]
+    ids = [group.id() for group in Group.bulkUpsert({'name': name} for name in names)]
+    assert None not in ids
+
+    groups = Group.bulkUpsert({'name': name} for name in names)
+    assert [group.id() for group in groups] == ids
+    assert Group.select(where=orb.Query('name').in_(names)).count() == 2
+
+    Group.select(where=orb.Query('name').in_(names)).delete()
+
+def test_lite_api_copy(orb, Group):
+    import csv
+    import StringIO
+
+    names = ['copy_{0}'.format(i) for i in range(3)]
+    assert Group.copyIn({'name': name} for name in names) == 3
+
+    groups = Group.select(where=orb.Query('name').in_(names), order='+name')
+    output = StringIO.StringIO()
+    assert groups.copyOut(output) == 3
+
+    output.seek(0)
+    assert [row['name'] for row in csv.DictReader(output)] == names
+
+    try:
+        groups.copyOut(output, format='xml')
+    except orb.errors.InvalidCopyFormat:
+        pass
+    else:
+        assert False
+
+    groups.delete()
+
 # def test_lite_api_save_multi_i18n(orb, Document):
 #     doc = Document()
 #
@@ -329,3 +650,133 @@ def test_lite_api_invalid_reference(orb, Employee, User):
 #     attachment.save()
 #
 #     assert isinstance(attachment.get('comment_id'), str)
+
+def test_lite_api_identity_map(orb, lite_db, Group):
+    names = ['identity_{0}'.format(i) for i in range(2)]
+    Group.bulkCreate({'name': name} for name in names)
+    q = orb.Query('name').in_(names)
+
+    with orb.IdentityMap() as identity_map:
+        groups = Group.select(where=q, order='+name').records()
+        again = Group.select(where=q, order='+name').records()
+        assert [a is b for a, b in zip(groups, again)] == [True, True]
+        assert Group.fetch(groups[0].id()) is groups[0]
+        assert len(identity_map) == 2
+
+        # unsaved changes are kept when the row is loaded again
+        groups[0].set('name', 'identity_changed')
+        assert Group.select(where=q, order='+name').records()[0].get('name') == 'identity_changed'
+
+    assert orb.IdentityMap.current() is None
+    assert Group.fetch(groups[1].id()) is not groups[1]
+
+    Group.select(where=q).delete()
+
+def test_lite_api_data_loader(orb, lite_db, Group, User):
+    users = [User({'username': 'loader_{0}'.format(i), 'password': 'T3st1ng!'}) for i in range(2)]
+    for user in users:
+        user.save()
+
+    names = ['loader_group_{0}'.format(i) for i in range(4)]
+    Group.bulkCreate({'name': name, 'owner': users[i % 2]} for i, name in enumerate(names))
+    q = orb.Query('name').in_(names)
+
+    assert [user.get('username') for user in User.fetchMany([users[1].id(), -1, users[0].id()])
+            if user is not None] == ['loader_1', 'loader_0']
+
+    conn = lite_db.connection()
+    selects = []
+
+    def select(model, context):
+        selects.append(model)
+        return type(conn).select(conn, model, context)
+
+    with orb.DataLoader():
+        groups = Group.select(where=q, order='+name').records()
+
+        conn.select = select
+        try:
+            owners = [group.get('owner') for group in groups]
+        finally:
+            del conn.select
+
+    assert selects == [User]
+    assert [owner.get('username') for owner in owners] == ['loader_0', 'loader_1'] * 2
+
+    Group.select(where=q).delete()
+    User.select(where=orb.Query('username').in_(['loader_0', 'loader_1'])).delete()
+
+def test_lite_api_collection_prefetch(orb, lite_db, Group, GroupUser, User):
+    import uuid
+
+    suffix = uuid.uuid4().hex[:8]
+    usernames = ['prefetch_{0}_{1}'.format(i, suffix) for i in range(2)]
+    names = ['prefetch_group_{0}_{1}'.format(i, suffix) for i in range(3)]
+
+    try:
+        users = [User({'username': username, 'password': 'T3st1ng!'}) for username in usernames]
+        for user in users:
+            user.save()
+
+        groups = Group.bulkCreate({'name': name} for name in names)
+        GroupUser.bulkCreate([{'user': users[0], 'group': groups[0]},
+                              {'user': users[0], 'group': groups[1]},
+                              {'user': users[1], 'group': groups[2]}])
+
+        records = User.select(where=orb.Query('username').in_(usernames), order='+username')
+        records.prefetch('groups', 'userGroups.group')
+
+        conn = lite_db.connection()
+        selects = []
+
+        def select(model, context):
+            selects.append(model)
+            return type(conn).select(conn, model, context)
+
+        conn.select = select
+        try:
+            assert [sorted(user.get('groups').values('name')) for user in records] == [names[:2], names[2:]]
+            assert [len(user.get('userGroups')) for user in records] == [2, 1]
+            assert [sorted(link.get('group').get('name') for link in user.get('userGroups'))
+                    for user in records] == [names[:2], names[2:]]
+        finally:
+            del conn.select
+
+        assert selects == []
+    finally:
+        user_ids = User.select(where=orb.Query('username').in_(usernames)).ids()
+        if user_ids:
+            GroupUser.select(where=orb.Query('user').in_(user_ids)).delete()
+        Group.select(where=orb.Query('name').in_(names)).delete()
+        User.select(where=orb.Query('username').in_(usernames)).delete()
+
+def test_lite_api_collection_values_preloaded(orb, Group):
+    names = ['values_preloaded_{0}'.format(i) for i in range(2)]
+    groups = Group.bulkCreate({'name': name} for name in names)
+
+    records = Group.select(where=orb.Query('name').in_(names))
+    records.preload({'records': list(groups)})
+    assert sorted(records.values('name')) == names
+    assert sorted(records.values('id', 'name')) == sorted([group.id(), group.get('name')] for group in groups)
+
+    Group.select(where=orb.Query('name').in_(names)).delete()
+
+def test_lite_api_select_rows(orb, lite_db, User):
+    rows = User.select(where=orb.Query('username') == 'bob', returning='rows').records()
+    assert len(rows) == 1
+
+    row = rows[0]
+    user = User.byUsername('bob')
+    assert isinstance(row, orb.Row) and isinstance(row, User.rowType())
+    assert row.id == user.id()
+    assert row.username == 'bob'
+    assert row.get('user_type') == row.user_type == user.get('user_type_id')
+    assert row.__json__()['username'] == 'bob'
+    assert 'password' not in row.__json__()
+
+    try:
+        row.username = 'bill'
+    except orb.errors.ColumnReadOnly:
+        pass
+    else:
+        assert False
@@ -8,4 +8,79 @@ def test_lite_loaded(orb):
     assert orb.Connection.byName('SQLite') == SQLiteConnection
 
 def test_lite_db_sync(orb, lite_db, testing_schema, TestAllColumns):
-    lite_db.sync()
\ No newline at end of file
+    lite_db.sync()
+
+def test_lite_db_pool_metrics(orb, lite_db):
+    lite_db.connection().execute('SELECT 1')
+
+    metrics = lite_db.metrics()[None]
+    assert metrics['created'] == 1
+    assert metrics['idle'] == 1
+    assert metrics['checkedOut'] == 0
+    assert metrics['waits'] == 0
+
+def test_lite_db_pool_recycle(orb, lite_db):
+    import time
+
+    lite_db.setMaxConnectionIdle(0.01)
+    lite_db.connection().execute('SELECT 1')
+    time.sleep(0.02)
+    lite_db.connection().execute('SELECT 1')
+
+    metrics = lite_db.metrics()[None]
+    assert metrics['created'] == 2
+    assert metrics['recycled'] == 1
+    assert metrics['size'] == 1
+
+def test_lite_db_pool_min_size(orb, lite_db):
+    lite_db.setMinPoolSize(2)
+    lite_db.connection().execute('SELECT 1')
+
+    metrics = lite_db.metrics()[None]
+    assert metrics['created'] == 2
+    assert metrics['idle'] == 2
+
+def test_lite_db_init_sql(orb, lite_db):
+    lite_db.setInitSql('CREATE TEMP TABLE orb_init_check (id INTEGER)')
+    lite_db.disconnect()
+    try:
+        results, _ = lite_db.connection().execute('SELECT COUNT(*) AS total FROM orb_init_check')
+        assert results == [{'total': 0}]
+    finally:
+        lite_db.setInitSql(None)
+        lite_db.disconnect()
+
+def test_lite_db_prepared_statements(orb, lite_db):
+    lite_db.setPrepareStatements(True)
+    lite_db.setPrepareThreshold(2)
+    lite_db.disconnect()
+    try:
+        conn = lite_db.connection()
+        for i in range(3):
+            results, _ = conn.execute('SELECT %(value)s AS value', {'value': i}, prepare=True)
+            assert results == [{'value': i}]
+    finally:
+        lite_db.setPrepareStatements(False)
+        lite_db.disconnect()
+
+def test_lite_db_prepare_failure(orb, lite_db, monkeypatch):
+    calls = []
+    def prepare(native, command, data):
+        calls.append(command)
+        raise orb.errors.QueryFailed(command, data, 'cannot prepare')
+
+    lite_db.setPrepareStatements(True)
+    lite_db.setPrepareThreshold(1)
+    lite_db.disconnect()
+    try:
+        conn = lite_db.connection()
+        monkeypatch.setattr(conn, '_prepare', prepare)
+        with orb.Transaction(lite_db):
+            for i in range(3):
+                results, _ = conn.execute('SELECT %(value)s AS value', {'value': i}, prepare=True)
+                assert results == [{'value': i}]
+
+        assert len(calls) == 1
+    finally:
+        lite_db.setPrepareStatements(False)
+        lite_db.disconnect()
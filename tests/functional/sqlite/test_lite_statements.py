@@ -153,3 +153,15 @@ def test_lite_select_bob_and_sally(orb, lite_sql, lite_db, User):
     _, count = conn.execute(sql, data)
     assert count == 0
 
+
+def test_lite_statement_select_deterministic(orb, User, lite_sql):
+    st = lite_sql.statement('SELECT')
+    q = (orb.Query('username') == 'bob') | (orb.Query('username') == 'bill')
+
+    with lite_sql.statement().scope():
+        statement_a, data_a = st(User, orb.Context(where=q))
+    with lite_sql.statement().scope():
+        statement_b, data_b = st(User, orb.Context(where=q))
+
+    assert statement_a == statement_b
+    assert data_a == data_b
@@ -0,0 +1,41 @@
+"""
+Tests for the SQL statement caches
+"""
+
+
+def test_lru_cache_eviction(orb):
+    from orb.core.connection_types.sql.cache import LRUCache
+
+    cache = LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    # 'b' is now the least recently used entry
+    assert cache.set('c', 3) == [('b', 2)]
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_lru_cache_stats(orb):
+    from orb.core.connection_types.sql.cache import LRUCache
+
+    cache = LRUCache(2)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+    assert cache.stats() == {'size': 1, 'maxSize': 2, 'hits': 1, 'misses': 1}
+
+
+def test_value_keys_restart_per_scope(orb):
+    from orb.core.connection_types.sql.sqlstatement import SQLStatement
+
+    with SQLStatement.scope() as keys:
+        assert SQLStatement.valueKey('name') == 'name_1'
+        with SQLStatement.scope():
+            assert SQLStatement.valueKey('id') == 'id_2'
+        assert keys == ['name_1', 'id_2']
+
+    with SQLStatement.scope():
+        assert SQLStatement.valueKey('name') == 'name_1'
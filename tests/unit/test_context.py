@@ -0,0 +1,71 @@
+"""
+Tests for the context options
+"""
+
+
+def test_context_hash_is_cached(orb):
+    context = orb.Context(limit=10, order='+name')
+    assert hash(context) == hash(orb.Context(limit=10, order='+name'))
+
+    context.limit = 5
+    assert hash(context) == hash(orb.Context(limit=5, order='+name'))
+    assert context != orb.Context(limit=10, order='+name')
+
+
+def test_context_derive(orb):
+    where = orb.Query('name') == 'bob'
+    context = orb.Context(where=where, limit=10)
+
+    derived = context.derive(limit=5, columns='id,name')
+    assert derived.where is context.where
+    assert derived.limit == 5 and context.limit == 10
+    assert derived.columns == ['id', 'name']
+    assert derived == orb.Context(where=where, limit=5, columns=['id', 'name'])
+
+    try:
+        context.derive(limit=0)
+    except orb.errors.ContextError:
+        pass
+    else:
+        assert False
+
+
+def test_context_cached_parsing(orb):
+    context = orb.Context(expand='user.groups,owner', order='+name,-id')
+
+    tree = context.expandtree()
+    assert tree == {'user': {'groups': {}}, 'owner': {}}
+
+    # modifying the returned tree does not change the cached one
+    tree.pop('user')
+    assert context.expandtree() == {'user': {'groups': {}}, 'owner': {}}
+
+    assert context.order == [('name', 'asc'), ('id', 'desc')]
+    context.order = '-name'
+    assert context.order == [('name', 'desc')]
+
+
+def test_context_defaults_are_local(orb):
+    import threading
+
+    entered = threading.Event()
+    release = threading.Event()
+
+    def scoped():
+        with orb.Context(limit=5):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=scoped)
+    thread.start()
+    try:
+        entered.wait(5)
+        assert orb.Context.defaultContexts() == []
+        assert orb.Context().limit is None
+
+        with orb.Context(limit=10):
+            assert orb.Context().limit == 10
+        assert orb.Context().limit is None
+    finally:
+        release.set()
+        thread.join()
@@ -0,0 +1,61 @@
+"""
+Tests for the query result caches
+"""
+
+
+def test_data_cache_create(orb):
+    assert orb.DataCache.create(None) is None
+
+    cache = orb.DataCache.create(60)
+    assert isinstance(cache, orb.DataCache)
+    assert cache.timeout() == 60
+    assert cache.size() is None
+
+    cache = orb.DataCache.create({'backend': 'LRU', 'size': 2})
+    assert cache.size() == 2
+    assert cache.timeout() == int(orb.system.settings().max_cache_timeout) / 1000.0
+
+
+def test_data_cache_invalid_backend(orb):
+    try:
+        orb.DataCache.create({'backend': 'missing'})
+    except orb.errors.BackendNotFound:
+        pass
+    else:
+        assert False
+
+
+def test_data_cache_is_abstract(orb):
+    try:
+        orb.DataCache()
+    except TypeError:
+        pass
+    else:
+        assert False
+
+
+def test_memory_data_cache_expires(orb):
+    import time
+
+    cache = orb.DataCache.create(0.01)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+
+    time.sleep(0.02)
+    assert cache.get('a') is None
+
+
+def test_lru_data_cache_eviction(orb):
+    cache = orb.DataCache.create({'backend': 'LRU', 'size': 2})
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    # 'b' is now the least recently used entry
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+    cache.clear()
+    assert cache.get('a') is None
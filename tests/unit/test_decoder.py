@@ -0,0 +1,33 @@
+"""
+Tests for the decoding of database rows
+"""
+
+
+def test_row_decoder_fields(orb, PrivateClass):
+    from orb.core.decoder import RowDecoder
+
+    fields = ['id', 'public', 'private.public', 'groups']
+    decoder = RowDecoder.byFields(PrivateClass, fields)
+    assert RowDecoder.byFields(PrivateClass, fields) is decoder
+    assert decoder.polymorphicColumn() is None
+
+    schema = PrivateClass.schema()
+    clean, preload = decoder.decode({'id': 1, 'public': 'a', 'private.public': 'b', 'groups': {'count': 0}})
+    assert clean == {schema.column('id'): 1, schema.column('public'): 'a'}
+    assert preload == {'groups': {'count': 0}}
+
+
+def test_row_decoder_inflate(orb, PrivateClass):
+    record = PrivateClass.inflate({'id': 1, 'public': 'a'})
+    assert record.isRecord()
+    assert record.get('public') == 'a'
+    assert not record.isModified()
+
+
+def test_row_decoder_values(orb, PrivateClass):
+    from orb.core.decoder import RowDecoder
+
+    schema = PrivateClass.schema()
+    columns = [schema.column('public'), schema.column('id')]
+    decoder = RowDecoder.byFields(PrivateClass, ['id', 'public'])
+    assert decoder.values({'id': 1, 'public': 'a'}, columns, [orb.Context(), orb.Context()]) == ['a', 1]
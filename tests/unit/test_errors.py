@@ -57,6 +57,14 @@ def test_validation_error():
     assert isinstance(err, orb.errors.OrbError)
     assert err.context == u'some context'
 
+def test_action_not_allowed_error():
+    import orb
+
+    err = orb.errors.ActionNotAllowed('begin')
+    assert isinstance(err, orb.errors.DatabaseError)
+    assert 'begin' in err.message
+
+
 def test_backend_not_found_error():
     import orb
 
@@ -168,6 +176,14 @@ def test_id_not_found_error():
     assert isinstance(err, orb.errors.SchemaError)
     assert err.message == u'No id column found for User model'
 
+def test_index_not_found_error():
+    import orb
+
+    err = orb.errors.IndexNotFound(schema='User')
+    assert isinstance(err, orb.errors.OrbError)
+    assert isinstance(err, orb.errors.SchemaError)
+    assert err.message == u'No unique index found for User model'
+
 def test_interruption_error():
     import orb
 
@@ -223,6 +239,72 @@ def test_invalid_index_arguments_error():
     assert err.index == index
 
 
+def test_invalid_batch_method_error():
+    import orb
+
+    err = orb.errors.InvalidBatchMethod('last')
+    assert isinstance(err, orb.errors.OrbError)
+    assert isinstance(err, orb.errors.ValidationError)
+    assert err.message == u'last is not a method that can be batched'
+
+
+def test_invalid_copy_format_error():
+    import orb
+
+    err = orb.errors.InvalidCopyFormat('xml')
+    assert isinstance(err, orb.errors.OrbError)
+    assert isinstance(err, orb.errors.ValidationError)
+    assert err.message == u'xml is not a supported copy format'
+
+
+def test_invalid_isolation_level_error():
+    import orb
+
+    err = orb.errors.InvalidIsolationLevel('SNAPSHOT')
+    assert isinstance(err, orb.errors.OrbError)
+    assert isinstance(err, orb.errors.ValidationError)
+    assert err.message == u'SNAPSHOT is not a supported isolation level'
+
+
+def test_invalid_token_error():
+    import orb
+
+    err = orb.errors.InvalidToken('abc')
+    assert isinstance(err, orb.errors.OrbError)
+    assert isinstance(err, orb.errors.ValidationError)
+    assert err.message == u'abc is not a valid continuation token'
+
+
+def test_pool_error():
+    import orb
+
+    err = orb.errors.PoolError()
+    assert isinstance(err, orb.errors.OrbError)
+    assert isinstance(err, orb.errors.DatabaseError)
+
+
+def test_pool_exhausted_error():
+    import orb
+
+    err = orb.errors.PoolExhausted(host='localhost', waiters=10)
+    assert isinstance(err, orb.errors.DatabaseError)
+    assert isinstance(err, orb.errors.PoolError)
+    assert err.message == u'Too many requests are waiting for a connection to the database'
+    assert err.host == 'localhost'
+    assert err.waiters == 10
+
+
+def test_pool_timeout_error():
+    import orb
+
+    err = orb.errors.PoolTimeout(host='localhost', msecs=1000)
+    assert isinstance(err, orb.errors.DatabaseError)
+    assert isinstance(err, orb.errors.PoolError)
+    assert err.message == u'Timed out waiting for a connection to the database'
+    assert err.host == 'localhost'
+    assert err.msecs == 1000
+
+
 def test_query_error():
     import orb
 
@@ -301,6 +383,15 @@ def test_search_engine_not_found_error():
     assert err.message == u'Missing search engine: elastic'
 
 
+def test_task_timeout_error():
+    import orb
+
+    err = orb.errors.TaskTimeout(5)
+    assert isinstance(err, orb.errors.OrbError)
+    assert err.message == u'Timed out waiting for the background task to complete'
+    assert err.seconds == 5
+
+
 def test_model_not_found_error():
     import orb
 
@@ -0,0 +1,35 @@
+"""
+Tests for the locking strategies
+"""
+
+
+def test_locking_strategy(orb):
+    from projex import locks
+    from orb.core.locks import NO_LOCK, ReadLocker, ReadWriteLock, WriteLocker
+
+    settings = orb.system.settings()
+    assert isinstance(ReadWriteLock(), locks.ReadWriteLock)
+
+    settings.locking_strategy = 'none'
+    try:
+        lock = ReadWriteLock()
+        assert lock is NO_LOCK
+        assert ReadLocker(lock) is lock and WriteLocker(lock) is lock
+
+        with WriteLocker(lock):
+            with ReadLocker(lock):
+                pass
+    finally:
+        settings.locking_strategy = 'rwlock'
+
+
+def test_model_without_locks(orb, PrivateClass):
+    settings = orb.system.settings()
+    settings.locking_strategy = 'none'
+    try:
+        record = PrivateClass({'public': 'a'})
+        record.set('public', 'b')
+        assert record.get('public') == 'b'
+        assert orb.Collection([record]).records() == [record]
+    finally:
+        settings.locking_strategy = 'rwlock'
@@ -0,0 +1,132 @@
+"""
+Tests for the SQL connection pool
+"""
+
+import pytest
+
+
+class FakeNative(object):
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+
+
+class FakeConnection(object):
+    def _close(self, native):
+        native.closed = True
+
+    def _closed(self, native):
+        return native.closed
+
+    def _connect(self, writeAccess=False, host=None):
+        return FakeNative()
+
+    def _ping(self, native):
+        return native.alive
+
+
+@pytest.fixture()
+def pool(orb):
+    from orb.core.connection_types.sql.pool import ConnectionPool
+    return ConnectionPool(FakeConnection(), host='localhost', maxSize=1, timeout=0.05)
+
+
+def test_pool_checkout_reuses_connection(pool):
+    native = pool.checkout()
+    pool.checkin(native)
+    assert pool.checkout() is native
+
+    metrics = pool.metrics()
+    assert metrics['created'] == 1
+    assert metrics['checkedOut'] == 1
+
+
+def test_pool_checkout_timeout(orb, pool):
+    pool.checkout()
+    with pytest.raises(orb.errors.PoolTimeout):
+        pool.checkout()
+
+    metrics = pool.metrics()
+    assert metrics['timeouts'] == 1
+    assert metrics['waits'] == 1
+
+
+def test_pool_max_waiters(orb):
+    from orb.core.connection_types.sql.pool import ConnectionPool
+
+    import threading
+    import time
+
+    pool = ConnectionPool(FakeConnection(), maxSize=1, timeout=1, maxWaiters=1)
+    native = pool.checkout()
+
+    thread = threading.Thread(target=pool.checkout)
+    thread.start()
+    time.sleep(0.01)
+
+    with pytest.raises(orb.errors.PoolExhausted):
+        pool.checkout()
+
+    pool.checkin(native)
+    thread.join()
+    assert pool.metrics()['rejected'] == 1
+
+
+def test_pool_discards_dead_connections(pool):
+    native = pool.checkout()
+    pool.checkin(native)
+    pool.invalidate()
+    native.alive = False
+
+    assert pool.checkout() is not native
+    assert native.closed
+    assert pool.metrics()['discarded'] == 1
+
+
+def test_pool_priority_order(pool):
+    import threading
+    import time
+
+    native = pool.checkout()
+    served = []
+
+    def wait(priority):
+        served.append((priority, pool.checkout(priority=priority, timeout=1)))
+        pool.checkin(served[-1][1])
+
+    threads = [threading.Thread(target=wait, args=(priority,)) for priority in (10, 0)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+
+    pool.checkin(native)
+    for thread in threads:
+        thread.join()
+
+    assert [priority for priority, _ in served] == [0, 10]
+
+
+def test_pool_checkin_while_queueing(orb):
+    from orb.core.connection_types.sql.pool import ConnectionPool
+
+    import threading
+
+    # connections returned while another request gets in line must be handed off
+    pool = ConnectionPool(FakeConnection(), maxSize=1, timeout=1)
+    errors = []
+
+    def work():
+        try:
+            for _ in xrange(200):
+                pool.checkin(pool.checkout())
+        except orb.errors.PoolTimeout as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=work) for _ in xrange(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert pool.checkout(timeout=0.05) is not None
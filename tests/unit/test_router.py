@@ -0,0 +1,57 @@
+"""
+Tests for the SQL replica router
+"""
+
+import pytest
+
+
+@pytest.fixture()
+def replica_db(orb):
+    return orb.Database('SQLite', host='primary', readHosts=['replica1', ('replica2', 0)])
+
+
+def test_router_without_replicas(orb):
+    db = orb.Database('SQLite', host='primary')
+    assert db.connection().router().choose() == 'primary'
+
+
+def test_router_weights(replica_db):
+    router = replica_db.connection().router()
+    assert replica_db.readHosts() == {'replica1': 1, 'replica2': 0}
+    assert set(router.choose() for _ in xrange(10)) == {'replica1'}
+
+
+def test_router_ejection(replica_db):
+    router = replica_db.connection().router()
+    router.eject('replica1')
+    assert router.ejected() == ['replica1']
+    assert router.choose() == 'primary'
+
+    # the primary is never ejected
+    router.eject('primary')
+    assert router.ejected() == ['replica1']
+
+
+def test_router_sticky_writes(replica_db):
+    router = replica_db.connection().router()
+    router.markWrite()
+    assert router.choose() == 'replica1'
+
+    replica_db.setStickyWrites(10)
+    assert router.choose() == 'primary'
+
+
+def test_router_least_connections(orb):
+    db = orb.Database('SQLite', readHosts=['replica1', 'replica2'], balancing='leastConnections')
+    conn = db.connection()
+    native = conn.pool(host='replica1').checkout()
+    assert conn.router().choose() == 'replica2'
+
+    conn.pool(host='replica1').checkin(native)
+    conn.pool(host='replica2').checkout()
+    assert conn.router().choose() == 'replica1'
+
+
+def test_router_invalid_balancing(orb):
+    with pytest.raises(orb.errors.OrbError):
+        orb.Database('SQLite', balancing='random')
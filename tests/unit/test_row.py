@@ -0,0 +1,20 @@
+"""
+Tests for the read-only rows
+"""
+
+
+def test_row_clashing_columns(orb):
+    class Setting(orb.Table):
+        id = orb.IdColumn()
+        get = orb.StringColumn()
+        values = orb.StringColumn()
+
+    row_type = Setting.rowType()
+    row = row_type(*range(len(row_type.__columns__)))
+
+    # the columns are stored under renamed slots, leaving the methods in place
+    assert row.get('values') == row.values_
+    assert row.get('get') == row.get_
+    assert sorted(row.values()) == range(len(row_type.__columns__))
+    assert row == row_type(*row.values())
+    assert hash(row) == hash(row_type(*row.values()))
@@ -6,10 +6,13 @@ def test_basic_settings():
 
     assert settings.default_locale == 'en_US'
     assert settings.default_page_size == '40'
+    assert settings.locking_strategy == 'rwlock'
     assert settings.max_cache_timeout == '86400000'  # 24 hours
     assert settings.max_connections == '10'
+    assert settings.max_workers == '10'
     assert settings.security_key == ''
     assert settings.server_timezone == 'US/Pacific'
+    assert settings.statement_cache_size == '500'
     assert settings.worker_class == 'default'
 
 